@@ -0,0 +1,702 @@
+#!/usr/bin/env python
+"""
+Offline benchmark of everything around the LLM: git diffing, indexing, prompt rendering and file edits.
+
+Builds a throwaway git repository with synthetic docs/en pages and their translations, edits the
+English pages on a feature branch, and runs the tools and the whole `main.run` pipeline against a
+deterministic stub LLM. Timings, subprocess counts and peak memory are reported as JSON, along with
+the start up of a run without English changes, which fails the benchmark if it imports crewAI. The
+translations the run commits are checked too, a broken one fails the benchmark.
+
+    benchmark --files 20 --headings 8 --edit_pattern mixed --output benchmark.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from importlib import metadata
+
+from crewai import Crew
+from crewai.llms.base_llm import BaseLLM
+
+from make_my_docs_bot import file_crew
+from make_my_docs_bot import main as pipeline
+from make_my_docs_bot.crew import MakeMyDocsBot
+from make_my_docs_bot.pydantic_models import (
+    FileChange, FileChanges, FileContentUpdate, FileContentUpdates, SectionChanges
+)
+from make_my_docs_bot.tools import chunked_translation
+from make_my_docs_bot.tools.branch_change_analyzer import BranchChangeAnalyzerTool
+from make_my_docs_bot.tools.file_indexing import FileIndexingTool
+from make_my_docs_bot.tools.git_blob_reader import get_blob_reader
+from make_my_docs_bot.tools.git_diff import get_branch_diff, run_git
+from make_my_docs_bot.tools.github_commit_tool import GitCommitTool
+from make_my_docs_bot.tools.index_cache import index_cache
+from make_my_docs_bot.tools.index_fixer import FileIndexFixerTool
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines
+from make_my_docs_bot.tools.locale_file_mapping import LocaleFileMappingTool
+from make_my_docs_bot.tools.read_write_tool import FileContentBatchUpdaterTool, FileContentUpdaterTool
+from make_my_docs_bot.tools.section_changes import find_branch_changes
+from make_my_docs_bot.tools.structure_diff import find_structural_changes, flatten_headings
+from make_my_docs_bot.locales import ENGLISH_DIRECTORY, LOCALES
+
+EDIT_PATTERNS = ["modify", "add_section", "mixed"]
+FEATURE_BRANCH = "benchmark-feature"
+
+# Translator task name -> (mapping tool name, translated directory)
+TRANSLATORS = {locale.task_name: (LocaleFileMappingTool(locale).name, locale.directory) for locale in LOCALES}
+
+TOOL_CLASSES = [
+    BranchChangeAnalyzerTool, FileIndexingTool, FileIndexFixerTool, LocaleFileMappingTool,
+    FileContentUpdaterTool, FileContentBatchUpdaterTool, GitCommitTool,
+]
+
+
+def _page_lines(page_number, headings, prefix="", rng=None):
+    lines = ["---\n", f"title: {prefix}Page {page_number}\n", f"description: {prefix}Synthetic page {page_number}\n", "---\n", "\n"]
+    for heading_number in range(headings):
+        level = 3 if heading_number % 3 == 2 else 2
+        lines.append(f"{'#' * level} {prefix}Heading {page_number}.{heading_number}\n")
+        lines.append("\n")
+        for paragraph_number in range(3):
+            words = " ".join(f"word{rng.randint(0, 999)}" for _ in range(12)) if rng else "text"
+            lines.append(f"{prefix}Paragraph {paragraph_number} of heading {heading_number}: {words}\n")
+            lines.append("\n")
+        if heading_number % 4 == 1:
+            lines.extend(["```python\n", f"print('{prefix}example {heading_number}')\n", "```\n", "\n"])
+    return lines
+
+
+def _edit_page(lines, edit_pattern, edits, rng):
+    heading_lines = [position for position, line in enumerate(lines) if line.startswith("## ") or line.startswith("### ")]
+    targets = sorted(rng.sample(heading_lines, min(edits, len(heading_lines))), reverse=True)
+
+    for number, heading_line in enumerate(targets):
+        if edit_pattern == "modify":
+            # The first paragraph of the section
+            lines[heading_line + 2] = lines[heading_line + 2].rstrip("\n") + " Edited on the feature branch.\n"
+        else:
+            lines[heading_line:heading_line] = [
+                f"## New heading {number}\n", "\n", f"A section which only exists on the feature branch {number}.\n", "\n"
+            ]
+    return lines
+
+
+def create_synthetic_repo(root, files=10, headings=8, edits_per_file=2, edit_pattern="mixed", seed=0):
+    """
+    Creates a git repository in root with `files` English pages and their translations in every
+    locale on main, and a feature branch editing every English page. Returns the changed pages.
+    """
+    rng = random.Random(seed)
+    os.makedirs(root, exist_ok=True)
+
+    def git(*args):
+        result = run_git(list(args), cwd=root)
+        if result.returncode != 0:
+            raise Exception(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+
+    git("init", "-q", "-b", "main")
+    git("config", "user.name", "Benchmark")
+    git("config", "user.email", "benchmark@example.com")
+    git("config", "commit.gpgsign", "false")
+
+    pages = {}
+    for page_number in range(files):
+        # Some pages in a sub directory, like the real docs
+        file_path = f"docs/en/{'guides/' if page_number % 3 == 0 else ''}page-{page_number}.mdx"
+        pages[file_path] = _page_lines(page_number, headings, rng=rng)
+
+        for directory in [ENGLISH_DIRECTORY, *(locale.directory for locale in LOCALES)]:
+            path = os.path.join(root, file_path.replace("docs/en", directory))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            prefix = "" if directory == ENGLISH_DIRECTORY else f"[{os.path.basename(directory)}] "
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(_page_lines(page_number, headings, prefix, random.Random(f"{seed}-{page_number}")) if prefix else pages[file_path])
+
+    git("add", "docs")
+    git("commit", "-q", "-m", "Synthetic docs")
+    git("checkout", "-q", "-b", FEATURE_BRANCH)
+
+    for page_number, (file_path, lines) in enumerate(pages.items()):
+        pattern = edit_pattern
+        if edit_pattern == "mixed":
+            pattern = "add_section" if page_number % 2 else "modify"
+        with open(os.path.join(root, file_path), "w", encoding="utf-8") as f:
+            f.writelines(_edit_page(lines, pattern, edits_per_file, rng))
+
+    git("add", "docs")
+    git("commit", "-q", "-m", "Edit the English docs")
+    return list(pages)
+
+
+def _action(tool_name, tool_input):
+    return f"Thought: I should use the {tool_name}\nAction: {tool_name}\nAction Input: {json.dumps(tool_input)}"
+
+
+def _final_answer(answer):
+    return f"Thought: I now know the final answer\nFinal Answer: {answer}"
+
+
+def _context_output(task, model):
+    for context_task in task.context or []:
+        if context_task.output is not None and isinstance(context_task.output.pydantic, model):
+            return context_task.output.pydantic
+    return model(changes=[]) if model is not FileContentUpdates else model(updates=[])
+
+
+class StubLLM(BaseLLM):
+    """
+    Deterministic offline LLM answering every task of the crew like a well behaved model, it calls the
+    task's tools with valid inputs and returns valid SectionChanges, FileChanges and FileContentUpdates.
+    Translations are the English text with a locale marker, also for the chunks of large sections.
+    """
+
+    def __init__(self, repo_root, branch_name):
+        super().__init__(model="benchmark-stub")
+        self.repo_root = repo_root
+        self.branch_name = branch_name
+        # Shared with the copies CachedLLM calls with other stop words
+        self.usage = {"calls": 0, "seconds": 0.0}
+        self._answers = {}
+        self._lock = threading.Lock()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        started = time.perf_counter()
+        with self._lock:
+            self.usage["calls"] += 1
+            if from_task is not None and from_task.id not in self._answers:
+                self._answers[from_task.id] = [self._answer(from_task), None]
+            answers = self._answers[from_task.id] if from_task is not None else None
+
+        if answers is None:
+            answer = self._translate_chunk(messages)
+        else:
+            try:
+                answers[1] = next(answers[0])
+            except StopIteration:
+                pass  # Asked again after the final answer, e.g. when it couldn't be parsed
+            answer = answers[1]
+        with self._lock:
+            self.usage["seconds"] += time.perf_counter() - started
+        return answer
+
+    def _checkout(self, task):
+        # The crew's tools know the worktree it runs in, the stub reads the same files
+        for tool in task.agent.tools if task.agent else []:
+            if getattr(tool, "repo_root", None):
+                return tool.repo_root
+        return self.repo_root
+
+    def _skipped_sections(self, task):
+        # The analyzer leaves out the sections already translated in chunks, the translators see its tool through their context
+        for agent_task in [task, *(task.context or [])]:
+            for tool in agent_task.agent.tools if agent_task.agent else []:
+                if isinstance(tool, BranchChangeAnalyzerTool):
+                    return set(tool.skipped_sections)
+        return set()
+
+    def _changed_sections(self, task, repo_root, file_path):
+        english_index, changed_sections = find_branch_changes(repo_root, file_path, "main", self.branch_name)
+        skipped_sections = self._skipped_sections(task)
+        return english_index, [
+            (section, full_context_flag) for section, full_context_flag in changed_sections
+            if (section['start_line'], section['title']) not in skipped_sections
+        ]
+
+    def _translate_chunk(self, messages):
+        # Chunks of large sections are translated outside the crew, see chunked_translation
+        system, user = messages[0]["content"], messages[1]["content"]
+        directory = next(locale.directory for locale in LOCALES if f"English to {locale.language}." in system)
+        marker = f"[{os.path.basename(directory)}] "
+        chunk = user.split(":\n\n", 1)[1]
+        return "".join(
+            line if not line.strip() or line.startswith("#") else marker + line
+            for line in chunk.splitlines(keepends=True)
+        )
+
+    def _answer(self, task):
+        # Every task but the editor's mentions the English page
+        file_path_match = re.search(r"docs/en/\S+?\.mdx", task.description)
+        file_path = file_path_match.group(0) if file_path_match else None
+        repo_root = self._checkout(task)
+
+        if task.name == "validate_file_structure_task":
+            yield _action(FileIndexingTool().name, {"file_path": file_path, "feature_branch": self.branch_name})
+            changes = []
+            for section_changes in find_structural_changes(repo_root, file_path, "main", self.branch_name).values():
+                changes.extend(section_changes.changes if section_changes else [])
+            yield _final_answer(SectionChanges(changes=changes).model_dump_json())
+
+        elif task.name == "index_fixing_task":
+            changes = _context_output(task, SectionChanges).changes
+            # Bottom-up so the line numbers of the remaining insertions stay valid
+            for _, change in sorted(enumerate(changes), key=lambda item: (item[1].PREVIOUS_SECTION_END_LINE or 0, item[0]), reverse=True):
+                yield _action(FileIndexFixerTool().name, {
+                    "file_path": change.FILE_PATH,
+                    "previous_section": change.PREVIOUS_SECTION or "",
+                    "previous_section_start_line": change.PREVIOUS_SECTION_START_LINE or 0,
+                    "previous_section_end_line": change.PREVIOUS_SECTION_END_LINE or 0,
+                    "next_section": change.NEXT_SECTION or "",
+                    "next_section_start_line": change.NEXT_SECTION_START_LINE or -1,
+                    "next_section_end_line": change.NEXT_SECTION_END_LINE or -1,
+                    "new_heading": change.NEW_HEADING_TRANSLATED,
+                    "level": change.LEVEL,
+                    "reason": change.REASON,
+                })
+            yield _final_answer(f"Inserted {len(changes)} missing headings")
+
+        elif task.name == "analyze_branch_documentation_changes_task":
+            yield _action(BranchChangeAnalyzerTool().name, {"feature_branch": self.branch_name, "file_path": file_path})
+            _, changed_sections = self._changed_sections(task, repo_root, file_path)
+            yield _final_answer(FileChanges(changes=[
+                FileChange(
+                    level=section['level'],
+                    title=section['title'],
+                    context=section['content'] if full_context_flag else section['before_first_children_content'],
+                    full_context_flag=full_context_flag,
+                )
+                for section, full_context_flag in changed_sections
+            ]).model_dump_json())
+
+        elif task.name in TRANSLATORS:
+            tool_name, directory = TRANSLATORS[task.name]
+            for change in _context_output(task, FileChanges).changes:
+                yield _action(tool_name, {"list_of_files": [file_path], "level": change.level, "full_context_flag": change.full_context_flag})
+            yield _final_answer(self._translate(task, repo_root, file_path, directory).model_dump_json())
+
+        else:
+            updates = []
+            for context_task in task.context or []:
+                if context_task.output is not None and isinstance(context_task.output.pydantic, FileContentUpdates):
+                    updates.extend(context_task.output.pydantic.updates)
+
+            if updates:
+                yield _action(FileContentBatchUpdaterTool().name, {"updates": [update.model_dump() for update in updates]})
+            files_to_commit = sorted({update.FILE_PATH for update in updates})
+            if files_to_commit:
+                yield _action(GitCommitTool().name, {
+                    "feature_branch": self.branch_name,
+                    "files_to_commit": files_to_commit,
+                    "commit_message": f"Translate {', '.join(files_to_commit)}",
+                })
+            yield _final_answer(f"Applied {len(updates)} updates to {len(files_to_commit)} files")
+
+    def _translate(self, task, repo_root, file_path, directory):
+        english_index, changed_sections = self._changed_sections(task, repo_root, file_path)
+        translated_file_path = file_path.replace("docs/en", directory)
+        translated_path = os.path.join(repo_root, translated_file_path)
+        marker = f"[{os.path.basename(directory)}] "
+
+        english_headings = flatten_headings(english_index)
+        translated_headings = flatten_headings(index_markdown_lines(translated_path))
+        # Once the missing headings are inserted the translation has every English heading at its position,
+        # before that a well behaved model doesn't guess
+        if [heading['level'] for heading in english_headings] != [heading['level'] for heading in translated_headings]:
+            return FileContentUpdates(updates=[])
+        aligned = {english['start_line']: translated for english, translated in zip(english_headings, translated_headings)}
+
+        updates = []
+        for section, full_context_flag in changed_sections:
+            translated = aligned.get(section['start_line'])
+            if translated is None or translated['start_line'] < 1:
+                continue
+            content = section['content'] if full_context_flag else section['before_first_children_content']
+            end_line = translated['end_line'] if full_context_flag else translated['first_children_start_line'] - 1
+            updates.append(FileContentUpdate(
+                FILE_PATH=translated_file_path,
+                CONTENT_TO_BE_DELETED_START_LINE=translated['start_line'],
+                CONTENT_TO_BE_DELETED_END_LINE=end_line,
+                NEW_CONTENT="".join(
+                    line if not line.strip() or line.startswith("#") else marker + line
+                    for line in content.splitlines(keepends=True)
+                ),
+            ))
+        return FileContentUpdates(updates=updates)
+
+
+class StageTimer:
+    """Accumulates the calls and seconds of every patched function under a stage name."""
+
+    def __init__(self):
+        self.calls = Counter()
+        self.seconds = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self.calls[stage] += 1
+            self.seconds[stage] += seconds
+
+    def wrap(self, stage, function):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(stage, time.perf_counter() - started)
+        return timed
+
+    def wrap_tool(self, run):
+        # Stage named after the tool instance, the locale mapping tools share one class
+        def timed(tool, *args, **kwargs):
+            return self.wrap(f"tool: {tool.name}", run)(tool, *args, **kwargs)
+        return timed
+
+    def report(self):
+        return {stage: {"calls": self.calls[stage], "seconds": round(self.seconds[stage], 6)} for stage in sorted(self.calls)}
+
+
+@contextlib.contextmanager
+def _patched(targets):
+    """Temporarily replaces (owner, attribute) pairs with the given values."""
+    originals = [(owner, attribute, getattr(owner, attribute)) for owner, attribute, _ in targets]
+    try:
+        for owner, attribute, value in targets:
+            setattr(owner, attribute, value)
+        yield
+    finally:
+        for owner, attribute, original in reversed(originals):
+            setattr(owner, attribute, original)
+
+
+def _command_name(args):
+    if isinstance(args, (str, bytes)):
+        return os.path.basename(str(args).split()[0])
+    args = [str(arg) for arg in args]
+    command = os.path.basename(args[0])
+    if command == "git":
+        # Skip `-c key=value` options to find the git sub command
+        rest = args[1:]
+        while len(rest) > 1 and rest[0] == "-c":
+            rest = rest[2:]
+        return f"git {rest[0]}" if rest else command
+    return command
+
+
+@contextlib.contextmanager
+def count_subprocesses(counter):
+    original_init = subprocess.Popen.__init__
+
+    def counting_init(self, args, *rest, **kwargs):
+        counter[_command_name(args)] += 1
+        return original_init(self, args, *rest, **kwargs)
+
+    with _patched([(subprocess.Popen, "__init__", counting_init)]):
+        yield counter
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+@contextlib.contextmanager
+def bot_working_directory(repo_root):
+    """Runs from a make_my_docs_bot directory inside repo_root, the tools use the parent of the working directory as the repository."""
+    bot_directory = os.path.join(repo_root, "make_my_docs_bot")
+    if not os.path.exists(bot_directory):
+        os.makedirs(bot_directory)
+        with open(os.path.join(repo_root, ".git", "info", "exclude"), "a", encoding="utf-8") as f:
+            f.write("make_my_docs_bot/\n")
+
+    working_directory = os.getcwd()
+    os.chdir(bot_directory)
+    try:
+        yield bot_directory
+    finally:
+        os.chdir(working_directory)
+
+
+def benchmark_tools(repo_root, changed_files, repeats=3):
+    """Times the tools on every changed page, the first pass runs with a cold index cache."""
+    tools = {
+        "index_markdown_lines": lambda file_path: index_markdown_lines(os.path.join(repo_root, file_path)),
+        "get_branch_diff": lambda file_path: get_branch_diff(repo_root, "main", FEATURE_BRANCH),
+        "find_structural_changes": lambda file_path: find_structural_changes(repo_root, file_path, "main", FEATURE_BRANCH),
+        BranchChangeAnalyzerTool().name: lambda file_path: BranchChangeAnalyzerTool()._run(FEATURE_BRANCH, file_path),
+        FileIndexingTool().name: lambda file_path: FileIndexingTool()._run(file_path),
+    }
+    for locale in LOCALES:
+        mapping_tool = LocaleFileMappingTool(locale)
+        tools[mapping_tool.name] = lambda file_path, mapping_tool=mapping_tool: mapping_tool._run([file_path], 2, True)
+
+    report = {}
+    for name, tool in tools.items():
+        index_cache.clear()
+        passes = []
+        with bot_working_directory(repo_root):
+            for _ in range(repeats):
+                started = time.perf_counter()
+                for file_path in changed_files:
+                    tool(file_path)
+                passes.append(time.perf_counter() - started)
+        report[name] = {
+            "calls_per_pass": len(changed_files),
+            "cold_seconds": round(passes[0], 6),
+            "warm_seconds": round(min(passes[1:]), 6) if len(passes) > 1 else None,
+        }
+    return report
+
+
+# Modules only a crew needs, a run without English changes and the client must not load them
+CREW_ONLY_MODULES = ["crewai", "pydantic"]
+
+# `main.run` for a branch without English changes, then the client module, prints which of
+# CREW_ONLY_MODULES they had to import
+NOOP_RUN_SCRIPT = """
+import asyncio, json, sys
+from make_my_docs_bot import main, client
+crew_only_modules = sys.argv[2:]
+sys.argv = ["run_crew", "--branch_name", sys.argv[1]]
+asyncio.run(main.run())
+print(json.dumps([name for name in crew_only_modules if name in sys.modules]))
+"""
+
+
+def _time_python(args, cwd, repeats):
+    """Best wall time of a fresh interpreter running args, and the last line of its output."""
+    env = dict(os.environ)
+    source_directory = os.path.dirname(os.path.dirname(os.path.abspath(pipeline.__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [source_directory, env.get("PYTHONPATH")]))
+
+    seconds, output = [], ""
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True)
+        seconds.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            raise RuntimeError(f"python {' '.join(args)} failed: {result.stderr.strip()}")
+        output = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else ""
+    return min(seconds), output
+
+
+def benchmark_startup(repo_root, repeats=3):
+    """
+    Start up of the pre-push hook in fresh interpreters: importing `main`, and a whole run for a
+    branch without English changes, which must finish without importing crewAI or pydantic.
+    """
+    with bot_working_directory(repo_root) as bot_directory:
+        interpreter_seconds, _ = _time_python(["-c", "pass"], bot_directory, repeats)
+        import_seconds, _ = _time_python(["-c", "import make_my_docs_bot.main"], bot_directory, repeats)
+        noop_seconds, crew_imports = _time_python(["-c", NOOP_RUN_SCRIPT, "main", *CREW_ONLY_MODULES], bot_directory, repeats)
+
+    return {
+        "interpreter_seconds": round(interpreter_seconds, 6),
+        "import_main_seconds": round(import_seconds, 6),
+        "noop_run_seconds": round(noop_seconds, 6),
+        "noop_run_crew_imports": json.loads(crew_imports),
+    }
+
+
+def benchmark_pipeline(repo_root, max_concurrency=4, verbose=False, worktrees=False, max_section_tokens=None):
+    """
+    Runs `main.run` for the feature branch with every agent on the stub LLM, in a pooled worktree with
+    worktrees. Sections above max_section_tokens are translated in chunks.
+    """
+    stub = StubLLM(repo_root, FEATURE_BRANCH)
+    stages = StageTimer()
+    subprocesses = Counter()
+
+    targets = [(MakeMyDocsBot, "llm", stub), (MakeMyDocsBot, "tracing", False), (Crew, "kickoff", stages.wrap("crew", Crew.kickoff))]
+    targets += [(tool_class, "_run", stages.wrap_tool(tool_class._run)) for tool_class in TOOL_CLASSES]
+    targets += [(pipeline, "get_branch_diff", stages.wrap("get_branch_diff", pipeline.get_branch_diff))]
+    targets += [
+        (file_crew, name, stages.wrap(name, getattr(file_crew, name)))
+        for name in ["find_branch_changes", "translate_from_memory", "translate_changed_blocks", "translate_oversized_sections", "find_structural_changes", "collect_translated_sections"]
+    ]
+    if max_section_tokens:
+        targets += [(chunked_translation, "MAX_SECTION_TOKENS", max_section_tokens)]
+
+    argv = ["run_crew", "--branch_name", FEATURE_BRANCH, "--max_concurrency", str(max_concurrency)]
+    if worktrees:
+        argv.append("--worktrees")
+
+    error = None
+    started = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(bot_working_directory(repo_root))
+            if not verbose:
+                stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+            stack.enter_context(_patched(targets + [(sys, "argv", argv)]))
+            stack.enter_context(count_subprocesses(subprocesses))
+            asyncio.run(pipeline.run())
+    except Exception as e:
+        error = str(e)
+    wall_seconds = time.perf_counter() - started
+
+    stage_report = stages.report()
+    crew_seconds = stages.seconds["crew"]
+    tool_seconds = sum(seconds for stage, seconds in stages.seconds.items() if stage.startswith("tool: "))
+
+    return {
+        "wall_seconds": round(wall_seconds, 6),
+        "error": error,
+        "stages": stage_report,
+        "llm": {"calls": stub.usage["calls"], "seconds": round(stub.usage["seconds"], 6)},
+        # Time spent in the crews outside the tools and the LLM, rendering prompts and parsing answers.
+        # Summed over the crews, so it can exceed wall_seconds when they run concurrently
+        "framework_seconds": round(max(crew_seconds - tool_seconds - stub.usage["seconds"], 0.0), 6),
+        "subprocesses": dict(sorted(subprocesses.items())),
+        "subprocess_total": sum(subprocesses.values()),
+        # Commits on top of the synthetic English edit
+        "translation_commits": int(run_git(["rev-list", "--count", f"main..{FEATURE_BRANCH}"], cwd=repo_root).stdout.strip()) - 1,
+    }
+
+
+def _own_text(section):
+    # Without the heading line, the title is checked on its own
+    return "".join(section['before_first_children_content'].splitlines(keepends=True)[1:]).strip()
+
+
+def check_translations(repo_root, changed_files, base_branch="main", branch=FEATURE_BRANCH):
+    """
+    Problems of the translations committed to branch: every English heading must have its
+    counterpart at the same position, a new one with some text, and the translated sections
+    whose English text didn't change must keep their translated text.
+    """
+    reader = get_blob_reader(repo_root)
+    problems = []
+    for file_path in changed_files:
+        english_base = flatten_headings(index_markdown_lines(reader.read(base_branch, file_path)))
+        english_branch = flatten_headings(index_markdown_lines(reader.read(branch, file_path)))
+        matcher = SequenceMatcher(
+            None,
+            [(heading['level'], heading['title']) for heading in english_base],
+            [(heading['level'], heading['title']) for heading in english_branch],
+            autojunk=False
+        )
+
+        for locale in LOCALES:
+            translated_file_path = locale.translated_path(file_path)
+            marker = f"[{os.path.basename(locale.directory)}] "
+            translated_base = flatten_headings(index_markdown_lines(reader.read(base_branch, translated_file_path)))
+            translated_branch = flatten_headings(index_markdown_lines(reader.read(branch, translated_file_path)))
+
+            # The stub keeps the English titles, the synthetic translations mark theirs
+            titles = [(heading['level'], heading['title'].removeprefix(marker)) for heading in translated_branch]
+            if titles != [(heading['level'], heading['title']) for heading in english_branch]:
+                problems.append(f"{translated_file_path}: headings {titles} don't match the English ones")
+                continue
+
+            for english, translated in zip(english_branch, translated_branch):
+                if _own_text(english) and not _own_text(translated):
+                    problems.append(f"{translated_file_path}: '{translated['title']}' lost its text")
+
+            for tag, base_start, base_end, branch_start, branch_end in matcher.get_opcodes():
+                if tag != "equal":
+                    continue
+                for offset in range(base_end - base_start):
+                    base_position, branch_position = base_start + offset, branch_start + offset
+                    english_unchanged = _own_text(english_base[base_position]) == _own_text(english_branch[branch_position])
+                    if english_unchanged and _own_text(translated_base[base_position]) != _own_text(translated_branch[branch_position]):
+                        problems.append(f"{translated_file_path}: the unchanged section '{translated_branch[branch_position]['title']}' was rewritten")
+    return problems
+
+
+def run_benchmark(files=10, headings=8, edits_per_file=2, edit_pattern="mixed", seed=0, repeats=3,
+                  max_concurrency=4, trace_memory=False, keep=False, verbose=False, worktrees=False, max_section_tokens=None):
+    root = tempfile.mkdtemp(prefix="make_my_docs_bot_benchmark_")
+    if trace_memory:
+        tracemalloc.start()
+
+    try:
+        started = time.perf_counter()
+        tools_repo = os.path.join(root, "tools")
+        changed_files = create_synthetic_repo(tools_repo, files, headings, edits_per_file, edit_pattern, seed)
+        setup_seconds = time.perf_counter() - started
+
+        tools = benchmark_tools(tools_repo, changed_files, repeats)
+        startup = benchmark_startup(tools_repo, repeats)
+
+        # A fresh repository, so no diff or index is cached from the tools benchmark
+        pipeline_repo = os.path.join(root, "pipeline")
+        pipeline_files = create_synthetic_repo(pipeline_repo, files, headings, edits_per_file, edit_pattern, seed)
+        index_cache.clear()
+        pipeline_report = benchmark_pipeline(pipeline_repo, max_concurrency, verbose, worktrees, max_section_tokens)
+        pipeline_report["translation_problems"] = check_translations(pipeline_repo, pipeline_files)
+    finally:
+        if not keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    memory = {"peak_rss_bytes": _peak_rss_bytes()}
+    if trace_memory:
+        memory["peak_traced_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "config": {
+            "files": files, "headings": headings, "edits_per_file": edits_per_file, "edit_pattern": edit_pattern,
+            "seed": seed, "repeats": repeats, "max_concurrency": max_concurrency, "trace_memory": trace_memory,
+            "worktrees": worktrees, "max_section_tokens": max_section_tokens or chunked_translation.MAX_SECTION_TOKENS,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "crewai": metadata.version("crewai"),
+        },
+        "repository": root if keep else None,
+        "setup_seconds": round(setup_seconds, 6),
+        "startup": startup,
+        "tools": tools,
+        "pipeline": pipeline_report,
+        "memory": memory,
+    }
+
+
+def main():
+    # Nothing leaves the machine, crewAI telemetry would otherwise be part of the timings
+    os.environ["OTEL_SDK_DISABLED"] = "true"
+    os.environ["CREWAI_DISABLE_TELEMETRY"] = "true"
+
+    parser = argparse.ArgumentParser(description="Benchmark MakeMyDocsBot offline with a synthetic docs repository and a stub LLM.")
+    parser.add_argument("--files", type=int, default=10, help="Number of English pages, each translated in every locale of config/locales.yaml")
+    parser.add_argument("--headings", type=int, default=8, help="Headings per page")
+    parser.add_argument("--edits_per_file", type=int, default=2, help="Sections edited per page on the feature branch")
+    parser.add_argument("--edit_pattern", choices=EDIT_PATTERNS, default="mixed", help="modify sections, add new sections, or alternate between both")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic content")
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the pages when timing the tools")
+    parser.add_argument("--max_concurrency", type=int, default=4, help="Maximum number of file crews running at the same time")
+    parser.add_argument("--worktrees", action="store_true", help="Sync the feature branch in a pooled git worktree, like `run_crew --worktrees`")
+    parser.add_argument("--max_section_tokens", type=int, default=None, help="Translate changed sections above this many tokens in chunks, e.g. 50 to chunk the synthetic pages")
+    parser.add_argument("--trace_memory", action="store_true", help="Report the peak of Python allocations with tracemalloc, slows the run down")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic repositories")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the crews")
+    parser.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = run_benchmark(
+        files=args.files, headings=args.headings, edits_per_file=args.edits_per_file, edit_pattern=args.edit_pattern,
+        seed=args.seed, repeats=args.repeats, max_concurrency=args.max_concurrency, trace_memory=args.trace_memory,
+        keep=args.keep, verbose=args.verbose, worktrees=args.worktrees, max_section_tokens=args.max_section_tokens
+    )
+
+    report_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report_json + "\n")
+    else:
+        print(report_json)
+
+    # The pre-push hook must stay fast for pushes without English changes, and the translations right
+    if report["pipeline"]["error"] or report["pipeline"]["translation_problems"] or report["startup"]["noop_run_crew_imports"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
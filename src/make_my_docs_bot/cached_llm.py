@@ -0,0 +1,62 @@
+import copy
+
+from crewai.llms.base_llm import BaseLLM
+
+from make_my_docs_bot.llm_cache import LLMCacheMiss, get_llm_cache
+
+
+class CachedLLM(BaseLLM):
+    """
+    An LLM of the crew answering from an LLMResponseCache, or recording the answers of the wrapped one.
+
+    It reports the wrapped LLM's function calling support, so crewAI takes the same paths as in a
+    live run. Structured outputs and tool calls which crewAI then parses with instructor go to
+    litellm directly, not through call(), and are neither recorded nor replayed.
+    """
+
+    def __init__(self, llm, cache):
+        super().__init__(model=llm.model, temperature=getattr(llm, "temperature", None), stop=list(getattr(llm, "stop", None) or []))
+        self.llm = llm
+        self.cache = cache
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        key = self.cache.key(self.model, messages, tools, self.stop)
+        if self.cache.mode == "replay":
+            response = self.cache.get(key)
+            if response is None:
+                raise LLMCacheMiss(f"No recorded response of {self.model} for this prompt in {self.cache.directory}, record it first")
+            return response
+
+        # The agent executor sets the stop words on the LLM it was given, this one. The wrapped LLM
+        # may be shared by every agent, e.g. MakeMyDocsBot.llm, so a copy gets them for this call
+        llm = self.llm
+        if list(getattr(llm, "stop", None) or []) != list(self.stop):
+            llm = copy.copy(llm)
+            llm.stop = list(self.stop)
+        response = llm.call(
+            messages, tools=tools, callbacks=callbacks, available_functions=available_functions,
+            from_task=from_task, from_agent=from_agent
+        )
+        # Results of function calls made by the model are not answers to replay
+        if isinstance(response, str):
+            self.cache.put(key, self.model, messages, response)
+        return response
+
+    def supports_function_calling(self) -> bool:
+        # Not part of BaseLLM, custom LLMs may not have it
+        supports_function_calling = getattr(self.llm, "supports_function_calling", None)
+        return bool(supports_function_calling and supports_function_calling())
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
+
+
+def cached_llm(llm):
+    """llm answering through the enabled cache, llm itself when there is none."""
+    cache = get_llm_cache()
+    if cache is None or llm is None or isinstance(llm, CachedLLM):
+        return llm
+    return CachedLLM(llm, cache)
@@ -0,0 +1,96 @@
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+# Only the standard library and crewAI free modules, the client runs on every push
+from make_my_docs_bot.instrumentation import TRACE_ENVIRONMENT_VARIABLE
+from make_my_docs_bot.llm_cache import LLM_CACHE_ENVIRONMENT_VARIABLE, LLM_CACHE_MODES
+from make_my_docs_bot.tools.git_diff import default_repo_root
+
+SOCKET_ENVIRONMENT_VARIABLE = "MAKE_MY_DOCS_BOT_SOCKET"
+# Exit code when the daemon can't take the sync, e.g. none is listening, the pre-push hook then runs the crew itself
+DAEMON_UNAVAILABLE = 3
+# Exit code when the daemon ran the sync and it failed, the only failure the hook doesn't retry with run_crew
+SYNC_FAILED = 4
+
+
+def default_socket_path():
+    """Socket of the daemon, per user, MAKE_MY_DOCS_BOT_SOCKET overrides it."""
+    if os.environ.get(SOCKET_ENVIRONMENT_VARIABLE):
+        return os.environ[SOCKET_ENVIRONMENT_VARIABLE]
+    runtime_directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_directory, f"make_my_docs_bot-{os.getuid()}.sock")
+
+
+def send_request(request, socket_path=None):
+    """
+    Sends one request to the daemon and yields its messages as they arrive, one JSON object per
+    line. Raises FileNotFoundError or ConnectionRefusedError when no daemon is listening.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(socket_path or default_socket_path())
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with connection.makefile("r", encoding="utf-8") as messages:
+            for line in messages:
+                yield json.loads(line)
+
+
+def main():
+    """
+    Thin client of `make_my_docs_bot_daemon`, takes the arguments of run_crew and prints the
+    output of the sync as the daemon streams it.
+    """
+    parser = argparse.ArgumentParser(description="Sync the translations through the MakeMyDocsBot daemon.")
+    parser.add_argument("--branch_name", nargs="+", default=["main"], help="Branch names to compare against the base branch, several need --worktrees")
+    parser.add_argument("--base_branch", default="main", help="Branch the English changes are compared against")
+    parser.add_argument("--worktrees", action="store_true", help="Sync every branch in a pooled git worktree instead of the current checkout")
+    parser.add_argument("--repo_root", default=None, help="The docs repository, the parent of the working directory by default")
+    parser.add_argument("--socket", default=None, help=f"Socket of the daemon, or set {SOCKET_ENVIRONMENT_VARIABLE}")
+    parser.add_argument(
+        "--llm_cache", choices=LLM_CACHE_MODES, default=os.environ.get(LLM_CACHE_ENVIRONMENT_VARIABLE),
+        help=f"Like run_crew, only passthrough is served by the daemon, or set {LLM_CACHE_ENVIRONMENT_VARIABLE}"
+    )
+    parser.add_argument(
+        "--trace", default=os.environ.get(TRACE_ENVIRONMENT_VARIABLE),
+        help=f"Like run_crew, not served by the daemon, or set {TRACE_ENVIRONMENT_VARIABLE}"
+    )
+    args = parser.parse_args()
+
+    # The daemon's LLM cache and tracing are shared by every request, these runs need a process of their own
+    if args.llm_cache not in (None, "passthrough") or args.trace:
+        print("🔌 The daemon doesn't take --llm_cache or --trace, run run_crew instead")
+        sys.exit(DAEMON_UNAVAILABLE)
+
+    request = {
+        "command": "sync",
+        "repo_root": os.path.abspath(args.repo_root or default_repo_root()),
+        "branch_names": args.branch_name,
+        "base_branch": args.base_branch,
+        "worktrees": args.worktrees,
+    }
+
+    result = None
+    try:
+        for message in send_request(request, args.socket):
+            if message["type"] == "output":
+                sys.stdout.write(message["text"])
+                sys.stdout.flush()
+            elif message["type"] == "result":
+                result = message
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"🔌 No MakeMyDocsBot daemon is listening on {args.socket or default_socket_path()}")
+        sys.exit(DAEMON_UNAVAILABLE)
+
+    if result is None:
+        print("❌ The daemon closed the connection before the sync finished")
+        sys.exit(1)
+    if result.get("error"):
+        print(f"❌ {result['error']}")
+        sys.exit(SYNC_FAILED)
+
+
+if __name__ == "__main__":
+    main()
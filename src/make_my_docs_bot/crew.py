@@ -1,15 +1,45 @@
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
+from crewai.tasks.output_format import OutputFormat
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.llm_utils import create_llm
 from typing import List
+import copy
+import os
+import threading
+import yaml
+from make_my_docs_bot.cached_llm import cached_llm
+from make_my_docs_bot.local_editor import LocalEditorAgent
 from make_my_docs_bot.tools.branch_change_analyzer import BranchChangeAnalyzerTool
-from make_my_docs_bot.tools.korean_reverse_mapping import KoreanFileMappingTool
-from make_my_docs_bot.tools.portuguese_brazil_reverse_mapping import PortugureseBrazilFileMappingTool
-from make_my_docs_bot.tools.read_write_tool import FileContentUpdaterTool
+from make_my_docs_bot.tools.locale_file_mapping import LocaleFileMappingTool
+from make_my_docs_bot.tools.read_write_tool import FileContentUpdaterTool, FileContentBatchUpdaterTool
 from make_my_docs_bot.tools.github_commit_tool import GitCommitTool
 from make_my_docs_bot.tools.file_indexing import FileIndexingTool
 from make_my_docs_bot.tools.index_fixer import FileIndexFixerTool
 from make_my_docs_bot.pydantic_models import SectionChanges, FileChanges, FileContentUpdates
+from make_my_docs_bot.task_graph import schedule_concurrent_tasks
+from make_my_docs_bot.locales import LOCALES, language_names
+
+_parsed_configs = {}
+_parsed_configs_lock = threading.Lock()
+
+
+def load_config_yaml(config_path):
+    """
+    agents.yaml or tasks.yaml, parsed again only when the file changed. Every crew gets its own
+    copy, CrewBase replaces the agent and context names in it with the created objects.
+    """
+    modified = os.stat(config_path).st_mtime_ns
+    with _parsed_configs_lock:
+        cached = _parsed_configs.get(config_path)
+    if cached is None or cached[0] != modified:
+        with open(config_path, "r", encoding="utf-8") as file:
+            cached = (modified, yaml.safe_load(file))
+        with _parsed_configs_lock:
+            _parsed_configs[config_path] = cached
+    return copy.deepcopy(cached[1])
+
 
 @CrewBase
 class MakeMyDocsBot():
@@ -18,120 +48,223 @@ class MakeMyDocsBot():
     agents: List[BaseAgent]
     tasks: List[Task]
 
+    # Run tasks which don't depend on each other (the translators) concurrently
+    concurrent_tasks: bool = True
+
+    # LLM used by every agent instead of the configured ones, e.g. the stub LLM of the benchmark
+    llm = None
+    # Send the execution traces to crewAI, turned off for offline runs
+    tracing: bool = True
+
+    def __init__(self, skipped_tasks=(), completed_outputs=None, task_callback=None, repo_root=None, base_branch="main", skipped_sections=(), branch_name=None):
+        # Checkout the tools work in, e.g. a worktree of the branch, the parent of the cwd when None
+        self.repo_root = repo_root
+        self.base_branch = base_branch
+        # Branch the translations are committed to, when it is known up front the editor needs no model
+        self.branch_name = branch_name
+        # Names of tasks left out of the crew, e.g. the index mapping tasks when the structure already matches
+        self.skipped_tasks = set(skipped_tasks)
+        # (start_line, title) of changed English sections translated before the crew, the analysis leaves them out
+        self.skipped_sections = list(skipped_sections)
+        # {task_name: {"raw": ..., "pydantic": ...}} of tasks finished by an earlier run, see RunManifest
+        self.completed_outputs = completed_outputs or {}
+        self.task_callback = task_callback
+        # One translator agent and task per locale in locales.yaml, created once like the decorated ones
+        self._translator_agents = {}
+        self._translator_tasks = None
+
+    def localized_config(self, config, locale=None) -> dict:
+        """The agent or task config with {languages} filled in, and {language} for a locale's translator"""
+        replacements = {"{languages}": language_names()}
+        if locale is not None:
+            replacements["{language}"] = locale.language
+
+        localized = dict(config)
+        for key, value in localized.items():
+            if isinstance(value, str):
+                for placeholder, text in replacements.items():
+                    value = value.replace(placeholder, text)
+                localized[key] = value
+        return localized
+
     @agent
     def index_mapping_specialist(self) -> Agent:
         return Agent(
-            config=self.agents_config['index_mapping_specialist'], # type: ignore[index]
+            config=self.localized_config(self.agents_config['index_mapping_specialist']), # type: ignore[index]
             verbose=True,
             tools=[
-				FileIndexingTool()
+				FileIndexingTool(repo_root=self.repo_root, base_branch=self.base_branch)
             ]
         )
     
     @agent
     def index_mapping_fixer(self) -> Agent:
         return Agent(
-            config=self.agents_config['index_mapping_fixer'], # type: ignore[index]
+            config=self.localized_config(self.agents_config['index_mapping_fixer']), # type: ignore[index]
             verbose=True,
             tools=[
-                FileIndexFixerTool()
+                FileIndexFixerTool(repo_root=self.repo_root)
             ]
         )
 
     @agent
     def documentation_change_analyzer(self) -> Agent:
         return Agent(
-            config=self.agents_config['documentation_change_analyzer'], # type: ignore[index]
+            config=self.localized_config(self.agents_config['documentation_change_analyzer']), # type: ignore[index]
             verbose=True,
             tools=[
-				BranchChangeAnalyzerTool()
+				BranchChangeAnalyzerTool(repo_root=self.repo_root, base_branch=self.base_branch, skipped_sections=self.skipped_sections)
             ]
         )
 
-    @agent
-    def korean_translator_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['korean_translator_agent'], # type: ignore[index]
-            verbose=True,
-            tools=[
-				KoreanFileMappingTool()
-            ]
-        )
+    def translator_agent(self, locale) -> Agent:
+        if locale.key not in self._translator_agents:
+            # Locales can pick their own model, the others use the default one
+            llm_options = {"llm": locale.llm} if locale.llm else {}
+            self._translator_agents[locale.key] = Agent(
+                config=self.localized_config(self.agents_config['translator_agent'], locale), # type: ignore[index]
+                verbose=True,
+                tools=[
+                    LocaleFileMappingTool(locale, repo_root=self.repo_root)
+                ],
+                **llm_options
+            )
+        return self._translator_agents[locale.key]
     
     @agent
-    def portuguese_brazil_translator_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['portuguese_brazil_translator_agent'], # type: ignore[index]
+    def file_content_editor_and_git_commiter_agent(self) -> BaseAgent:
+        config = self.localized_config(self.agents_config['file_content_editor_and_git_commiter_agent']) # type: ignore[index]
+        editor = Agent(
+            config=config,
             verbose=True,
             tools=[
-				PortugureseBrazilFileMappingTool()
+				FileContentBatchUpdaterTool(repo_root=self.repo_root),
+				FileContentUpdaterTool(repo_root=self.repo_root),
+                GitCommitTool(repo_root=self.repo_root)
             ]
         )
-    
-    @agent
-    def file_content_editor_and_git_commiter_agent(self) -> Agent:
-        return Agent(
-            config=self.agents_config['file_content_editor_and_git_commiter_agent'], # type: ignore[index]
-            verbose=True,
-            tools=[
-				FileContentUpdaterTool(),
-                GitCommitTool()
-            ]
+        if self.branch_name is None:
+            return editor
+        # Applies the translators' updates itself, the LLM editor only gets the ones it can't repair
+        return LocalEditorAgent(
+            config=config,
+            tools=editor.tools,
+            branch_name=self.branch_name,
+            repo_root=self.repo_root,
+            fallback=editor
         )
 
 
     @task
     def validate_file_structure_task(self) -> Task:
         return Task(
-            config=self.tasks_config['validate_file_structure_task'],
+            config=self.localized_config(self.tasks_config['validate_file_structure_task']),
             output_pydantic=SectionChanges # type: ignore[index]
         )
     
     @task
     def index_fixing_task(self) -> Task:
         return Task(
-            config=self.tasks_config['index_fixing_task'], # type: ignore[index]
+            config=self.localized_config(self.tasks_config['index_fixing_task']), # type: ignore[index]
         )
 
     @task
     def analyze_branch_documentation_changes_task(self) -> Task:
         return Task(
-            config=self.tasks_config['analyze_branch_documentation_changes_task'],
+            config=self.localized_config(self.tasks_config['analyze_branch_documentation_changes_task']),
             output_pydantic=FileChanges # type: ignore[index]
         )
     
-    @task
-    def korean_documentation_translator_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['korean_documentation_translator_task'],
-            output_pydantic=FileContentUpdates # type: ignore[index]
-        )
-    
-    @task
-    def portuguese_brazil_documentation_translator_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['portuguese_brazil_documentation_translator_task'],
-            output_pydantic=FileContentUpdates # type: ignore[index] # type: ignore[index]
-        )
+    def translator_tasks(self) -> List[Task]:
+        """One translation task per locale, each only needs the analysis so they can run concurrently"""
+        if self._translator_tasks is None:
+            self._translator_tasks = [
+                Task(
+                    config=self.localized_config(self.tasks_config['documentation_translator_task'], locale), # type: ignore[index]
+                    name=locale.task_name,
+                    agent=self.translator_agent(locale),
+                    context=[self.analyze_branch_documentation_changes_task()],
+                    output_pydantic=FileContentUpdates
+                )
+                for locale in LOCALES
+            ]
+        return self._translator_tasks
     
     @task
     def file_content_editor_and_git_commiter_task(self) -> Task:
         return Task(
-            config=self.tasks_config['file_content_editor_and_git_commiter_task'], # type: ignore[index]
+            config=self.localized_config(self.tasks_config['file_content_editor_and_git_commiter_task']), # type: ignore[index]
+            context=self.translator_tasks()
         )
 
 
+    def restore_task_output(self, task, stored_output) -> TaskOutput:
+        """Rebuilds the output of a task finished by an earlier run, so the tasks using it as context can run"""
+        pydantic_output = None
+        if task.output_pydantic and stored_output.get("pydantic") is not None:
+            pydantic_output = task.output_pydantic.model_validate(stored_output["pydantic"])
+
+        return TaskOutput(
+            name=task.name,
+            description=task.description,
+            expected_output=task.expected_output,
+            raw=stored_output["raw"],
+            pydantic=pydantic_output,
+            agent=task.agent.role,
+            output_format=OutputFormat.PYDANTIC if pydantic_output else OutputFormat.RAW,
+        )
+
     @crew
     def crew(self) -> Crew:
         """Creates the MakeMyDocsBot crew"""
         # To learn how to add knowledge sources to your crew, check out the documentation:
         # https://docs.crewai.com/concepts/knowledge#what-is-knowledge
 
+        agents = [*self.agents, *(self.translator_agent(locale) for locale in LOCALES)]
+        if self.llm is not None:
+            for crew_agent in agents:
+                crew_agent.llm = self.llm
+                if isinstance(crew_agent, LocalEditorAgent) and crew_agent.fallback is not None:
+                    crew_agent.fallback.llm = self.llm
+
+        # Recorded or replayed responses, when the LLM cache is on
+        for crew_agent in agents:
+            crew_agent.llm = cached_llm(crew_agent.llm)
+            if isinstance(crew_agent, LocalEditorAgent) and crew_agent.fallback is not None:
+                crew_agent.fallback.llm = cached_llm(crew_agent.fallback.llm)
+
+        # The translator tasks go right after the analysis they translate
+        all_tasks = list(self.tasks)
+        analysis_position = all_tasks.index(self.analyze_branch_documentation_changes_task())
+        all_tasks[analysis_position + 1:analysis_position + 1] = self.translator_tasks()
+
+        tasks = []
+        for task in all_tasks:
+            if task.name in self.skipped_tasks:
+                continue
+            if task.name in self.completed_outputs:
+                task.output = self.restore_task_output(task, self.completed_outputs[task.name])
+                continue
+            tasks.append(task)
+
+        if self.concurrent_tasks:
+            schedule_concurrent_tasks(tasks)
+
         return Crew(
-            agents=self.agents, # Automatically created by the @agent decorator
-            tasks=self.tasks, # Automatically created by the @task decorator
+            agents=agents, # Created by the @agent decorator, plus the translators of every locale
+            tasks=tasks, # Created by the @task decorator, plus the translators of every locale
             process=Process.sequential,
             verbose=True,
-            tracing=True,
+            tracing=self.tracing,
+            task_callback=self.task_callback,
             # process=Process.hierarchical, # In case you wanna use that instead https://docs.crewai.com/how-to/Hierarchical/
         )
+
+
+# CrewBase parses both files for every crew, one per English page, and the daemon builds them all day
+MakeMyDocsBot.load_yaml = staticmethod(load_config_yaml)
+
+
+def translator_llm(locale):
+    """Model of the locale's translator agent, for translating outside of the crew."""
+    return cached_llm(MakeMyDocsBot.llm or create_llm(locale.llm))
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+import argparse
+import asyncio
+import contextvars
+import io
+import json
+import os
+import socket
+import sys
+import warnings
+
+from make_my_docs_bot.client import SOCKET_ENVIRONMENT_VARIABLE, default_socket_path
+from make_my_docs_bot.crew import MakeMyDocsBot
+from make_my_docs_bot.file_crew import kickoff_crew
+from make_my_docs_bot.main import check_sync_request, has_english_changes, print_commits, sync_branches
+from make_my_docs_bot.scheduler import CrewScheduler
+from make_my_docs_bot.tools.git_commit_engine import start_commit_batch, stop_commit_batch
+from make_my_docs_bot.tools.git_diff import clear_branch_diffs, get_common_directory
+from make_my_docs_bot.tools.index_cache import index_cache
+from make_my_docs_bot.worktree_pool import WorktreePool
+
+warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
+
+# Sends the printed text of the job running in this context to its client
+_job_output = contextvars.ContextVar("job_output", default=None)
+
+
+class JobOutput(io.TextIOBase):
+    """
+    sys.stdout of the daemon. Text printed while serving a request goes to the client of that
+    request, anything else, e.g. from the raw threads of crewAI's async tasks, to the daemon's stdout.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        send = _job_output.get()
+        if send is None:
+            return self.stdout.write(text)
+        if isinstance(text, bytes):
+            # Some libraries write encoded text, e.g. crewAI's first run prompt
+            text = text.decode("utf-8", errors="replace")
+        send({"type": "output", "text": text})
+        return len(text)
+
+    def flush(self):
+        self.stdout.flush()
+
+
+class SyncDaemon:
+    """
+    Long lived process syncing the translations of any repository on request, driven over a Unix
+    socket by `make_my_docs_bot_client`, e.g. from the pre-push hook.
+
+    crewAI, the crew configs, the LLM clients and the index cache are loaded once and stay warm.
+    Every request shares one scheduler, so max_concurrency and the rate limits hold across
+    repositories. Worktree pools are kept per repository.
+    """
+
+    def __init__(self, socket_path, max_concurrency=4, requests_per_minute=None, tokens_per_minute=None, max_retries=2):
+        self.socket_path = socket_path
+        self.scheduler = CrewScheduler(
+            kickoff=kickoff_crew,
+            max_in_flight=max_concurrency,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute,
+            max_retries=max_retries
+        )
+        self._pools = {}
+
+    def pool(self, repo_root) -> WorktreePool:
+        repository = get_common_directory(repo_root)
+        if repository not in self._pools:
+            self._pools[repository] = WorktreePool(repo_root)
+        return self._pools[repository]
+
+    async def sync(self, request):
+        """Runs one sync request like run_crew, returns the failed files."""
+        repo_root = request["repo_root"]
+        branch_names = request.get("branch_names") or ["main"]
+        base_branch = request.get("base_branch") or "main"
+        worktrees = bool(request.get("worktrees"))
+
+        check_sync_request(repo_root, branch_names, worktrees)
+        # Options of run_crew which apply to a whole process, the client runs the crew itself for them
+        if request.get("llm_cache") not in (None, "passthrough") or request.get("trace"):
+            raise Exception("The daemon neither records LLM responses nor traces a single sync, run run_crew with --llm_cache or --trace instead")
+        # The branches moved since their last request, the runs of other branches keep their diffs
+        clear_branch_diffs(repo_root, branch_names)
+        if not has_english_changes(repo_root, branch_names, base_branch):
+            return []
+
+        pool = self.pool(repo_root) if worktrees else None
+        failed_files = await sync_branches(repo_root, branch_names, self.scheduler, pool, base_branch)
+
+        cache_stats = index_cache.stats()
+        print(f"📊 Daemon index cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses since it started")
+        return failed_files
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+
+        def write(message):
+            if not writer.is_closing():
+                writer.write((json.dumps(message) + "\n").encode("utf-8"))
+
+        # Crews print from worker threads too
+        _job_output.set(lambda message: loop.call_soon_threadsafe(write, message))
+
+        result = {"type": "result", "failed_files": [], "error": None}
+        try:
+            request = json.loads(await reader.readline())
+            if request.get("command") != "sync":
+                raise Exception(f"Unknown command: {request.get('command')}")
+            result["failed_files"] = await self.sync(request)
+            if result["failed_files"]:
+                result["error"] = f"An error occurred while running the crew for: {', '.join(result['failed_files'])}"
+        except Exception as e:
+            result["error"] = f"{type(e).__name__}: {e}"
+
+        # After the output still queued by worker threads
+        loop.call_soon(write, result)
+        await asyncio.sleep(0)
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass  # The client went away, e.g. the push was interrupted
+
+    def _claim_socket(self):
+        if not os.path.exists(self.socket_path):
+            return
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Left behind by a daemon which didn't shut down
+                os.remove(self.socket_path)
+                return
+        raise Exception(f"A daemon is already listening on {self.socket_path}")
+
+    async def serve(self):
+        self._claim_socket()
+
+        # Loads crewAI, the LLM clients and the configs before the first push waits for them
+        MakeMyDocsBot().crew()
+
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        start_commit_batch()
+        print(f"👂 MakeMyDocsBot daemon listening on {self.socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            print_commits(stop_commit_batch())
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+
+def serve():
+    parser = argparse.ArgumentParser(description="Run the MakeMyDocsBot daemon, see make_my_docs_bot_client.")
+    parser.add_argument("--socket", default=None, help=f"Socket to listen on, or set {SOCKET_ENVIRONMENT_VARIABLE}")
+    parser.add_argument("--max_concurrency", type=int, default=4, help="Maximum number of file crews running at the same time, across every request")
+    parser.add_argument("--requests_per_minute", type=int, default=None, help="Limit on LLM requests per minute, unlimited by default")
+    parser.add_argument("--tokens_per_minute", type=int, default=None, help="Limit on LLM tokens per minute, unlimited by default")
+    parser.add_argument("--max_retries", type=int, default=2, help="How many times a failed file crew is retried")
+    args = parser.parse_args()
+
+    daemon = SyncDaemon(
+        args.socket or default_socket_path(),
+        max_concurrency=args.max_concurrency,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        max_retries=args.max_retries
+    )
+
+    sys.stdout = JobOutput(sys.stdout)
+    try:
+        asyncio.run(daemon.serve())
+    except KeyboardInterrupt:
+        pass
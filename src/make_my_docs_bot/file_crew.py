@@ -0,0 +1,140 @@
+import asyncio
+import os
+
+from make_my_docs_bot.crew import MakeMyDocsBot, translator_llm
+from make_my_docs_bot.tools.block_changes import translate_changed_blocks
+from make_my_docs_bot.tools.chunked_translation import translate_oversized_sections
+from make_my_docs_bot.tools.structure_diff import find_heading_changes, find_structural_changes, is_structure_consistent, read_base_index
+from make_my_docs_bot.tools.section_changes import find_branch_changes
+from make_my_docs_bot.tools.translation_memory import collect_translated_sections, remember_translations, translate_from_memory
+from make_my_docs_bot.tools.github_commit_tool import GitCommitTool
+from make_my_docs_bot.tools.git_diff import default_repo_root
+from make_my_docs_bot.run_manifest import english_file_hash
+from make_my_docs_bot.locales import LOCALES
+from make_my_docs_bot.instrumentation import trace_span, traced_file
+
+# The crew of one English page. Imported by main only once a run has pages to translate, this
+# pulls in crewAI, the LLM clients and every tool.
+
+# Tasks replaced by the local structural diff when no heading was added, removed or renamed and nothing is missing in the translations
+INDEX_MAPPING_TASKS = ["validate_file_structure_task", "index_fixing_task"]
+# Edit the translations in the checkout, their outputs are only saved once the commit batch holding the edits is flushed
+CHECKOUT_TASKS = ["index_fixing_task", "file_content_editor_and_git_commiter_task"]
+
+
+async def kickoff_crew(inputs, manifest=None, repo_root=None, base_branch="main"):
+    with traced_file(inputs["file_path"]):
+        return await kickoff_file_crew(inputs, manifest, repo_root, base_branch)
+
+
+async def kickoff_file_crew(inputs, manifest=None, repo_root=None, base_branch="main"):
+    # The checkout of the branch, e.g. its worktree, the tools get it instead of relying on the cwd
+    parent_dir = repo_root or default_repo_root()
+    file_path = inputs["file_path"]
+    branch_name = inputs["branch_name"]
+
+    completed_outputs = {}
+    task_callback = None
+    if manifest is not None:
+        english_hash = english_file_hash(parent_dir, file_path, branch_name)
+        completed_outputs = manifest.completed_tasks(file_path, english_hash)
+        task_callback = lambda task_output: manifest.record_task(
+            file_path, english_hash, task_output, committed_later=task_output.name in CHECKOUT_TASKS
+        )
+        if completed_outputs:
+            print(f"⏩ Resuming {file_path} after: {', '.join(completed_outputs)}")
+
+    with trace_span("find_branch_changes"):
+        english_index, changed_sections = find_branch_changes(parent_dir, file_path, base_branch, branch_name)
+        # Translations are matched to the English sections through the merge base
+        base_index = read_base_index(parent_dir, file_path, base_branch, branch_name)
+    with trace_span("translate_from_memory"):
+        updated_files = translate_from_memory(parent_dir, file_path, base_index, english_index, changed_sections)
+    if updated_files is not None:
+        print(f"🧠 Every changed section of {file_path} is in the translation memory, skipping the crew")
+        result = GitCommitTool(repo_root=parent_dir)._run(
+            feature_branch=branch_name,
+            files_to_commit=updated_files,
+            commit_message=f"Apply remembered translations of {file_path}"
+        )
+        if "error" in result:
+            raise Exception(result["error"])
+        if manifest is not None:
+            manifest.mark_completed(file_path, english_hash)
+        return result
+
+    translations_before = collect_translated_sections(parent_dir, file_path, base_index, english_index, changed_sections)
+
+    # Sections translated outside of the crew and committed right away: small edits block by block,
+    # then the sections too large for one translator answer in parallel chunks
+    with trace_span("translate_changed_blocks"):
+        block_sections, block_files = await asyncio.to_thread(
+            translate_changed_blocks, parent_dir, file_path, base_branch, branch_name, english_index, changed_sections, translator_llm
+        )
+    if block_sections:
+        print(f"✂️ Translated only the changed paragraphs of {len(block_sections)} sections of {file_path}")
+
+    remaining_sections = [pair for pair in changed_sections if pair not in block_sections]
+    with trace_span("translate_oversized_sections"):
+        chunked_sections, chunked_files = await asyncio.to_thread(
+            translate_oversized_sections, parent_dir, file_path, base_index, english_index, remaining_sections, translator_llm
+        )
+    if chunked_sections:
+        print(f"🧩 Translated {len(chunked_sections)} large sections of {file_path} in chunks")
+
+    result = None
+    handled_sections = block_sections + chunked_sections
+    if handled_sections:
+        result = GitCommitTool(repo_root=parent_dir)._run(
+            feature_branch=branch_name,
+            files_to_commit=sorted(set(block_files + chunked_files)),
+            commit_message=f"Translate the edited and large sections of {file_path}"
+        )
+        if "error" in result:
+            raise Exception(result["error"])
+
+    if len(handled_sections) == len(changed_sections):
+        remember_translations(parent_dir, changed_sections, translations_before, collect_translated_sections(parent_dir, file_path, base_index, english_index, changed_sections))
+        if manifest is not None:
+            manifest.mark_completed(file_path, english_hash)
+        return result
+
+    skipped_tasks = []
+
+    with trace_span("find_structural_changes"):
+        structural_changes = find_structural_changes(parent_dir, file_path, base_branch, branch_name)
+        heading_changes = find_heading_changes(base_index, english_index)
+    if is_structure_consistent(structural_changes, heading_changes):
+        print(f"🧭 Headings of {file_path} are unchanged and its translations have every section, skipping index mapping")
+        skipped_tasks = INDEX_MAPPING_TASKS
+
+    crew = MakeMyDocsBot(
+        repo_root=parent_dir,
+        base_branch=base_branch,
+        branch_name=branch_name,
+        skipped_tasks=skipped_tasks,
+        skipped_sections=[(section['start_line'], section['title']) for section, _ in handled_sections],
+        completed_outputs=completed_outputs,
+        task_callback=task_callback
+    ).crew()
+
+    if crew.tasks:
+        with trace_span("crew"):
+            result = await crew.kickoff_async(inputs=inputs)
+
+        translations_after = collect_translated_sections(parent_dir, file_path, base_index, english_index, changed_sections)
+        remember_translations(parent_dir, changed_sections, translations_before, translations_after)
+    else:
+        # Every task finished in a run whose commit failed, their edits are still in this checkout
+        translated_files = [locale.translated_path(file_path) for locale in LOCALES]
+        result = GitCommitTool(repo_root=parent_dir)._run(
+            feature_branch=branch_name,
+            files_to_commit=[path for path in translated_files if os.path.exists(os.path.join(parent_dir, path))],
+            commit_message=f"Translate the changes of {file_path}"
+        )
+        if "error" in result:
+            raise Exception(result["error"])
+
+    if manifest is not None:
+        manifest.mark_completed(file_path, english_hash)
+    return result
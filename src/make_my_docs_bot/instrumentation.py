@@ -0,0 +1,247 @@
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+# Path of the trace file, same as `--trace` on the command line
+TRACE_ENVIRONMENT_VARIABLE = "MAKE_MY_DOCS_BOT_TRACE"
+
+# Nothing is recorded while this is None, every hook below returns right away
+_tracer = None
+
+# English page the current code works on, set per scheduler job and per crew task thread
+_current_file = contextvars.ContextVar("make_my_docs_bot_current_file", default=None)
+
+
+class Tracer:
+    """
+    Collects the spans and counters of one run as Chrome trace events, open the written file
+    in chrome://tracing or ui.perfetto.dev. Every file gets a row per thread it ran on.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.events = []
+        self.counters = defaultdict(Counter)
+        self._rows = {}
+        self._task_files = {}
+        self._task_starts = {}
+        self._llm_starts = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def _row(self, file_path):
+        # Called with the lock held
+        key = (file_path, threading.get_ident())
+        if key not in self._rows:
+            row = len(self._rows) + 1
+            same_file_rows = sum(1 for known_file, _ in self._rows if known_file == file_path)
+            name = (file_path or "run") + (f" #{same_file_rows + 1}" if same_file_rows else "")
+            self._rows[key] = row
+            self.events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": row, "args": {"name": name}})
+        return self._rows[key]
+
+    def complete(self, name, category, started, finished, file_path=None, args=None):
+        with self._lock:
+            self.events.append({
+                "ph": "X",
+                "name": name,
+                "cat": category,
+                "pid": 1,
+                "tid": self._row(file_path),
+                "ts": round((started - self._origin) * 1e6, 3),
+                "dur": round((finished - started) * 1e6, 3),
+                "args": args or {},
+            })
+
+    def count(self, name, value=1, file_path=None):
+        with self._lock:
+            self.counters[file_path or "run"][name] += value
+
+    def write(self):
+        with self._lock:
+            trace = {
+                "traceEvents": list(self.events),
+                "displayTimeUnit": "ms",
+                "otherData": {"counters": {file_path: dict(counter) for file_path, counter in self.counters.items()}},
+            }
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return self.path
+
+    # crewAI event bus handlers, they run in the thread which emitted the event
+
+    def on_crew_started(self, crew, event):
+        file_path = (event.inputs or {}).get("file_path")
+        with self._lock:
+            for task in crew.tasks:
+                self._task_files[str(task.id)] = file_path
+
+    def on_crew_completed(self, crew, event):
+        file_path = _current_file.get()
+        token_usage = getattr(crew, "token_usage", None)
+        if token_usage is None:
+            return
+        for name in ["prompt_tokens", "completion_tokens", "cached_prompt_tokens", "total_tokens", "successful_requests"]:
+            self.count(name, getattr(token_usage, name, 0) or 0, file_path)
+
+    def on_task_started(self, source, event):
+        task_id = str(event.task.id)
+        # Async tasks run on threads of their own, which don't inherit the job's context
+        _current_file.set(self._task_files.get(task_id))
+        self._task_starts[task_id] = time.perf_counter()
+
+    def on_task_finished(self, source, event):
+        finished = time.perf_counter()
+        task = event.task
+        started = self._task_starts.pop(str(task.id), finished)
+        args = {"agent": task.agent.role.strip() if task.agent else None, "async": task.async_execution}
+        if getattr(event, "output", None) is not None:
+            args["output_bytes"] = len(event.output.raw or "")
+        if getattr(event, "error", None):
+            args["error"] = event.error
+        self.complete(task.name or task.description[:60], "task", started, finished, _current_file.get(), args)
+
+    def on_llm_started(self, source, event):
+        self._llm_starts[threading.get_ident()] = (time.perf_counter(), _message_bytes(event.messages))
+
+    def on_llm_finished(self, source, event):
+        finished = time.perf_counter()
+        started, input_bytes = self._llm_starts.pop(threading.get_ident(), (finished, 0))
+        args = {"model": getattr(event, "model", None), "task": event.task_name, "input_bytes": input_bytes}
+        if getattr(event, "response", None) is not None:
+            args["output_bytes"] = len(str(event.response))
+        if getattr(event, "error", None):
+            args["error"] = event.error
+        self.complete("llm call", "llm", started, finished, _current_file.get(), args)
+        self.count("llm_calls", 1, _current_file.get())
+
+
+def _message_bytes(messages):
+    if isinstance(messages, str):
+        return len(messages)
+    return sum(len(str(message.get("content", ""))) for message in messages or [])
+
+
+def _size(value):
+    if isinstance(value, (dict, list)):
+        return len(json.dumps(value, default=str, ensure_ascii=False))
+    return len(str(value))
+
+
+def enable_tracing(path):
+    """Starts recording the run, the trace is written to path by write_trace."""
+    global _tracer
+    from crewai.events.event_bus import crewai_event_bus
+    from crewai.events.types.crew_events import CrewKickoffCompletedEvent, CrewKickoffStartedEvent
+    from crewai.events.types.llm_events import LLMCallCompletedEvent, LLMCallFailedEvent, LLMCallStartedEvent
+    from crewai.events.types.task_events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent
+
+    if os.path.isdir(path):
+        path = os.path.join(path, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+
+    tracer = Tracer(path)
+    for event_type, handler in [
+        (CrewKickoffStartedEvent, tracer.on_crew_started),
+        (CrewKickoffCompletedEvent, tracer.on_crew_completed),
+        (TaskStartedEvent, tracer.on_task_started),
+        (TaskCompletedEvent, tracer.on_task_finished),
+        (TaskFailedEvent, tracer.on_task_finished),
+        (LLMCallStartedEvent, tracer.on_llm_started),
+        (LLMCallCompletedEvent, tracer.on_llm_finished),
+        (LLMCallFailedEvent, tracer.on_llm_finished),
+    ]:
+        crewai_event_bus.register_handler(event_type, handler)
+
+    _tracer = tracer
+    return tracer
+
+
+def write_trace():
+    """Writes the trace of the run and returns its path, None when tracing is off."""
+    return _tracer.write() if _tracer is not None else None
+
+
+@contextlib.contextmanager
+def traced_file(file_path):
+    """Everything recorded inside belongs to the English page file_path."""
+    if _tracer is None:
+        yield
+        return
+
+    token = _current_file.set(file_path)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tracer.complete(file_path, "file", started, time.perf_counter(), file_path)
+        _current_file.reset(token)
+
+
+@contextlib.contextmanager
+def trace_span(name, category="stage"):
+    if _tracer is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _tracer.complete(name, category, started, time.perf_counter(), _current_file.get())
+
+
+def trace_tool_run(run):
+    """Decorator for BaseTool._run, records the tool's time and the size of its inputs and output."""
+    @functools.wraps(run)
+    def traced_run(self, *args, **kwargs):
+        if _tracer is None:
+            return run(self, *args, **kwargs)
+
+        started = time.perf_counter()
+        result = None
+        error = None
+        try:
+            result = run(self, *args, **kwargs)
+            if isinstance(result, dict) and "error" in result:
+                error = result["error"]
+            return result
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            finished = time.perf_counter()
+            file_path = _current_file.get()
+            tool_args = {"input_bytes": _size([args, kwargs]), "output_bytes": _size(result) if result is not None else 0}
+            if error:
+                tool_args["error"] = error
+            _tracer.complete(self.name, "tool", started, finished, file_path, tool_args)
+            _tracer.count(f"tool: {self.name}", 1, file_path)
+
+    return traced_run
+
+
+def count(name, value=1):
+    """Adds value to the counter name of the current file, e.g. cache hits."""
+    if _tracer is not None:
+        _tracer.count(name, value, _current_file.get())
+
+
+def count_subprocess(command):
+    """Counts a subprocess by its command, git sub commands are counted separately."""
+    if _tracer is None:
+        return
+    arguments = list(command)
+    name = os.path.basename(arguments[0])
+    if name == "git":
+        rest = arguments[1:]
+        while len(rest) > 1 and rest[0] == "-c":
+            rest = rest[2:]
+        name = f"git {rest[0]}" if rest else name
+    _tracer.count(f"subprocess: {name}", 1, _current_file.get())
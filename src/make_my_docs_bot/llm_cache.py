@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+
+# Imported by main and the client before a run is known to need a crew, keep these dependency free
+from make_my_docs_bot.tools.change_significance import normalize_section
+from make_my_docs_bot.tools.git_diff import default_repo_root, get_state_directory
+
+# record, replay or passthrough, same as `--llm_cache` on the command line
+LLM_CACHE_ENVIRONMENT_VARIABLE = "MAKE_MY_DOCS_BOT_LLM_CACHE"
+# Where the responses are kept, .git/make_my_docs_bot/llm_cache by default
+LLM_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE = "MAKE_MY_DOCS_BOT_LLM_CACHE_DIR"
+LLM_CACHE_MODES = ["record", "replay", "passthrough"]
+# Commits the commit tool reports, their ids change with the time of every run
+COMMIT_ID = re.compile(r"(committed to branch '[^']*' successfully as )[0-9a-f]{7,40}")
+
+# Every LLM of the crews goes through this cache while it is set, see cached_llm
+_cache = None
+
+
+class LLMCacheMiss(LookupError):
+    """A replayed run asked for a response which was never recorded."""
+
+
+class LLMResponseCache:
+    """
+    Responses of the models on disk, one JSON file per response named after the hash of the model,
+    the normalized prompt, the tool schemas and the stop words.
+
+    In record mode every call goes to the model and its response is stored, in replay mode
+    every response comes from the disk and a missing one raises LLMCacheMiss, so a replayed
+    run is repeatable. crewAI's instructor parsing bypasses the cache, see cached_llm.
+    """
+
+    def __init__(self, directory, mode, repo_root=None):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown LLM cache mode {mode}, use one of {', '.join(LLM_CACHE_MODES)}")
+        self.directory = directory
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+        # Checkouts show up in tool outputs, a recording is replayed from any of them
+        self._checkouts = []
+        if repo_root is not None:
+            worktrees = os.path.join(get_state_directory(repo_root), "worktrees")
+            self._checkouts = [re.compile(re.escape(worktrees) + r"/[^/\s\"']+"), re.compile(re.escape(os.path.abspath(repo_root)))]
+
+    def normalize_prompt(self, messages):
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        normalized = []
+        for message in messages:
+            content = str(message.get("content") or "")
+            for checkout in self._checkouts:
+                content = checkout.sub("<repo_root>", content)
+            content = COMMIT_ID.sub(r"\1<commit>", content)
+            normalized.append({"role": message.get("role"), "content": normalize_section(content)})
+        return normalized
+
+    def key(self, model, messages, tools=None, stop=None) -> str:
+        source = {
+            "model": model,
+            "messages": self.normalize_prompt(messages),
+            "tools": tools or [],
+            "stop": sorted(stop or []),
+        }
+        return hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            with self._lock:
+                self.misses += 1
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        with self._lock:
+            self.hits += 1
+        return entry["response"]
+
+    def put(self, key, model, messages, response):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {"model": model, "messages": self.normalize_prompt(messages), "response": response, "recorded_at": time.time()}
+        # Renamed into place, concurrent crews recording the same prompt don't see half a file
+        descriptor, temporary_path = tempfile.mkstemp(prefix=".response-", suffix=".tmp", dir=os.path.dirname(path))
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=2, ensure_ascii=False)
+        os.replace(temporary_path, path)
+        with self._lock:
+            self.recorded += 1
+
+    def stats(self):
+        with self._lock:
+            return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "recorded": self.recorded}
+
+
+def enable_llm_cache(mode, directory=None, repo_root=None):
+    """Sends every LLM call of the crews through the cache, passthrough turns it off."""
+    global _cache
+    if mode in (None, "", "passthrough"):
+        _cache = None
+        return None
+
+    repo_root = repo_root or default_repo_root()
+    directory = directory or os.environ.get(LLM_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE) or os.path.join(get_state_directory(repo_root), "llm_cache")
+    _cache = LLMResponseCache(directory, mode, repo_root)
+    print(f"📼 LLM responses: {mode} ({directory})")
+    return _cache
+
+
+def enable_llm_cache_from_environment():
+    return enable_llm_cache(os.environ.get(LLM_CACHE_ENVIRONMENT_VARIABLE))
+
+
+def get_llm_cache():
+    return _cache
@@ -0,0 +1,87 @@
+from typing import Any, Optional
+
+from crewai.agents.agent_builder.base_agent import BaseAgent
+
+from make_my_docs_bot.pydantic_models import FileContentUpdates
+from make_my_docs_bot.tools.git_diff import default_repo_root
+from make_my_docs_bot.tools.github_commit_tool import GitCommitTool
+from make_my_docs_bot.tools.read_write_tool import FileContentBatchUpdaterTool
+from make_my_docs_bot.tools.update_repair import UpdateRepairError, repair_content_updates
+
+
+class LocalEditorAgent(BaseAgent):
+    """
+    Editor of the crew which needs no model. The translators' FileContentUpdates are repaired
+    against the heading index of their files, applied in one batch and committed to branch_name.
+
+    Updates it can't repair, or translator outputs which didn't parse, are handed to the LLM
+    editor agent in fallback, which gets the task as it would without this agent.
+    """
+
+    branch_name: str
+    repo_root: Optional[str] = None
+    fallback: Optional[BaseAgent] = None
+    # Set by the crew on every agent before the kickoff
+    function_calling_llm: Any = None
+    step_callback: Any = None
+
+    def execute_task(self, task, context=None, tools=None) -> str:
+        updates = []
+        for context_task in task.context or []:
+            if context_task.output is None or not isinstance(context_task.output.pydantic, FileContentUpdates):
+                return self.fall_back(task, context, tools, f"No structured output from {context_task.name}")
+            updates.extend(context_task.output.pydantic.updates)
+
+        repo_root = self.repo_root or default_repo_root()
+        try:
+            updates, notes = repair_content_updates(repo_root, updates)
+        except UpdateRepairError as e:
+            return self.fall_back(task, context, tools, str(e))
+        for note in notes:
+            print(f"🛠️ Repaired {note}")
+        if not updates:
+            return "No translation updates to apply."
+
+        result = FileContentBatchUpdaterTool(repo_root=self.repo_root)._run(updates=updates)
+        if "error" in result:
+            return self.fall_back(task, context, tools, result["error"])
+
+        files_to_commit = sorted({update.FILE_PATH for update in updates})
+        commit = GitCommitTool(repo_root=self.repo_root)._run(
+            feature_branch=self.branch_name,
+            files_to_commit=files_to_commit,
+            commit_message=f"Translate the changes of {', '.join(files_to_commit)}"
+        )
+        if "error" in commit:
+            raise Exception(commit["error"])
+
+        applied = "\n".join(
+            f"- File: {update.FILE_PATH}\n - Lines Changed: {update.CONTENT_TO_BE_DELETED_START_LINE} - {update.CONTENT_TO_BE_DELETED_END_LINE}"
+            for update in updates
+        )
+        return f"{applied}\n- Git Commit Summary:\n - Feature Branch: {self.branch_name}\n - {commit['message']}"
+
+    def fall_back(self, task, context, tools, reason):
+        if self.fallback is None:
+            raise UpdateRepairError(reason)
+        print(f"🛠️ {reason}, handing the updates to the {self.fallback.role.strip()} agent")
+        # What the crew set on this agent before the kickoff
+        self.fallback.crew = self.crew
+        self.fallback.i18n = self.i18n
+        return self.fallback.execute_task(task, context, tools)
+
+    def copy(self):
+        # crewAI copies the agents to train or test a crew, through a model_dump which can't hold the fallback's tools
+        fallback, self.fallback = self.fallback, None
+        try:
+            copied = super().copy()
+        finally:
+            self.fallback = fallback
+        copied.fallback = fallback.copy() if fallback is not None else None
+        return copied
+
+    def create_agent_executor(self, tools=None) -> None:
+        pass
+
+    def get_delegation_tools(self, agents):
+        return []
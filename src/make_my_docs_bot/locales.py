@@ -0,0 +1,74 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+ENGLISH_DIRECTORY = "docs/en"
+
+LOCALES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config", "locales.yaml")
+
+
+@dataclass(frozen=True)
+class Locale:
+    """One translation of docs/en, see config/locales.yaml."""
+
+    key: str
+    code: str
+    language: str
+    directory: str
+    llm: Optional[str] = None
+
+    @property
+    def task_name(self) -> str:
+        return f"{self.key}_documentation_translator_task"
+
+    def translated_path(self, file_path) -> str:
+        """Path of the translation of the English file_path"""
+        return file_path.replace(ENGLISH_DIRECTORY, self.directory, 1)
+
+
+def load_locales(path=LOCALES_PATH) -> List[Locale]:
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    return [
+        Locale(key=key, code=str(values["code"]), language=values["language"], directory=values["directory"].rstrip("/"), llm=values.get("llm"))
+        for key, values in config.items()
+    ]
+
+
+LOCALES = load_locales()
+
+
+def get_locale(key) -> Locale:
+    for locale in LOCALES:
+        if locale.key == key:
+            return locale
+    raise KeyError(f"Unknown locale {key}, see {LOCALES_PATH}")
+
+
+def language_names(locales=None) -> str:
+    """e.g. "Korean and Portuguese (Brazil)", for the prompts mentioning every language"""
+    names = [locale.language for locale in (LOCALES if locales is None else locales)]
+    if len(names) < 2:
+        return "".join(names)
+    return ", ".join(names[:-1]) + " and " + names[-1]
+
+
+def map_locales(function: Callable, locales=None) -> Dict[Locale, object]:
+    """
+    {locale: function(locale)} for every locale, called concurrently, e.g. indexing every translation
+    of a page once the English side is done. The calls see the caller's context, so what they record
+    in the trace still belongs to the caller's file.
+    """
+    locales = LOCALES if locales is None else list(locales)
+    if len(locales) < 2:
+        return {locale: function(locale) for locale in locales}
+
+    contexts = [contextvars.copy_context() for _ in locales]
+    with ThreadPoolExecutor(max_workers=len(locales)) as pool:
+        results = pool.map(lambda context, locale: context.run(function, locale), contexts, locales)
+        return dict(zip(locales, results))
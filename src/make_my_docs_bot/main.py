@@ -2,12 +2,19 @@
 import sys
 import warnings
 
-from datetime import datetime
-
-from make_my_docs_bot.crew import MakeMyDocsBot
+# Only modules which don't import crewAI, so a push without English changes is done in milliseconds.
+# The crew is imported when there is something to translate
+from make_my_docs_bot.tools.index_cache import index_cache
+from make_my_docs_bot.tools.git_diff import default_repo_root, get_branch_diff, run_git
+from make_my_docs_bot.tools.section_changes import find_branch_changes
+from make_my_docs_bot.scheduler import CrewJob, CrewScheduler, estimate_tokens
+from make_my_docs_bot.tools.git_commit_engine import flush_commit_batch, start_commit_batch, stop_commit_batch
+from make_my_docs_bot.worktree_pool import WorktreePool
+from make_my_docs_bot.run_manifest import RunManifest, english_file_hash
+from make_my_docs_bot.instrumentation import TRACE_ENVIRONMENT_VARIABLE, enable_tracing, trace_span, write_trace
+from make_my_docs_bot.llm_cache import LLM_CACHE_ENVIRONMENT_VARIABLE, LLM_CACHE_MODES, enable_llm_cache, get_llm_cache
 import argparse
 import os
-import subprocess
 import asyncio
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
@@ -17,6 +24,151 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+
+def print_crew_event(event):
+    if event.status == "started":
+        print(f"🚀 Executing crew for file: {event.file_path} (attempt {event.attempt})")
+    elif event.status == "completed":
+        print(f"✅ Crew finished for file: {event.file_path} in {event.elapsed:.1f}s")
+    elif event.status == "retrying":
+        print(f"🔁 Crew failed for file: {event.file_path}, retrying: {event.error}")
+    else:
+        print(f"❌ Crew failed for file: {event.file_path}: {event.error}")
+
+
+def find_files_to_translate(repo_root, base_branch, branch_name):
+    """
+    English pages changed between base_branch and branch_name, split into those with changes
+    to translate and those where only the formatting changed, see change_significance.
+    """
+    # One git diff for every English page, the analyzer tools reuse the parsed hunks
+    files_to_translate, formatting_only_files = [], []
+    for changed_file in get_branch_diff(repo_root, base_branch, branch_name):
+        _, changed_sections = find_branch_changes(repo_root, changed_file, base_branch, branch_name)
+        (files_to_translate if changed_sections else formatting_only_files).append(changed_file)
+    return files_to_translate, formatting_only_files
+
+
+async def sync_branch(repo_root, branch_name, scheduler, base_branch="main", on_event=print_crew_event, manifest=None):
+    """
+    Runs one crew for every English page changed between base_branch and branch_name,
+    streaming the scheduler events to on_event. Returns the files whose crew failed.
+    Files where only the formatting changed, and files which the manifest records as
+    completed for their current English content, are skipped.
+    """
+    changed_files, formatting_only_files = find_files_to_translate(repo_root, base_branch, branch_name)
+    for formatting_only_file in formatting_only_files:
+        print(f"🪶 Only the formatting of {formatting_only_file} changed, skipping")
+
+    if manifest is not None:
+        completed_files = [
+            changed_file for changed_file in changed_files
+            if manifest.is_completed(changed_file, english_file_hash(repo_root, changed_file, branch_name))
+        ]
+        for completed_file in completed_files:
+            print(f"⏭️ {completed_file} was completed by an earlier run, skipping")
+        changed_files = [changed_file for changed_file in changed_files if changed_file not in completed_files]
+
+    jobs = [
+        CrewJob(
+            file_path=changed_file,
+            inputs={
+                "branch_name": branch_name,
+                "file_path": changed_file
+            },
+            estimated_tokens=estimate_tokens(os.path.join(repo_root, changed_file)),
+            kickoff_options={"manifest": manifest, "repo_root": repo_root, "base_branch": base_branch}
+        )
+        for changed_file in changed_files
+    ]
+
+    if not jobs:
+        print(f"No inputs for crew to run, run cancelled")
+        return []
+
+    failed_files = []
+    async for event in scheduler.run(jobs):
+        on_event(event)
+        if event.status == "failed":
+            failed_files.append(event.file_path)
+
+    print(f"Crew executed for branch: {branch_name}")
+    cache_stats = index_cache.stats()
+    print(f"📊 Index cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
+    return failed_files
+
+
+def print_commits(commits):
+    for committed_branch, commit in commits.items():
+        if commit is not None:
+            print(f"📦 Committed the translations to {committed_branch} as {commit[:12]}")
+
+
+async def sync_branch_checkout(repo_root, branch_name, scheduler, pool=None, base_branch="main", on_event=print_crew_event):
+    """
+    sync_branch in the current checkout, or in a worktree of the pool, then commits the branch's
+    translations. Returns the failed files, prefixed with the branch when running in a worktree.
+    """
+    branch_root = repo_root
+    if pool is not None:
+        branch_root = await asyncio.to_thread(pool.acquire, branch_name)
+        print(f"🌳 Syncing {branch_name} in {branch_root}")
+
+    try:
+        # Progress of earlier runs of this branch, so a rerun after a failure only redoes what is left
+        manifest = RunManifest.load(branch_root, branch_name, base_branch)
+        try:
+            failed_files = await sync_branch(branch_root, branch_name, scheduler, base_branch, on_event, manifest)
+        finally:
+            # Also after a failure, so the files of the crews which did finish are not left uncommitted
+            with trace_span("commit"):
+                try:
+                    commits = await asyncio.to_thread(flush_commit_batch, [branch_name], branch_root)
+                except Exception:
+                    # A worktree is reset before its next run, this checkout keeps the edits to commit
+                    if pool is None:
+                        manifest.save_pending_tasks()
+                    raise
+            print_commits(commits)
+            # Not before, a rerun after a failed commit must translate those files again
+            manifest.save_completed()
+    finally:
+        if pool is not None:
+            await asyncio.to_thread(pool.release, branch_root)
+
+    if pool is not None:
+        return [f"{branch_name}:{failed_file}" for failed_file in failed_files]
+    return failed_files
+
+
+def check_sync_request(repo_root, branch_names, worktrees):
+    if not os.path.exists(os.path.join(repo_root, ".git")):
+        raise Exception(f"{repo_root} is not a git repository")
+
+    if len(branch_names) > 1 and not worktrees:
+        raise Exception("Several branches can only be synced in worktrees, pass --worktrees")
+
+
+def has_english_changes(repo_root, branch_names, base_branch="main"):
+    """
+    Whether any branch changed a docs/en page beyond its formatting, most pushes don't and
+    need neither crewAI nor a crew.
+    """
+    if any(find_files_to_translate(repo_root, base_branch, branch_name)[0] for branch_name in branch_names):
+        return True
+    print(f"📭 No English docs changed on {', '.join(branch_names)} beyond formatting, nothing to translate")
+    return False
+
+
+async def sync_branches(repo_root, branch_names, scheduler, pool=None, base_branch="main"):
+    """sync_branch_checkout of every branch at the same time, returns the failed files of all of them."""
+    results = await asyncio.gather(*[
+        sync_branch_checkout(repo_root, branch_name, scheduler, pool, base_branch)
+        for branch_name in branch_names
+    ])
+    return [failed_file for result in results for failed_file in result]
+
+
 async def run():
     """
     Run the crew, accepting a branch_name parameter from the CLI.
@@ -24,84 +176,151 @@ async def run():
 
     # Parse CLI arguments
     parser = argparse.ArgumentParser(description="Run MakeMyDocsBot crew.")
-    parser.add_argument("--branch_name", default="main", help="Branch name to compare against main")
+    parser.add_argument("--branch_name", nargs="+", default=["main"], help="Branch names to compare against the base branch, several need --worktrees")
+    parser.add_argument("--base_branch", default="main", help="Branch the English changes are compared against")
+    parser.add_argument("--worktrees", action="store_true", help="Sync every branch in a pooled git worktree instead of the current checkout, so branches run in parallel")
+    parser.add_argument("--max_concurrency", type=int, default=4, help="Maximum number of file crews running at the same time")
+    parser.add_argument("--requests_per_minute", type=int, default=None, help="Limit on LLM requests per minute, unlimited by default")
+    parser.add_argument("--tokens_per_minute", type=int, default=None, help="Limit on LLM tokens per minute, unlimited by default")
+    parser.add_argument("--max_retries", type=int, default=2, help="How many times a failed file crew is retried")
+    parser.add_argument(
+        "--llm_cache",
+        choices=LLM_CACHE_MODES,
+        default=os.environ.get(LLM_CACHE_ENVIRONMENT_VARIABLE),
+        help=f"Record the LLM responses to disk, replay a recorded run, or call the models without the cache (the default), or set {LLM_CACHE_ENVIRONMENT_VARIABLE}"
+    )
+    parser.add_argument(
+        "--trace",
+        default=os.environ.get(TRACE_ENVIRONMENT_VARIABLE),
+        help=f"Write a Chrome trace of the run (tools, tasks, LLM calls, tokens, cache hits, subprocesses) to this file or directory, or set {TRACE_ENVIRONMENT_VARIABLE}"
+    )
     args = parser.parse_args()
-    branch_name = args.branch_name
+    branch_names = args.branch_name
 
     # Get parent directory of current working directory
-    parent_dir = os.path.dirname(os.getcwd())
-
-    if not os.path.exists(os.path.join(parent_dir, ".git")):
-        raise Exception(f"{parent_dir} is not a git repository")
-
-    # Run git diff in parent directory
-    cmd = ["git", "diff", "--name-only", f"main...{branch_name}", "--", "*.mdx"]
-    result = subprocess.run(cmd, cwd=parent_dir, capture_output=True, text=True)
-    changed_files = [
-        f.strip()
-        for f in result.stdout.splitlines()
-        if f.strip() and f.startswith("docs/en/")
-    ]
+    parent_dir = default_repo_root()
 
-    # Prepare inputs
-    inputs = []
-
-    for changed_file in changed_files:
-        input = {
-        "branch_name": branch_name,
-        "file_path": changed_file
-        }
-        print(f"🚀 Executing crew for branch: {branch_name} and file: {changed_file}")
-        inputs.append(input)
-    
-    if len(inputs):
-        try:
-            await MakeMyDocsBot().crew().kickoff_for_each_async(inputs = inputs)
-            print(f"Crew executed for branch: {branch_name}")
-        except Exception as e:
-            raise Exception(f"An error occurred while running the crew: {e}")
+    check_sync_request(parent_dir, branch_names, args.worktrees)
+
+    # Most pushes don't touch docs/en, they end here before crewAI is imported
+    if not has_english_changes(parent_dir, branch_names, args.base_branch):
+        return
+
+    from make_my_docs_bot.file_crew import kickoff_crew
+
+    enable_llm_cache(args.llm_cache, repo_root=parent_dir)
+    if args.trace:
+        enable_tracing(args.trace)
+
+    # Shared by every branch, max_concurrency and the rate limits hold for the whole run
+    scheduler = CrewScheduler(
+        kickoff=kickoff_crew,
+        max_in_flight=args.max_concurrency,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        max_retries=args.max_retries
+    )
+    pool = WorktreePool(parent_dir) if args.worktrees else None
+
+    # The translations of every crew of a branch end up in one commit, made once its crews are done
+    start_commit_batch()
+
+    try:
+        failed_files = await sync_branches(parent_dir, branch_names, scheduler, pool, args.base_branch)
+    finally:
+        # Nothing should be left, unless a branch failed before its own commit
+        with trace_span("commit"):
+            commits = stop_commit_batch()
+        print_commits(commits)
+        trace_path = write_trace()
+        if trace_path:
+            print(f"🧾 Trace written to {trace_path}")
+        print_llm_cache_stats(get_llm_cache())
+
+    if failed_files:
+        raise Exception(f"An error occurred while running the crew for: {', '.join(failed_files)}")
+
+
+def print_llm_cache_stats(cache):
+    if cache is not None:
+        stats = cache.stats()
+        print(f"📼 LLM cache ({stats['mode']}): {stats['hits']} replayed, {stats['recorded']} recorded, {stats['misses']} missing")
+
+
+def crew_inputs(arguments, usage):
+    """
+    Inputs of the crew of one English page, the same run gives it, for train and test. arguments are
+    the page, e.g. docs/en/concepts/agents.mdx, and optionally its branch, the checked out one by default.
+    """
+    if not arguments:
+        raise Exception(f"Pass the English page the crew works on, e.g. {usage}")
+    repo_root = default_repo_root()
+    if len(arguments) > 1:
+        branch_name = arguments[1]
     else:
-        print(f"No inputs for crew to run, run cancelled")
+        result = run_git(["rev-parse", "--abbrev-ref", "HEAD"], cwd=repo_root)
+        if result.returncode != 0:
+            raise Exception(f"Could not find the checked out branch of {repo_root}: {result.stderr.strip()}")
+        branch_name = result.stdout.strip()
+    return repo_root, {"branch_name": branch_name, "file_path": arguments[0]}
 
 
 def train():
     """
     Train the crew for a given number of iterations.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        'current_year': str(datetime.now().year)
-    }
+    repo_root, inputs = crew_inputs(sys.argv[3:], "uv run train 1 training.pkl docs/en/concepts/agents.mdx [branch]")
+    from make_my_docs_bot.crew import MakeMyDocsBot
+    from make_my_docs_bot.llm_cache import enable_llm_cache_from_environment
+
+    # MAKE_MY_DOCS_BOT_LLM_CACHE=record or replay, to iterate on the prompts without paying twice
+    cache = enable_llm_cache_from_environment()
     try:
-        MakeMyDocsBot().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        crew = MakeMyDocsBot(repo_root=repo_root, branch_name=inputs["branch_name"]).crew()
+        crew.train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
+    finally:
+        print_llm_cache_stats(cache)
 
 def replay():
     """
     Replay the crew execution from a specific task.
     """
+    from make_my_docs_bot.crew import MakeMyDocsBot
+    from make_my_docs_bot.llm_cache import enable_llm_cache_from_environment
+
+    cache = enable_llm_cache_from_environment()
     try:
         MakeMyDocsBot().crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
+    finally:
+        print_llm_cache_stats(cache)
 
 def test():
     """
     Test the crew execution and returns the results.
     """
-    inputs = {
-        "topic": "AI LLMs",
-        "current_year": str(datetime.now().year)
-    }
-    
+    repo_root, inputs = crew_inputs(sys.argv[3:], "uv run test 1 gpt-4o docs/en/concepts/agents.mdx [branch]")
+    from make_my_docs_bot.crew import MakeMyDocsBot
+    from make_my_docs_bot.cached_llm import cached_llm
+    from make_my_docs_bot.llm_cache import enable_llm_cache_from_environment
+    from crewai.utilities.llm_utils import create_llm
+
+    cache = enable_llm_cache_from_environment()
+    # The evaluations are recorded and replayed like the crew's own calls
+    eval_llm = cached_llm(create_llm(sys.argv[2])) if cache is not None else sys.argv[2]
     try:
-        MakeMyDocsBot().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        crew = MakeMyDocsBot(repo_root=repo_root, branch_name=inputs["branch_name"]).crew()
+        crew.test(n_iterations=int(sys.argv[1]), eval_llm=eval_llm, inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
+    finally:
+        print_llm_cache_stats(cache)
 
 # This is the sync entry point for pyproject.toml
 def main():
@@ -10,7 +10,7 @@ class SectionChange(BaseModel):
     NEXT_SECTION: Optional[str] = Field(None, description="Title of the next section.")
     NEXT_SECTION_START_LINE: Optional[int] = Field(None, description="Line number where the next section will start.")
     NEXT_SECTION_END_LINE: Optional[int] = Field(None, description="Line number where the next section will end.")
-    NEW_HEADING_TRANSLATED: str = Field(..., description="New heading which needs to be inserted in the language (Korean or Portuguese(Brazil)), don't include English component here. Korean or Portuguese (Brazil) depending on the whether Previous sections are Korean or in Portuguese (Brazil)")
+    NEW_HEADING_TRANSLATED: str = Field(..., description="New heading which needs to be inserted in the language of the translated file, don't include English component here. The language depends on the language of the previous sections")
     LEVEL: int = Field(..., ge=1, le=4, description="The level of the heading (1 to 4).")
     REASON: str = Field(..., description="Explanation for how the heading position was determined, referencing nearby sections.")
 
@@ -39,8 +39,8 @@ class FileChanges(BaseModel):
 
 class FileContentUpdate(BaseModel):
     FILE_PATH: str = Field(..., description="Path to the file that needs to be updated.")
-    CONTENT_TO_BE_DELETED_START_LINE: int = Field(..., ge=-1, description="Line number where content deletion starts (-1 if not applicable).")
-    CONTENT_TO_BE_DELETED_END_LINE: int = Field(..., ge=-1, description="Line number where content deletion ends (-1 if not applicable).")
+    CONTENT_TO_BE_DELETED_START_LINE: int = Field(..., ge=-1, description="0-based line number where content deletion starts, as given by the mapping tool (-1 if not applicable).")
+    CONTENT_TO_BE_DELETED_END_LINE: int = Field(..., ge=-1, description="0-based line number where content deletion ends, included (-1 if not applicable).")
     NEW_CONTENT: str = Field(..., description="New translated or replacement content to be added to the file.")
 
 class FileContentUpdates(BaseModel):
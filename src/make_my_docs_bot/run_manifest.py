@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+from make_my_docs_bot.tools.git_diff import get_state_directory, run_git
+from make_my_docs_bot.tools.section_changes import read_english_file
+
+
+def english_file_hash(repo_root, file_path, branch_name):
+    """Hash of the English file on the branch, a file is only resumed while its source is unchanged."""
+    content = read_english_file(repo_root, file_path, branch_name)
+    if not isinstance(content, bytes):
+        with open(content, "rb") as f:
+            content = f.read()
+    return hashlib.sha1(content).hexdigest()
+
+
+class RunManifest:
+    """
+    Progress of the crews of one branch, persisted under the git dir so a rerun after a failure
+    skips completed files and resumes partially processed ones after their last completed task.
+
+    The manifest is bound to the branch and the SHA of the base branch, every file entry to the
+    hash of its English source, and is started over whenever one of them changes. Files marked
+    completed, and the tasks recorded as committed later, are only saved by save_completed, once
+    their translations are committed.
+    """
+
+    def __init__(self, path, branch_name, base_sha, data=None):
+        self.path = path
+        self.branch_name = branch_name
+        self.base_sha = base_sha
+        self._lock = threading.Lock()
+        # file_path -> english_hash of the files completed since the last save_completed
+        self._pending_completions = {}
+        # (file_path, english_hash) -> {task_name: output} of the tasks whose edits wait in the commit batch
+        self._pending_tasks = {}
+
+        if data and data.get("branch_name") == branch_name and data.get("base_sha") == base_sha:
+            self.files = data.get("files", {})
+        else:
+            self.files = {}
+
+    @classmethod
+    def load(cls, repo_root, branch_name, base_branch="main"):
+        manifest_directory = os.path.join(get_state_directory(repo_root), "manifests")
+        os.makedirs(manifest_directory, exist_ok=True)
+        path = os.path.join(manifest_directory, re.sub(r"[^A-Za-z0-9._-]", "_", branch_name) + ".json")
+
+        result = run_git(["rev-parse", "--verify", base_branch], cwd=repo_root)
+        base_sha = result.stdout.strip() if result.returncode == 0 else None
+
+        data = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = None
+
+        return cls(path, branch_name, base_sha, data)
+
+    def _save(self):
+        temporary_path = self.path + ".tmp"
+        with open(temporary_path, "w", encoding="utf-8") as f:
+            json.dump({"branch_name": self.branch_name, "base_sha": self.base_sha, "files": self.files}, f, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def _entry(self, file_path, english_hash):
+        entry = self.files.get(file_path)
+        if entry is None or entry.get("english_hash") != english_hash:
+            entry = {"english_hash": english_hash, "completed": False, "tasks": {}}
+            self.files[file_path] = entry
+        return entry
+
+    def is_completed(self, file_path, english_hash):
+        with self._lock:
+            entry = self.files.get(file_path)
+            return bool(entry and entry.get("english_hash") == english_hash and entry.get("completed"))
+
+    def completed_tasks(self, file_path, english_hash):
+        """{task_name: {"raw": ..., "pydantic": ...}} of the tasks already completed for the file."""
+        with self._lock:
+            return dict(self._entry(file_path, english_hash)["tasks"])
+
+    def record_task(self, file_path, english_hash, task_output, committed_later=False):
+        """
+        Saves the output of a completed task. committed_later holds it until save_completed, for the
+        tasks whose edits wait in the commit batch and must be made again when committing them fails.
+        """
+        pydantic_output = task_output.pydantic.model_dump() if task_output.pydantic is not None else None
+        recorded = {"raw": task_output.raw, "pydantic": pydantic_output}
+        with self._lock:
+            if committed_later:
+                self._pending_tasks.setdefault((file_path, english_hash), {})[task_output.name] = recorded
+                return
+            self._entry(file_path, english_hash)["tasks"][task_output.name] = recorded
+            self._save()
+
+    def mark_completed(self, file_path, english_hash):
+        """The file's crew is done, its translations may still wait in the commit batch."""
+        with self._lock:
+            self._pending_completions[file_path] = english_hash
+
+    def save_completed(self):
+        """Saves the files marked completed so far, call once the commit batch holding their translations is flushed."""
+        with self._lock:
+            if not self._pending_completions and not self._pending_tasks:
+                return
+            self._move_pending_tasks()
+            for file_path, english_hash in self._pending_completions.items():
+                self._entry(file_path, english_hash)["completed"] = True
+            self._pending_completions.clear()
+            self._save()
+
+    def save_pending_tasks(self):
+        """
+        Saves the tasks held by record_task but not the completions, when committing failed in a
+        checkout which keeps their edits, so a rerun commits the edits instead of making them twice.
+        """
+        with self._lock:
+            if not self._pending_tasks:
+                return
+            self._move_pending_tasks()
+            self._save()
+
+    def _move_pending_tasks(self):
+        for (file_path, english_hash), tasks in self._pending_tasks.items():
+            self._entry(file_path, english_hash)["tasks"].update(tasks)
+        self._pending_tasks.clear()
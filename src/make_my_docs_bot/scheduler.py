@@ -0,0 +1,145 @@
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Rough prompt size of one crew, every task sends the changed page or its index at least once
+CHARS_PER_TOKEN = 4
+TASKS_PER_CREW = 6
+
+
+class TokenBucket:
+    """Allows `rate_per_minute` units per minute, bursting up to one minute worth of units."""
+
+    def __init__(self, rate_per_minute):
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(rate_per_minute)
+        self.available = float(rate_per_minute)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+
+    async def acquire(self, amount):
+        # A single job bigger than the bucket waits for a full bucket instead of forever
+        amount = min(float(amount), self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.available < amount:
+                await asyncio.sleep((amount - self.available) / self.rate_per_second)
+                self._refill()
+            self.available -= amount
+
+
+@dataclass
+class CrewJob:
+    """One file to run a crew for."""
+    file_path: str
+    inputs: Dict[str, Any]
+    estimated_tokens: int = 0
+    attempts: int = 0
+    # Keyword arguments of kickoff besides the crew inputs, e.g. the checkout of the job's branch
+    kickoff_options: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class CrewEvent:
+    """Streamed by CrewScheduler.run, status is "started", "retrying", "completed" or "failed"."""
+    file_path: str
+    status: str
+    attempt: int
+    elapsed: float = 0.0
+    result: Any = None
+    error: Optional[str] = None
+
+
+def estimate_tokens(file_path):
+    try:
+        return (os.path.getsize(file_path) // CHARS_PER_TOKEN) * TASKS_PER_CREW
+    except OSError:
+        return 0
+
+
+@dataclass
+class CrewScheduler:
+    """
+    Runs one crew per job with at most `max_in_flight` crews at a time.
+
+    Crew starts are also paced by optional requests and tokens per minute buckets,
+    each crew is charged TASKS_PER_CREW requests and its estimated tokens. Larger
+    files are started first, failed files are retried with exponential backoff.
+    """
+    kickoff: Callable[[Dict[str, Any]], Awaitable[Any]]
+    max_in_flight: int = 4
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    max_retries: int = 2
+    retry_backoff: float = 5.0
+    _request_bucket: Optional[TokenBucket] = field(default=None, init=False)
+    _token_bucket: Optional[TokenBucket] = field(default=None, init=False)
+    # Shared by every concurrent run, e.g. one per branch, so max_in_flight holds for all of them
+    _semaphore: Optional[asyncio.Semaphore] = field(default=None, init=False)
+
+    def __post_init__(self):
+        if self.requests_per_minute:
+            self._request_bucket = TokenBucket(self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._token_bucket = TokenBucket(self.tokens_per_minute)
+
+    async def _throttle(self, job):
+        if self._request_bucket is not None:
+            await self._request_bucket.acquire(TASKS_PER_CREW)
+        if self._token_bucket is not None:
+            await self._token_bucket.acquire(job.estimated_tokens)
+
+    async def _run_job(self, job, semaphore, events):
+        while True:
+            job.attempts += 1
+            async with semaphore:
+                await self._throttle(job)
+                await events.put(CrewEvent(job.file_path, "started", job.attempts))
+                started_at = time.monotonic()
+                try:
+                    result = await self.kickoff(job.inputs, **job.kickoff_options)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    await events.put(CrewEvent(job.file_path, "completed", job.attempts, time.monotonic() - started_at, result=result))
+                    return
+
+            elapsed = time.monotonic() - started_at
+            if job.attempts > self.max_retries:
+                await events.put(CrewEvent(job.file_path, "failed", job.attempts, elapsed, error=error))
+                return
+
+            await events.put(CrewEvent(job.file_path, "retrying", job.attempts, elapsed, error=error))
+            # Back off outside of the semaphore so other files keep running meanwhile
+            await asyncio.sleep(self.retry_backoff * (2 ** (job.attempts - 1)))
+
+    async def run(self, jobs: List[CrewJob]):
+        """Runs every job and yields a CrewEvent for each state change as it happens."""
+        jobs = sorted(jobs, key=lambda job: job.estimated_tokens, reverse=True)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, self.max_in_flight))
+        semaphore = self._semaphore
+        events = asyncio.Queue()
+
+        workers = [asyncio.create_task(self._run_job(job, semaphore, events)) for job in jobs]
+        finished = asyncio.gather(*workers)
+
+        try:
+            while not (finished.done() and events.empty()):
+                getter = asyncio.create_task(events.get())
+                done, _ = await asyncio.wait({getter, finished}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            await finished
+        finally:
+            for worker in workers:
+                worker.cancel()
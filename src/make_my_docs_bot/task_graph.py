@@ -0,0 +1,44 @@
+from typing import List
+
+
+def depends_on(task, others):
+    """True when task needs the output of any of the others, tasks without an explicit context need all of them."""
+    if not isinstance(task.context, list):
+        return True
+    return any(context_task in others for context_task in task.context)
+
+
+def group_independent_tasks(tasks) -> List[List]:
+    """
+    Splits the ordered tasks into consecutive groups whose members don't depend on
+    each other through their context, e.g. the translator tasks which only need the
+    analysis task. Order is kept, so side effects between tasks (like the index fixer
+    editing the files the translators read) still happen in the tasks.yaml order.
+    """
+    groups = []
+    for task in tasks:
+        if groups and not depends_on(task, groups[-1]):
+            groups[-1].append(task)
+        else:
+            groups.append([task])
+    return groups
+
+
+def schedule_concurrent_tasks(tasks):
+    """
+    Marks the tasks of every independent group as async_execution so they run concurrently.
+
+    crewAI waits for pending async tasks at the next synchronous task, so a group is only
+    made concurrent when the group after it stays synchronous to join it, and the last
+    group is always synchronous.
+    """
+    groups = group_independent_tasks(tasks)
+
+    next_group_concurrent = True  # Keeps the last group synchronous
+    for group in reversed(groups):
+        concurrent = len(group) > 1 and not next_group_concurrent
+        for task in group:
+            task.async_execution = concurrent
+        next_group_concurrent = concurrent
+
+    return tasks
@@ -0,0 +1,233 @@
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import List
+
+from make_my_docs_bot.instrumentation import count
+from make_my_docs_bot.tools.change_significance import DEFAULT_RULES, normalize_markdown, sections_by_path
+from make_my_docs_bot.tools.chunked_translation import (
+    CHUNK_TRANSLATION_PROMPT, FENCE, MAX_PARALLEL_CHUNKS, clean_translation, estimate_text_tokens, split_blocks
+)
+from make_my_docs_bot.tools.edit_plan import EditPlan, EditPlanError, as_lines, write_lines_atomically
+from make_my_docs_bot.tools.git_blob_reader import get_blob_reader
+from make_my_docs_bot.tools.git_diff import get_merge_base
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines, read_markdown_lines
+from make_my_docs_bot.tools.translation_memory import section_content, section_span, translated_counterparts
+
+# Sections where the changed blocks are more than this share of the tokens are translated whole
+MAX_CHANGED_SHARE = 0.5
+
+BLOCK_TRANSLATION_PROMPT = CHUNK_TRANSLATION_PROMPT + (
+    " The text replaces a part of a translated section. It comes after:\n\n{before}\n\nand before:\n\n{after}\n\n"
+    "Both are shown in English and in their current {language} translation, keep the terminology of "
+    "the translation. Only translate the text you are given, not these passages."
+)
+
+
+@dataclass
+class BlockChange:
+    """Changed English blocks of a section and the lines of its translation they replace."""
+    # START_LINE AND END_LINE ARE INCLUDED, an insertion before start_line has end_line = start_line - 1
+    start_line: int
+    end_line: int
+    english: str
+    # Lines put around the translation, so the blank lines between blocks stay as they are
+    prefix: str = ""
+    suffix: str = ""
+    # English and translated block before and after the change, shown to the model
+    before: str = ""
+    after: str = ""
+
+
+def block_kind(block):
+    """What a block is, blocks of a section and of its translation line up when their kinds do."""
+    first_line = block[0].strip()
+    if first_line.startswith("#"):
+        return "heading" + str(len(first_line) - len(first_line.lstrip("#")))
+    if FENCE.match(block[0]):
+        return "code"
+    if first_line[:2] in ("- ", "* ", "+ ") or first_line.split(". ", 1)[0].isdigit():
+        return "list"
+    if first_line.startswith("|"):
+        return "table"
+    if first_line.startswith("<"):
+        return "component"
+    return "text"
+
+
+def _last_text_line(start_line, block):
+    """Line number of the last non blank line of a block starting at start_line."""
+    end_line = start_line + len(block) - 1
+    while end_line > start_line and not block[end_line - start_line].strip():
+        end_line -= 1
+    return end_line
+
+
+def _anchor(blocks, translated_blocks, position):
+    if not 0 <= position < len(blocks):
+        return "(nothing)"
+    return "".join(blocks[position]).strip() + "\n\n" + "".join(translated_blocks[position]).strip()
+
+
+def find_block_changes(base_content, branch_content, translated_lines, start_line, rules=DEFAULT_RULES):
+    """
+    BlockChanges turning the translation of base_content, translated_lines starting at line
+    start_line of its file, into the translation of branch_content, with the unchanged blocks left as
+    they are. None when the blocks of the translation don't line up with the English ones, or when
+    headings are added or removed, which the crew handles.
+    """
+    base_blocks = split_blocks(as_lines(base_content))
+    branch_blocks = split_blocks(as_lines(branch_content))
+    translated_blocks = split_blocks(translated_lines)
+    if [block_kind(block) for block in base_blocks] != [block_kind(block) for block in translated_blocks]:
+        return None
+
+    positions = []
+    for block in translated_blocks:
+        positions.append(start_line)
+        start_line += len(block)
+
+    matcher = SequenceMatcher(
+        None,
+        [normalize_markdown("".join(block), rules) for block in base_blocks],
+        [normalize_markdown("".join(block), rules) for block in branch_blocks],
+        autojunk=False
+    )
+    changes = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        headings = [block_kind(block) for block in base_blocks[i1:i2] if block_kind(block).startswith("heading")]
+        if headings != [block_kind(block) for block in branch_blocks[j1:j2] if block_kind(block).startswith("heading")]:
+            return None
+
+        english = "".join("".join(block) for block in branch_blocks[j1:j2]).strip()
+        anchors = {
+            "before": _anchor(base_blocks, translated_blocks, i1 - 1),
+            "after": _anchor(base_blocks, translated_blocks, i2),
+        }
+        if tag == "replace":
+            change = BlockChange(positions[i1], _last_text_line(positions[i2 - 1], translated_blocks[i2 - 1]), english, **anchors)
+        elif tag == "delete" and i1 > 0:
+            # From the end of the previous block's text, its blank lines are the ones after the deleted blocks
+            change = BlockChange(_last_text_line(positions[i1 - 1], translated_blocks[i1 - 1]) + 1,
+                                 _last_text_line(positions[i2 - 1], translated_blocks[i2 - 1]), english, **anchors)
+        elif tag == "delete":
+            change = BlockChange(positions[0], positions[i2 - 1] + len(translated_blocks[i2 - 1]) - 1, english, **anchors)
+        elif i1 > 0:
+            line = _last_text_line(positions[i1 - 1], translated_blocks[i1 - 1]) + 1
+            change = BlockChange(line, line - 1, english, prefix="\n", **anchors)
+        else:
+            change = BlockChange(positions[0], positions[0] - 1, english, suffix="\n", **anchors)
+        changes.append(change)
+    return changes
+
+
+def translate_block_change(llm, language, title, change) -> List[str]:
+    """Lines replacing the translated range of change, a deletion needs no model."""
+    if not change.english:
+        return []
+
+    messages = [
+        {"role": "system", "content": BLOCK_TRANSLATION_PROMPT.format(language=language, before=change.before, after=change.after)},
+        {"role": "user", "content": f"Changed part of the section '{title}':\n\n{change.english}"},
+    ]
+    translation = clean_translation(llm.call(messages), change.english)
+    if not translation.strip():
+        raise ValueError(f"Empty translation of the changed part of '{title}' to {language}")
+    return as_lines(change.prefix + translation + "\n" + change.suffix)
+
+
+def translate_changed_blocks(repo_root, file_path, base_branch, compare_branch, english_index, changed_sections, translator_llm, rules=DEFAULT_RULES):
+    """
+    Translates only the changed paragraphs, lists, tables and code blocks of the changed sections,
+    with the blocks around them as context, and edits the matching lines of every translation.
+
+    A section is handled when it exists on the merge base, its changed blocks are at most
+    MAX_CHANGED_SHARE of it, and every translation has the same blocks as its English version on the
+    merge base. A section with a change which failed to translate, in any locale, is left to the crew.
+    Returns the handled (section, full_context_flag) pairs and the updated translated files,
+    translator_llm(locale) gives the model of a locale.
+    """
+    base_content = get_blob_reader(repo_root).read(get_merge_base(repo_root, base_branch, compare_branch), file_path)
+    if base_content is None or not changed_sections:
+        return [], []
+    base_index = index_markdown_lines(base_content)
+    base_sections = sections_by_path(base_index)
+    branch_paths = {id(node): path for path, node in sections_by_path(english_index).items()}
+
+    counterparts = translated_counterparts(repo_root, file_path, base_index, english_index, [section for section, _ in changed_sections])
+    if not counterparts:
+        return [], []
+    translated_lines = {locale: read_markdown_lines(os.path.join(repo_root, locale.translated_path(file_path))) for locale in counterparts}
+
+    handled = []
+    changes = {}
+    for section, full_context_flag in changed_sections:
+        base_section = base_sections.get(branch_paths.get(id(section)))
+        branch_content = section_content(section, full_context_flag) or ""
+        if base_section is None or any(sections.get(section['start_line']) is None for sections in counterparts.values()):
+            continue
+
+        section_changes = {}
+        for locale, sections in counterparts.items():
+            start_line, end_line = section_span(sections[section['start_line']], full_context_flag)
+            section_changes[locale] = find_block_changes(
+                section_content(base_section, full_context_flag) or "", branch_content,
+                translated_lines[locale][start_line:end_line + 1], start_line, rules
+            )
+        if any(block_changes is None for block_changes in section_changes.values()):
+            continue
+
+        # Every translation has the same blocks, so the changes of any of them tell the size of the edit
+        changed_tokens = sum(estimate_text_tokens(change.english) for change in next(iter(section_changes.values())))
+        if changed_tokens > MAX_CHANGED_SHARE * estimate_text_tokens(branch_content):
+            continue
+
+        handled.append((section, full_context_flag))
+        for locale, block_changes in section_changes.items():
+            changes.setdefault(locale, []).extend((section, change) for change in block_changes)
+
+    if not handled:
+        return [], []
+
+    jobs = [(locale, translator_llm(locale), section, change) for locale, locale_changes in changes.items() for section, change in locale_changes]
+    count("translated_blocks", sum(1 for *_, change in jobs if change.english))
+    with ThreadPoolExecutor(max_workers=max(min(MAX_PARALLEL_CHUNKS, len(jobs)), 1)) as executor:
+        # Copied contexts keep the trace attributing the calls to this file
+        futures = [
+            executor.submit(contextvars.copy_context().run, translate_block_change, llm, locale.language, section['title'], change)
+            for locale, llm, section, change in jobs
+        ]
+        translations = []
+        failed_sections = set()
+        for (locale, _, section, change), future in zip(jobs, futures):
+            try:
+                translations.append((locale, section, change, future.result()))
+            except Exception as e:
+                failed_sections.add(section['start_line'])
+                print(f"⚠️ A changed part of '{section['title']}' failed to translate to {locale.language}, leaving the section to the crew: {e}")
+
+    handled = [(section, full_context_flag) for section, full_context_flag in handled if section['start_line'] not in failed_sections]
+    if not handled:
+        return [], []
+
+    plans = {}
+    for locale, section, change, lines in translations:
+        if section['start_line'] not in failed_sections:
+            translated_path = os.path.join(repo_root, locale.translated_path(file_path))
+            plans.setdefault(locale, EditPlan(translated_path)).replace(change.start_line, change.end_line, lines)
+
+    updated_files = {}
+    for locale, plan in plans.items():
+        try:
+            updated_files[locale.translated_path(file_path)] = (plan.file_path, plan.apply(translated_lines[locale]))
+        except EditPlanError:
+            return [], []
+
+    for translated_path, updated_lines in updated_files.values():
+        write_lines_atomically(translated_path, updated_lines)
+
+    return handled, list(updated_files)
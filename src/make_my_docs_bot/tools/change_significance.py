@@ -0,0 +1,87 @@
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+FENCED_CODE_BLOCK = re.compile(r"^[ \t]*(```|~~~).*?^[ \t]*\1[^\n]*$", re.MULTILINE | re.DOTALL)
+LINK_TARGET = re.compile(r"\]\([^)\s]*(?:\s+\"[^\"]*\")?\)")
+URL_ATTRIBUTE = re.compile(r"\b(href|src)=(\"[^\"]*\"|'[^']*'|\{[^}]*\})")
+BARE_URL = re.compile(r"<?https?://[^\s<>\"')\]]+>?")
+ASTERISK_EMPHASIS = re.compile(r"(\*{1,3})(?=\S)(.+?)(?<=\S)\1", re.DOTALL)
+# Underscores only at word boundaries, snake_case names keep theirs
+UNDERSCORE_EMPHASIS = re.compile(r"(?<!\w)(_{1,3})(?=\S)(.+?)(?<=\S)\1(?!\w)", re.DOTALL)
+
+
+@dataclass(frozen=True)
+class SignificanceRules:
+    """What normalize_markdown throws away before comparing two versions of a section."""
+    # Reflowed paragraphs, indentation and trailing whitespace
+    whitespace: bool = True
+    # *, ** and _ emphasis markers, the emphasized text is kept
+    emphasis: bool = True
+    # Link targets and bare URLs, the link text is kept
+    urls: bool = True
+    # Contents of fenced code blocks, off by default since code comments get translated
+    code_blocks: bool = False
+
+
+DEFAULT_RULES = SignificanceRules()
+
+
+def normalize_section(content):
+    """Ignores trailing spaces and runs of blank lines, which don't change the translation."""
+    lines = [line.rstrip() for line in content.strip().splitlines()]
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+
+
+def normalize_markdown(text, rules=DEFAULT_RULES) -> str:
+    """text without what the rules consider formatting, two versions differing only in formatting normalize the same."""
+    if rules.code_blocks:
+        text = FENCED_CODE_BLOCK.sub("```", text)
+    if rules.urls:
+        text = LINK_TARGET.sub("]()", text)
+        text = URL_ATTRIBUTE.sub(r'\1=""', text)
+        text = BARE_URL.sub("<url>", text)
+    if rules.emphasis:
+        text = ASTERISK_EMPHASIS.sub(r"\2", text)
+        text = UNDERSCORE_EMPHASIS.sub(r"\2", text)
+    if rules.whitespace:
+        text = " ".join(text.split())
+    return text
+
+
+def sections_by_path(index) -> Dict[Tuple, object]:
+    """
+    Every section of an index_markdown_lines tree keyed by the headings leading to it, plus the
+    position among equally named siblings, so sections are matched across versions of the file.
+    """
+    sections = {}
+    stack = [(index, ())]
+    while stack:
+        node, path = stack.pop()
+        sections[path] = node
+        seen = {}
+        for child in node['children']:
+            heading = (child['level'], child['title'])
+            seen[heading] = seen.get(heading, 0) + 1
+            stack.append((child, path + ((*heading, seen[heading]),)))
+    return sections
+
+
+def significant_sections(base_index, branch_index, changed_sections, rules=DEFAULT_RULES) -> List:
+    """
+    The (section, full_context_flag) pairs of changed_sections, sections of branch_index, whose
+    text differs from the same section in base_index once both are normalized. Sections which
+    are new on the branch, e.g. renamed, are always significant.
+    """
+    base_sections = sections_by_path(base_index)
+    branch_paths = {id(node): path for path, node in sections_by_path(branch_index).items()}
+
+    def text(section, full_context_flag):
+        return section['content'] if full_context_flag else section['before_first_children_content']
+
+    significant = []
+    for section, full_context_flag in changed_sections:
+        base_section = base_sections.get(branch_paths.get(id(section)))
+        if base_section is None or normalize_markdown(text(section, full_context_flag) or "", rules) != normalize_markdown(text(base_section, full_context_flag) or "", rules):
+            significant.append((section, full_context_flag))
+    return significant
@@ -0,0 +1,188 @@
+import contextvars
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from make_my_docs_bot.instrumentation import count
+from make_my_docs_bot.scheduler import CHARS_PER_TOKEN
+from make_my_docs_bot.tools.edit_plan import EditPlan, EditPlanError, as_lines, write_lines_atomically
+from make_my_docs_bot.tools.index_markdown import read_markdown_lines
+from make_my_docs_bot.tools.translation_memory import section_content, section_span, translated_counterparts
+
+# Changed sections above this many tokens are translated in chunks of at most this size, outside of the crew
+MAX_SECTION_TOKENS = 2000
+# Chunk translations running at the same time, over every locale
+MAX_PARALLEL_CHUNKS = 8
+
+FENCE = re.compile(r"^\s*(```|~~~)")
+WRAPPING_FENCE = re.compile(r"^```[\w-]*\n(.*)\n```$", re.DOTALL)
+
+CHUNK_TRANSLATION_PROMPT = (
+    "You translate MDX documentation from English to {language}. Translate the prose, headings and "
+    "code comments. Keep the Markdown structure, line breaks, code, inline code, URLs, JSX components "
+    "and their props exactly as they are. Answer with the translated text only, without any explanation."
+)
+
+
+def estimate_text_tokens(text):
+    return len(text) // CHARS_PER_TOKEN
+
+
+def split_blocks(lines) -> List[List[str]]:
+    """
+    Splits lines into the blocks a chunk must not cut through: headings, paragraphs and fenced code
+    blocks. Blank lines stay with the block before them, joining the blocks gives lines back.
+    """
+    blocks = []
+    current = []
+    in_code_block = False
+    after_code_block = False
+
+    for line in lines:
+        stripped = line.strip()
+        fence = FENCE.match(line)
+        starts_block = current and not in_code_block and (
+            stripped.startswith("#")
+            or fence
+            or after_code_block
+            or (stripped and not current[-1].strip())
+        )
+        if starts_block:
+            blocks.append(current)
+            current = []
+
+        current.append(line)
+        after_code_block = False
+        if fence:
+            in_code_block = not in_code_block
+            after_code_block = not in_code_block
+
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def chunk_lines(lines, max_tokens) -> List[List[str]]:
+    """
+    Groups the blocks of lines into chunks of at most max_tokens, a single larger block is a chunk
+    of its own. A chunk past half its budget ends before the next heading rather than after it.
+    """
+    chunks = []
+    current, current_tokens = [], 0
+    for block in split_blocks(lines):
+        tokens = estimate_text_tokens("".join(block))
+        is_heading = block[0].lstrip().startswith("#")
+        if current and (current_tokens + tokens > max_tokens or (is_heading and current_tokens * 2 >= max_tokens)):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.extend(block)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def translate_chunk(llm, language, title, chunk, part, parts) -> str:
+    """Translation of one chunk, ending with the same line breaks so the chunks join as the English ones do."""
+    messages = [
+        {"role": "system", "content": CHUNK_TRANSLATION_PROMPT.format(language=language)},
+        {"role": "user", "content": f"Part {part} of {parts} of the section '{title}':\n\n{chunk}"},
+    ]
+    translation = clean_translation(llm.call(messages), chunk)
+    if not translation.strip():
+        raise ValueError(f"Empty translation of part {part} of '{title}' to {language}")
+
+    return translation + chunk[len(chunk.rstrip("\n")):]
+
+
+def clean_translation(translation, source) -> str:
+    """The answer of a model translating source, without surrounding line breaks or a code block wrapped around it."""
+    translation = str(translation).strip("\n")
+    # Models like to wrap their answer in a code block
+    wrapped = WRAPPING_FENCE.match(translation)
+    if wrapped and not source.lstrip().startswith("```"):
+        translation = wrapped.group(1)
+    return translation
+
+
+def translate_oversized_sections(repo_root, file_path, base_index, english_index, changed_sections, translator_llm, max_tokens=None):
+    """
+    Translates the changed sections longer than max_tokens in chunks cut at sub-heading, paragraph
+    and code block boundaries, every chunk of every locale at the same time. Each translated section
+    is replaced by its joined chunks as one range, keeping its trailing blank lines.
+
+    Sections are only handled when every translation has their counterpart through the English file
+    on the merge base, base_index, otherwise the crew does them, e.g. after fixing the headings. So
+    does it with the sections of which a chunk failed to translate, in any locale. Returns the handled (section, full_context_flag) pairs and
+    the updated translated files, translator_llm(locale) gives the model of a locale.
+    """
+    max_tokens = max_tokens or MAX_SECTION_TOKENS
+    oversized = [
+        (section, full_context_flag) for section, full_context_flag in changed_sections
+        if estimate_text_tokens(section_content(section, full_context_flag) or "") > max_tokens
+    ]
+    if not oversized:
+        return [], []
+
+    counterparts = translated_counterparts(repo_root, file_path, base_index, english_index, [section for section, _ in oversized])
+    handled = [
+        (section, full_context_flag) for section, full_context_flag in oversized
+        if counterparts and all(sections.get(section['start_line']) is not None for sections in counterparts.values())
+    ]
+    if not handled:
+        return [], []
+
+    jobs = []
+    for locale in counterparts:
+        llm = translator_llm(locale)
+        for section, full_context_flag in handled:
+            chunks = chunk_lines(as_lines(section_content(section, full_context_flag)), max_tokens)
+            for part, chunk in enumerate(chunks, start=1):
+                jobs.append((locale, section['start_line'], llm, section['title'], "".join(chunk), part, len(chunks)))
+
+    count("translated_chunks", len(jobs))
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CHUNKS, len(jobs))) as executor:
+        # Copied contexts keep the trace attributing the calls to this file
+        futures = [
+            executor.submit(contextvars.copy_context().run, translate_chunk, llm, locale.language, title, chunk, part, parts)
+            for locale, _, llm, title, chunk, part, parts in jobs
+        ]
+        translations = {}
+        failed_sections = set()
+        for (locale, start_line, _, title, _, part, parts), future in zip(jobs, futures):
+            try:
+                translations.setdefault((locale, start_line), []).append(future.result())
+            except Exception as e:
+                failed_sections.add(start_line)
+                print(f"⚠️ Part {part} of {parts} of '{title}' failed to translate to {locale.language}, leaving the section to the crew: {e}")
+
+    handled = [(section, full_context_flag) for section, full_context_flag in handled if section['start_line'] not in failed_sections]
+    if not handled:
+        return [], []
+
+    updated_files = {}
+    for locale, sections in counterparts.items():
+        translated_file_path = locale.translated_path(file_path)
+        translated_path = os.path.join(repo_root, translated_file_path)
+        lines = read_markdown_lines(translated_path)
+
+        plan = EditPlan(translated_path)
+        for section, full_context_flag in handled:
+            start_line, end_line = section_span(sections[section['start_line']], full_context_flag)
+            # The English content is stripped, the blank lines before the next heading are kept
+            trailing_blank_lines = []
+            while end_line - len(trailing_blank_lines) > start_line and not lines[end_line - len(trailing_blank_lines)].strip():
+                trailing_blank_lines.insert(0, lines[end_line - len(trailing_blank_lines)])
+            plan.replace(start_line, end_line, as_lines("".join(translations[(locale, section['start_line'])])) + trailing_blank_lines)
+
+        try:
+            updated_files[translated_file_path] = (translated_path, plan.apply(lines))
+        except EditPlanError:
+            return [], []
+
+    for translated_path, updated_lines in updated_files.values():
+        write_lines_atomically(translated_path, updated_lines)
+
+    return handled, list(updated_files)
@@ -0,0 +1,114 @@
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import List
+
+from make_my_docs_bot.tools.index_cache import index_cache
+from make_my_docs_bot.tools.index_markdown import read_markdown_lines
+
+
+class EditPlanError(ValueError):
+    """The edits of a plan are out of the file's range or overlap each other."""
+
+
+@dataclass(frozen=True)
+class LineEdit:
+    # START_LINE AND END_LINE ARE INCLUDED, an insertion before start_line has end_line = start_line - 1
+    start_line: int
+    end_line: int
+    new_lines: List[str]
+
+    @property
+    def is_insertion(self):
+        return self.end_line < self.start_line
+
+    def describe(self):
+        if self.is_insertion:
+            return f"insertion before line {self.start_line}"
+        return f"lines {self.start_line}-{self.end_line}"
+
+
+def as_lines(text) -> List[str]:
+    """Lines of text, every one ending with a newline."""
+    return [line + "\n" for line in text.splitlines()]
+
+
+def write_lines_atomically(file_path, lines):
+    """Writes through a temporary file renamed over file_path, readers never see half a file."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    descriptor, temporary_path = tempfile.mkstemp(prefix=".edit-", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(descriptor, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        if os.path.exists(file_path):
+            shutil.copymode(file_path, temporary_path)
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    index_cache.invalidate(file_path)
+
+
+class EditPlan:
+    """
+    Every edit of one file, with line numbers of the file as it is before any of them.
+
+    The edits are checked against the file and each other first, then applied in one pass in
+    memory and written once, so N updates cost one rewrite and no edit shifts the lines of another.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.edits: List[LineEdit] = []
+
+    def replace(self, start_line, end_line, new_lines):
+        """Replaces lines start_line to end_line, both included."""
+        self.edits.append(LineEdit(start_line, end_line, list(new_lines)))
+        return self
+
+    def insert(self, line, new_lines):
+        """Inserts before line, len(lines) appends to the file."""
+        self.edits.append(LineEdit(line, line - 1, list(new_lines)))
+        return self
+
+    def _ordered(self):
+        # Insertions go before a replacement starting on the same line, equal edits keep their order
+        return sorted(self.edits, key=lambda edit: (edit.start_line, not edit.is_insertion))
+
+    def validate(self, lines):
+        """Raises EditPlanError for every edit out of the file and every pair of overlapping edits."""
+        total_lines = len(lines)
+        errors = []
+        for edit in self.edits:
+            if edit.start_line < 0 or edit.start_line > total_lines or edit.end_line > total_lines or edit.end_line < edit.start_line - 1:
+                errors.append(f"Invalid line range: file has {total_lines} lines, got start={edit.start_line}, end={edit.end_line}")
+
+        previous = None
+        for edit in self._ordered():
+            if previous is not None and edit.start_line <= previous.end_line:
+                errors.append(f"{previous.describe().capitalize()} and {edit.describe()} overlap")
+            if previous is None or edit.end_line >= previous.end_line:
+                previous = edit
+
+        if errors:
+            raise EditPlanError(f"{self.file_path}: " + "; ".join(errors))
+
+    def apply(self, lines) -> List[str]:
+        """The edited lines, lines itself is left untouched."""
+        self.validate(lines)
+
+        updated_lines = []
+        position = 0
+        for edit in self._ordered():
+            updated_lines.extend(lines[position:edit.start_line])
+            updated_lines.extend(edit.new_lines)
+            position = max(position, edit.end_line + 1)
+        updated_lines.extend(lines[position:])
+        return updated_lines
+
+    def commit(self):
+        """Applies the plan to the file on disk, nothing is written when an edit is invalid."""
+        lines = read_markdown_lines(self.file_path)
+        write_lines_atomically(self.file_path, self.apply(lines))
@@ -1,16 +1,14 @@
-from crewai.tools import BaseTool
+from make_my_docs_bot.tools.repository_tool import RepositoryTool
 from pydantic import BaseModel, Field
-from typing import Type, Dict, Any, List, Optional
-import requests
-import json
-import re
+from typing import Type, Dict, Optional
 import os
-from datetime import datetime
-import subprocess
-import re
 from make_my_docs_bot.tools.index_markdown import index_markdown_lines_without_context as index_markdown_lines_without_context_global
 from make_my_docs_bot.tools.index_markdown import render_tree as render_tree_global
 from make_my_docs_bot.tools.index_markdown import remove_children_if_not_there as remove_children_if_not_there_global
+from make_my_docs_bot.tools.index_markdown import render_tree_window as render_tree_window_global
+from make_my_docs_bot.tools.structure_diff import find_heading_windows as find_heading_windows_global
+from make_my_docs_bot.locales import language_names, map_locales
+from make_my_docs_bot.instrumentation import trace_tool_run
 
 class FileIndexingToolInput(BaseModel):
     """Input schema for Branch Change Analyzer Tool."""
@@ -18,14 +16,18 @@ class FileIndexingToolInput(BaseModel):
         ..., 
         description="Engligh documentation File which has been changed"
     )
+    feature_branch: Optional[str] = Field(
+        None,
+        description="Branch with the changes, when given only the sections around the changed ones are indexed"
+    )
 
-class FileIndexingTool(BaseTool):
+class FileIndexingTool(RepositoryTool):
     """Tool for fetching comprehensive GitHub issue data using GitHub's REST API."""
 
     name: str = "File Indexing Tool"
     description: str = (
-        "Find the files in korean directory and Portuguese (Brazil) which are related to the file which are changed"
-        "Index back the documentation of english files, korean and Portuguese (Brazil) files"
+        f"Find the files in {language_names()} directories which are related to the file which are changed"
+        f"Index back the documentation of english files, {language_names()} files"
         "Input: file_path Output: A structure formatted response of what files and indexing of those files"
     )
     args_schema: Type[BaseModel] = FileIndexingToolInput
@@ -38,28 +40,34 @@ class FileIndexingTool(BaseTool):
         return render_tree_global(node, indent)
 
     # START_LINE AND END_LINE ARE INCLUDED, TO GET THE CONTENT DO END_LINE + 1
-    def index_markdown_lines(self,file_path):
+    def index_markdown_lines(self,file_path, window=None):
         index = index_markdown_lines_without_context_global(file_path=file_path)
+        if window is not None:
+            return render_tree_window_global(index, window)
         return self.render_tree(self.remove_children_if_not_there(index))
 
 
-    def _run(self, file_path: str) -> dict:
-        """Indentifies the korean, Portuguese (Brazil) files and returs the indexing of those files"""
+    @trace_tool_run
+    def _run(self, file_path: str, feature_branch: Optional[str] = None) -> dict:
+        """Indentifies the translated files of every locale and returs the indexing of those files"""
         # Main execution
         reverse_section_mapping = {}
-        
-        english_file_path = file_path
-        korean_file_path = file_path.replace("docs/en","docs/ko")
-        portugurese_brazil_file_path = file_path.replace("docs/en","docs/pt-BR")
+        parent_dir = self.resolved_repo_root
+
+        # Only the changed sections and a few neighbours, line numbers stay absolute
+        windows = {}
+        if feature_branch:
+            windows = find_heading_windows_global(parent_dir, file_path, self.base_branch, feature_branch)
 
-        parent_dir = os.path.dirname(os.getcwd())
-        english_file_path = os.path.join(parent_dir, english_file_path)
-        korean_file_path = os.path.join(parent_dir, korean_file_path)
-        portugurese_brazil_file_path = os.path.join(parent_dir, portugurese_brazil_file_path)
+        english_file_path = os.path.join(parent_dir, file_path)
+        reverse_section_mapping[english_file_path] = self.index_markdown_lines(english_file_path, windows.get(file_path))
 
+        # The translations don't depend on each other, index them all at once
+        def index_locale(locale):
+            translated_file_path = locale.translated_path(file_path)
+            return self.index_markdown_lines(os.path.join(parent_dir, translated_file_path), windows.get(translated_file_path))
 
-        reverse_section_mapping[english_file_path] = self.index_markdown_lines(english_file_path)
-        reverse_section_mapping[korean_file_path] = self.index_markdown_lines(korean_file_path)
-        reverse_section_mapping[portugurese_brazil_file_path] = self.index_markdown_lines(portugurese_brazil_file_path)
+        for locale, rendered_index in map_locales(index_locale).items():
+            reverse_section_mapping[os.path.join(parent_dir, locale.translated_path(file_path))] = rendered_index
 
-        return reverse_section_mapping
\ No newline at end of file
+        return reverse_section_mapping
@@ -0,0 +1,77 @@
+import atexit
+import subprocess
+import threading
+from typing import Optional
+
+from make_my_docs_bot.instrumentation import count_subprocess
+
+
+class GitBlobReader:
+    """
+    Reads file contents at any revision from one long-lived `git cat-file --batch` process,
+    so reading a (ref, path) pair needs neither a checkout nor a new subprocess.
+    """
+
+    def __init__(self, repo_root):
+        self.repo_root = repo_root
+        self._process = None
+        self._lock = threading.Lock()
+
+    def _ensure_process(self):
+        if self._process is None or self._process.poll() is not None:
+            count_subprocess(["git", "cat-file", "--batch"])
+            self._process = subprocess.Popen(
+                ["git", "cat-file", "--batch"],
+                cwd=self.repo_root,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+        return self._process
+
+    def read(self, ref, path) -> Optional[bytes]:
+        """Returns the content of path at ref, or None when it does not exist there."""
+        with self._lock:
+            process = self._ensure_process()
+            process.stdin.write(f"{ref}:{path}\n".encode("utf-8"))
+            process.stdin.flush()
+
+            header = process.stdout.readline().decode("utf-8").rstrip("\n")
+            # "<object> missing" or "<object> ambiguous", where the object is ref:path and the path may have spaces
+            if header.endswith((" missing", " ambiguous")):
+                return None
+
+            _, object_type, size = header.rsplit(" ", 2)
+            content = process.stdout.read(int(size))
+            process.stdout.read(1)  # Every object is followed by a newline
+
+        if object_type != "blob":
+            return None
+        return content
+
+    def close(self):
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                self._process.stdin.close()
+                self._process.wait()
+            self._process = None
+
+
+_readers = {}
+_readers_lock = threading.Lock()
+
+
+def get_blob_reader(repo_root) -> GitBlobReader:
+    """Returns the process wide reader of repo_root, starting it on first use."""
+    with _readers_lock:
+        if repo_root not in _readers:
+            _readers[repo_root] = GitBlobReader(repo_root)
+        return _readers[repo_root]
+
+
+@atexit.register
+def close_blob_readers():
+    with _readers_lock:
+        for reader in _readers.values():
+            reader.close()
+        _readers.clear()
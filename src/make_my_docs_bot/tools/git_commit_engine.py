@@ -0,0 +1,188 @@
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from make_my_docs_bot.tools.git_diff import get_common_directory, run_git
+
+# Translations are plain documentation files
+FILE_MODE = "100644"
+
+
+class GitCommitError(Exception):
+    pass
+
+
+class GitCommitEngine:
+    """
+    Commits files of a checkout to a branch with git plumbing, without checking the branch out or
+    staging anything in a shared index. Only the committed paths of checkouts of the branch are
+    refreshed afterwards.
+
+    The files are hashed into blobs, a tree is built from the branch's tree plus those blobs in a
+    temporary index (GIT_INDEX_FILE) and committed with commit-tree. The branch ref is moved with a
+    compare-and-swap update-ref, so commits from concurrent crews never overwrite each other, a
+    commit which lost the race is rebuilt on top of the new branch tip.
+    """
+
+    def __init__(self, repo_root, max_attempts=5):
+        self.repo_root = repo_root
+        self.max_attempts = max_attempts
+
+    def _git(self, args, **kwargs):
+        result = run_git(args, cwd=self.repo_root, **kwargs)
+        if result.returncode != 0:
+            raise GitCommitError(f"git {args[0]} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def repository_path(self, file_path):
+        """Path of the file relative to the repository root, as stored in trees."""
+        full_path = os.path.join(self.repo_root, file_path)
+        return os.path.relpath(full_path, self.repo_root).replace(os.sep, "/")
+
+    def hash_files(self, files) -> Dict[str, str]:
+        """{repository path: blob sha} of the current content of the files, written to the object store."""
+        paths = [self.repository_path(file_path) for file_path in files]
+        for path in paths:
+            if not os.path.isfile(os.path.join(self.repo_root, path)):
+                raise GitCommitError(f"File not found: {path}")
+
+        output = self._git(["hash-object", "-w", "--stdin-paths"], input="\n".join(paths) + "\n")
+        return dict(zip(paths, output.split()))
+
+    def _write_tree(self, parent, blobs):
+        temporary_directory = tempfile.mkdtemp(prefix="make_my_docs_bot_index_")
+        env = {**os.environ, "GIT_INDEX_FILE": os.path.join(temporary_directory, "index")}
+        try:
+            self._git(["read-tree", parent], env=env)
+            index_info = "".join(f"{FILE_MODE} {sha}\t{path}\n" for path, sha in blobs.items())
+            self._git(["update-index", "--index-info"], input=index_info, env=env)
+            return self._git(["write-tree"], env=env).strip()
+        finally:
+            shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    def commit_blobs(self, branch, blobs, message) -> Optional[str]:
+        """Commits the blobs on top of branch, returns the new commit or None when nothing changed."""
+        ref = f"refs/heads/{branch}"
+        for _ in range(self.max_attempts):
+            parent, parent_tree = self._git(["rev-parse", ref, f"{ref}^{{tree}}"]).split()
+            tree = self._write_tree(parent, blobs)
+            if tree == parent_tree:
+                return None
+
+            commit = self._git(["commit-tree", tree, "-p", parent, "-m", message]).strip()
+            # Only moves the branch if nobody committed to it in the meantime
+            result = run_git(["update-ref", "-m", "make_my_docs_bot: commit translations", ref, commit, parent], cwd=self.repo_root)
+            if result.returncode == 0:
+                self._refresh_checkouts(ref, parent, commit, list(blobs))
+                return commit
+
+        raise GitCommitError(f"Branch '{branch}' kept moving, gave up after {self.max_attempts} attempts")
+
+    def commit_files(self, branch, files, message) -> Optional[str]:
+        return self.commit_blobs(branch, self.hash_files(files), message)
+
+    def _checkouts(self, ref):
+        """Worktrees of the repository which have the branch checked out."""
+        result = run_git(["worktree", "list", "--porcelain"], cwd=self.repo_root)
+        worktrees, worktree = [], None
+        for line in result.stdout.splitlines():
+            if line.startswith("worktree "):
+                worktree = line[len("worktree "):]
+            elif line == f"branch {ref}" and worktree is not None:
+                worktrees.append(worktree)
+        return worktrees
+
+    def _refresh_checkouts(self, ref, parent, commit, paths):
+        # A checkout of the branch still has the old blobs in its index, which would show the commit
+        # as staged reverts
+        for worktree in self._checkouts(ref):
+            if os.path.realpath(worktree) == os.path.realpath(self.repo_root):
+                # The files were committed from here, only the index is behind
+                result = run_git(["reset", "-q", "--", *paths], cwd=worktree)
+            elif run_git(["diff", "--quiet", parent, "--", *paths], cwd=worktree).returncode == 0:
+                # e.g. the developer's checkout while a worktree synced the branch, the files are untouched there
+                result = run_git(["checkout", commit, "--", *paths], cwd=worktree)
+            else:
+                print(f"⚠️ {worktree} has local changes to the committed files, it is left behind {ref}")
+                continue
+            if result.returncode != 0:
+                print(f"⚠️ Could not refresh {worktree} after committing, run `git reset -- {' '.join(paths)}`: {result.stderr.strip()}")
+
+
+class CommitBatch:
+    """
+    Files committed by the crews of one run, collected per repository and branch and committed
+    together by flush, so a run makes one commit per branch instead of one per crew. The blobs are
+    hashed when a file is added, later edits of the working tree don't change what gets committed.
+    """
+
+    def __init__(self):
+        self._engines = {}
+        self._blobs = {}
+        self._messages = {}
+        self._lock = threading.Lock()
+
+    def add(self, repo_root, branch, files, message):
+        """repo_root is the checkout the files are read from, e.g. the branch's worktree."""
+        engine = GitCommitEngine(repo_root)
+        blobs = engine.hash_files(files)
+        # Worktrees of one repository share its branches
+        key = (get_common_directory(repo_root), branch)
+        with self._lock:
+            self._engines.setdefault(key, engine)
+            self._blobs.setdefault(key, {}).update(blobs)
+            self._messages.setdefault(key, []).append(message.strip())
+
+    def pending_files(self) -> Dict[str, List[str]]:
+        with self._lock:
+            return {branch: sorted(blobs) for (_, branch), blobs in self._blobs.items()}
+
+    @staticmethod
+    def _message(blobs, messages):
+        if len(messages) == 1:
+            return messages[0]
+        return f"Update {len(blobs)} translated files\n\n" + "\n\n".join(messages)
+
+    def flush(self, branches=None, repo_root=None) -> Dict[str, Optional[str]]:
+        """
+        Commits everything added so far for the branches, all of them by default, of the repository
+        of repo_root or of every repository. Returns {branch: commit}.
+        """
+        repository = get_common_directory(repo_root) if repo_root is not None else None
+        with self._lock:
+            keys = [
+                key for key in self._blobs
+                if (branches is None or key[1] in branches) and (repository is None or key[0] == repository)
+            ]
+            pending = [(key[1], self._engines.pop(key), self._blobs.pop(key), self._messages.pop(key)) for key in keys]
+
+        return {branch: engine.commit_blobs(branch, blobs, self._message(blobs, messages)) for branch, engine, blobs, messages in pending}
+
+
+# Batch of the running `run`, GitCommitTool commits right away while this is None
+_commit_batch = None
+
+
+def start_commit_batch() -> CommitBatch:
+    global _commit_batch
+    _commit_batch = CommitBatch()
+    return _commit_batch
+
+
+def get_commit_batch() -> Optional[CommitBatch]:
+    return _commit_batch
+
+
+def flush_commit_batch(branches=None, repo_root=None) -> Dict[str, Optional[str]]:
+    """Commits the files of the batch for the branches, all of them by default, {} when no batch was started."""
+    batch = _commit_batch
+    return batch.flush(branches, repo_root) if batch is not None else {}
+
+
+def stop_commit_batch() -> Dict[str, Optional[str]]:
+    """Commits whatever is left in the batch and stops batching."""
+    global _commit_batch
+    batch, _commit_batch = _commit_batch, None
+    return batch.flush() if batch is not None else {}
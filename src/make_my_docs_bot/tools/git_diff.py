@@ -0,0 +1,163 @@
+import os
+import re
+import subprocess
+import threading
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from make_my_docs_bot.instrumentation import count_subprocess
+
+ENGLISH_DOCS_PATHSPEC = "docs/en/*.mdx"
+
+DIFF_HEADER = re.compile(r"^diff --git a/(.*) b/(.*)$")
+NEW_FILE_HEADER = re.compile(r"^\+\+\+ (?:b/(.*)|/dev/null)$")
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+_branch_diffs = {}
+_branch_diffs_lock = threading.Lock()
+
+
+def default_repo_root():
+    """The docs repository when none is given, the bot's directory sits in its root."""
+    return os.path.dirname(os.getcwd())
+
+
+def run_git(args, cwd, **kwargs):
+    """Runs a git command in cwd and returns the CompletedProcess, output is captured as text."""
+    count_subprocess(["git", *args])
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_common_directory(repo_root):
+    """The git dir shared by the repository and all its worktrees, identifies the repository."""
+    result = run_git(["rev-parse", "--git-common-dir"], cwd=repo_root)
+    if result.returncode != 0:
+        raise Exception(f"{repo_root} is not a git repository: {result.stderr.strip()}")
+    return os.path.realpath(os.path.join(repo_root, result.stdout.strip()))
+
+
+@lru_cache(maxsize=None)
+def get_state_directory(repo_root):
+    """Directory in the repository's git dir where the bot keeps state between runs, shared by worktrees."""
+    state_directory = os.path.join(get_common_directory(repo_root), "make_my_docs_bot")
+    os.makedirs(state_directory, exist_ok=True)
+    return state_directory
+
+
+def parse_git_diff_hunks(diff_text) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    Splits a multi-file `git diff -U0` output into the changed line ranges of every file.
+    Ranges are 0-based, both ends included, in the order of the diff. Deleted files are left out.
+    """
+    changed_files = {}
+    current_file = None
+
+    for line in diff_text.splitlines():
+        header = DIFF_HEADER.match(line)
+        if header:
+            current_file = header.group(2)
+            changed_files[current_file] = []
+            continue
+
+        new_file = NEW_FILE_HEADER.match(line)
+        if new_file and current_file is not None:
+            if new_file.group(1) is None:
+                # Deleted in the compare branch, there is nothing left to translate
+                changed_files.pop(current_file, None)
+                current_file = None
+            continue
+
+        hunk = HUNK_HEADER.match(line)
+        if hunk and current_file is not None:
+            start = int(hunk.group(1)) - 1
+            length = int(hunk.group(2) or 1) - 1
+            changed_files[current_file].append((start, start + length))
+
+    return changed_files
+
+
+def get_branch_diff(repo_root, base_branch, compare_branch, pathspec=ENGLISH_DOCS_PATHSPEC):
+    """
+    Returns {file_path: [(start_line, end_line), ...]} for every file matching pathspec changed
+    between base_branch and compare_branch. Runs a single `git diff -U0` per
+    (repo_root, base_branch, compare_branch, pathspec) for the whole process.
+    """
+    key = (repo_root, base_branch, compare_branch, pathspec)
+
+    with _branch_diffs_lock:
+        if key in _branch_diffs:
+            return _branch_diffs[key]
+
+    result = run_git(
+        ["-c", "core.quotePath=off", "diff", "-U0", f"{base_branch}...{compare_branch}", "--", pathspec],
+        cwd=repo_root
+    )
+    if result.returncode != 0:
+        raise Exception(f"git diff {base_branch}...{compare_branch} failed: {result.stderr.strip()}")
+
+    changed_files = parse_git_diff_hunks(result.stdout)
+
+    with _branch_diffs_lock:
+        _branch_diffs[key] = changed_files
+
+    return changed_files
+
+
+def get_merge_base(repo_root, base_branch, compare_branch):
+    """The commit `git diff base_branch...compare_branch` compares against, cached like the diffs."""
+    key = ("merge-base", repo_root, base_branch, compare_branch)
+
+    with _branch_diffs_lock:
+        if key in _branch_diffs:
+            return _branch_diffs[key]
+
+    result = run_git(["merge-base", base_branch, compare_branch], cwd=repo_root)
+    if result.returncode != 0:
+        raise Exception(f"git merge-base {base_branch} {compare_branch} failed: {result.stderr.strip()}")
+    merge_base = result.stdout.strip()
+
+    with _branch_diffs_lock:
+        _branch_diffs[key] = merge_base
+
+    return merge_base
+
+
+def _in_repository(repo_root, repository):
+    try:
+        return get_common_directory(repo_root) == repository
+    except Exception:
+        return True  # Gone, e.g. a removed worktree, nothing reads its diffs anymore
+
+
+def clear_branch_diffs(repo_root=None, branches=None):
+    """
+    Forgets the diffs and merge bases of the given compared branches in the repository of repo_root,
+    its worktrees included, everything by default. Branches may have moved since, e.g. between the
+    jobs of the daemon, while the runs of other branches keep theirs.
+    """
+    repository = get_common_directory(repo_root) if repo_root is not None else None
+    with _branch_diffs_lock:
+        keys = list(_branch_diffs)
+
+    stale = []
+    for key in keys:
+        key_root, _, compare_branch = key[1:4] if key[0] == "merge-base" else key[:3]
+        if branches is not None and compare_branch not in branches:
+            continue
+        if repository is not None and not _in_repository(key_root, repository):
+            continue
+        stale.append(key)
+
+    with _branch_diffs_lock:
+        for key in stale:
+            _branch_diffs.pop(key, None)
+
+
+def get_file_diff(repo_root, file_path, base_branch, compare_branch):
+    """Changed line ranges of a single file, served from the batched English docs diff when possible."""
+    changed_files = get_branch_diff(repo_root, base_branch, compare_branch)
+    if file_path in changed_files:
+        return changed_files[file_path]
+
+    return get_branch_diff(repo_root, base_branch, compare_branch, pathspec=file_path).get(file_path, [])
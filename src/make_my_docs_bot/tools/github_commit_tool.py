@@ -1,76 +1,54 @@
-from crewai.tools import BaseTool
+from make_my_docs_bot.tools.repository_tool import RepositoryTool
 from pydantic import BaseModel, Field
 from typing import Type, List
-import subprocess
-import os
+from make_my_docs_bot.tools.git_commit_engine import GitCommitEngine, GitCommitError, get_commit_batch
+from make_my_docs_bot.instrumentation import trace_tool_run
 
 
 class GitCommitToolInput(BaseModel):
     """Input schema for Git Commit Tool."""
-    feature_branch: str = Field(..., description="The feature branch to checkout")
+    feature_branch: str = Field(..., description="The feature branch to commit to")
     files_to_commit: List[str] = Field(..., description="List of file paths to add and commit")
     commit_message: str = Field(..., description="Commit message for the changes")
 
 
-class GitCommitTool(BaseTool):
+class GitCommitTool(RepositoryTool):
     """Tool for committing changes to a Git feature branch."""
 
     name: str = "Git Commit Tool"
     description: str = (
-        "Checks out the given feature branch, adds the specified files, "
-        "and commits them with the provided commit message."
+        "Commits the specified files to the given feature branch "
+        "with the provided commit message."
     )
     args_schema: Type[BaseModel] = GitCommitToolInput
 
+    @trace_tool_run
     def _run(
         self,
         feature_branch: str,
         files_to_commit: List[str],
         commit_message: str
     ) -> str:
-        """Perform git checkout, add files, and commit."""
-        try:
-            # return {"message": f"Changes committed to branch '{feature_branch}' successfully........."}
-            # Checkout the branch
-            parent_dir = os.path.dirname(os.getcwd())
-            subprocess.run(
-                ["git", "checkout", feature_branch], 
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=parent_dir
-            )
+        """Commit the files to the branch, or queue them for the commit of the run."""
+        if not files_to_commit:
+            return {"error": "No files provided to commit."}
+
+        parent_dir = self.resolved_repo_root
 
-            # Add files
-            if not files_to_commit:
-                return {"error": "No files provided to commit."}
-            
-            parent_dir = os.path.dirname(os.getcwd())
+        try:
+            # During a run every crew's files go into one commit made when the run ends
+            batch = get_commit_batch()
+            if batch is not None:
+                batch.add(parent_dir, feature_branch, files_to_commit, commit_message)
+                print(f"✅ Files queued for the commit of this run: {', '.join(files_to_commit)}")
+                return {"message": f"Changes queued for the commit to branch '{feature_branch}' at the end of the run."}
 
-            for index in range(len(files_to_commit)):
-                files_to_commit[index] = os.path.join(parent_dir, files_to_commit[index])
-            
-            # Add files without showing Git output
-            subprocess.run(
-                ["git", "add"] + files_to_commit,
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=parent_dir
-            )
-            print("✅ Files successfully added to staging area.")
+            commit = GitCommitEngine(parent_dir).commit_files(feature_branch, files_to_commit, commit_message)
+            if commit is None:
+                return {"message": f"Files already match branch '{feature_branch}', nothing to commit."}
 
-            # Commit changes without showing Git output
-            subprocess.run(
-                ["git", "commit", "-m", commit_message],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                cwd=parent_dir
-            )
             print(f"✅ Successfully committed with message: '{commit_message}'")
+            return {"message": f"Changes committed to branch '{feature_branch}' successfully as {commit[:12]}."}
 
-            return {"message": f"Changes committed to branch '{feature_branch}' successfully........."}
-
-        except subprocess.CalledProcessError as e:
+        except GitCommitError as e:
             return {"error": f"Git command failed: {e}"}
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from make_my_docs_bot.instrumentation import count
+
+
+class MarkdownIndexCache:
+    """
+    Process wide LRU cache for markdown indexes, shared by every tool in a crew run.
+
+    File paths are keyed by their real path and only served while the file's mtime
+    and size are unchanged. Contents passed as bytes or lines are keyed by their
+    hash, so the same revision of a file read from git is indexed once. Cached
+    indexes are shared between callers, so they must be treated as read-only.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, source, kind):
+        if isinstance(source, (bytes, bytearray)):
+            return ("sha1:" + hashlib.sha1(source).hexdigest(), kind), None
+        if isinstance(source, (list, tuple)):
+            return ("sha1:" + hashlib.sha1("".join(source).encode("utf-8")).hexdigest(), kind), None
+
+        path = os.path.realpath(source)
+        stat = os.stat(path)
+        return (path, kind), (stat.st_mtime_ns, stat.st_size)
+
+    def get_or_build(self, source, kind, builder):
+        """source is a file path, the file's bytes or its lines, builder(source) makes the index."""
+        key, fingerprint = self._key(source, kind)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == fingerprint:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count("index_cache_hits")
+                return entry[1]
+            self.misses += 1
+        count("index_cache_misses")
+
+        value = builder(source)
+
+        with self._lock:
+            self._entries[key] = (fingerprint, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def invalidate(self, file_path):
+        """Drops every cached index of the file, call this after writing to it."""
+        path = os.path.realpath(file_path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+index_cache = MarkdownIndexCache()
@@ -1,7 +1,9 @@
-from crewai.tools import BaseTool
+from make_my_docs_bot.tools.repository_tool import RepositoryTool
 from pydantic import BaseModel, Field
 from typing import Type
 import os
+from make_my_docs_bot.tools.edit_plan import EditPlan, EditPlanError
+from make_my_docs_bot.instrumentation import trace_tool_run
 
 class FileIndexFixerToolInput(BaseModel):
     """Input schema for File Index Fixer Tool."""
@@ -22,7 +24,7 @@ class FileIndexFixerToolInput(BaseModel):
     reason: str = Field(..., description="Explanation of how the line number was determined, referencing previous and next sections")
 
 
-class FileIndexFixerTool(BaseTool):
+class FileIndexFixerTool(RepositoryTool):
     """Tool for replacing a specific line range in a file with new content."""
 
     name: str = "File Index Fixer Tool"
@@ -31,6 +33,7 @@ class FileIndexFixerTool(BaseTool):
     )
     args_schema: Type[BaseModel] = FileIndexFixerToolInput
 
+    @trace_tool_run
     def _run(
         self,
         file_path: str,
@@ -46,21 +49,18 @@ class FileIndexFixerTool(BaseTool):
     ) -> str:
         """Add the section heading at the desired place"""
         # Read file
-        parent_dir = os.path.dirname(os.getcwd())
+        parent_dir = self.resolved_repo_root
         file_path = os.path.join(parent_dir, file_path)
 
         if not os.path.exists(file_path):
             return {"error": f"File not found: {file_path}"}
         
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
-
-        # Replace the specified range
-        updated_lines = lines[: previous_section_end_line + 1] + ["\n"] + ["#"*level + " " +  new_heading] + ["\n"] +  ["\n"] + lines[previous_section_end_line+1:]
-
-        # Write updated file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(updated_lines)
+        # The heading goes right after the previous section, set apart by blank lines
+        plan = EditPlan(file_path).insert(previous_section_end_line + 1, ["\n", "#"*level + " " + new_heading + "\n", "\n"])
+        try:
+            plan.commit()
+        except EditPlanError as e:
+            return {"error": str(e)}
 
         print(f"✅ Successfully updated file: {file_path}")
 
@@ -1,25 +1,26 @@
 from typing import Type, Dict, Any, List, Optional
-
-def index_markdown_lines(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    index = [{
-        "level": 1,
-        "title": "Start of the page",
-        "start_line": 0,
-        "end_line": None,
-        "first_children_start_line": None,
-        "before_first_children_content": None,
-        "content": None,
-        "children_index" : [],
-        "children" : []
-    }]
-
-    total_lines = len(lines)
+from array import array
+import io
+from bisect import bisect_right
+from collections.abc import Mapping
+from make_my_docs_bot.tools.index_cache import index_cache
+
+def read_markdown_lines(source):
+    """Lines of a file path, of the file's bytes (e.g. read from git) or of an existing line buffer."""
+    if isinstance(source, (bytes, bytearray)):
+        # Same newline handling as reading the file in text mode
+        return io.TextIOWrapper(io.BytesIO(source), encoding="utf-8").readlines()
+    if isinstance(source, (list, tuple)):
+        return list(source)
+
+    with open(source, "r", encoding="utf-8") as f:
+        return f.readlines()
+
+
+def _iter_headings(lines):
+    """Yields (line_number, level, title) for every heading outside fenced code blocks."""
     in_code_block = False  # Track whether we’re inside a fenced code block
 
-    # Step 1: collect all headings with their start lines
     for i, line in enumerate(lines, start=0):
         stripped = line.strip()
 
@@ -36,71 +37,257 @@ def index_markdown_lines(file_path):
             # Count heading level (number of leading #)
             level = stripped.count("#", 0, stripped.find(" ")) if " " in stripped else stripped.count("#")
             title = stripped.strip("# ").strip()
-            index.append({
-                "level": level,
-                "title": title,
-                "start_line": i,
-                "end_line": None,
-                "first_children_start_line": None,
-                "before_first_children_content": None,
-                "content": None,
-                "children_index" : [],
-                "children": [],
-            })
-
-    # Step 2: determine end_line for each heading
-    for j in range(len(index)):
-        current_level = index[j]["level"]
-        current_start = index[j]["start_line"]
-        first_children_start_line = index[j]["first_children_start_line"]
-
-        # Find the next heading with same or higher level
-        next_start = None
-
-        for k in range(j + 1, len(index)):
-            if first_children_start_line is None:
-                first_children_start_line = index[k]['start_line']
-            if index[k]["level"] <= current_level:
-                next_start = index[k]["start_line"] - 1
-                break
-
-        # If found, end is just before next heading
-        first_children_start_line = first_children_start_line if first_children_start_line else (total_lines - 1)
-        end_line = next_start if next_start else (total_lines - 1)
-
-        index[j]["first_children_start_line"] = first_children_start_line
-        index[j]["end_line"] = end_line
-
-        # Extract content between start_line and end_line (exclusive of heading)
-        content_lines = lines[current_start:end_line+1]
-        index[j]["content"] = "".join(content_lines).strip()
-
-
-        # Extract content between start_line and first_children_start_line (exclusive of heading)
-        content_lines = lines[current_start:first_children_start_line]
-        index[j]["before_first_children_content"] = "".join(content_lines).strip()
-
-    # Step 3: Build hierarchy (nest children)
-    root = []
-    stack = []
-
-    for item in index:
-        # While stack has items and top level >= current level, pop it
-        while stack and stack[-1]["level"] >= item["level"]:
-            stack.pop()
+            yield i, level, title
+
+
+class _LineBuffer:
+    """The whole file as one string plus the offset where every line starts."""
+
+    __slots__ = ("text", "offsets")
+
+    def __init__(self, lines):
+        self.text = "".join(lines)
+        self.offsets = array("q", [0])
+        for line in lines:
+            self.offsets.append(self.offsets[-1] + len(line))
+
+    # Same result as "".join(lines[start:end])
+    def join(self, start, end):
+        start, end, _ = slice(start, end).indices(len(self.offsets) - 1)
+        if end <= start:
+            return ""
+        return self.text[self.offsets[start]:self.offsets[end]]
+
+
+class SectionNode(Mapping):
+    """
+    Heading node of index_markdown_lines.
+
+    Only line numbers are stored, content and before_first_children_content are
+    sliced out of the file buffer shared by all nodes when they are read. Behaves
+    like the read-only dict the index used to return, use to_dict for a real one.
+    """
+
+    __slots__ = (
+        "level", "title", "start_line", "end_line", "first_children_start_line",
+        "children_index", "children", "_buffer",
+    )
+
+    KEYS = (
+        "level", "title", "start_line", "end_line", "first_children_start_line",
+        "before_first_children_content", "content", "children_index", "children",
+    )
+
+    def __init__(self, buffer, level, title, start_line):
+        self._buffer = buffer
+        self.level = level
+        self.title = title
+        self.start_line = start_line
+        self.end_line = None
+        self.first_children_start_line = None
+        self.children_index = []
+        self.children = []
+
+    @property
+    def content(self):
+        if self.end_line is None:
+            return None
+        return self._buffer.join(self.start_line, self.end_line + 1).strip()
+
+    @property
+    def before_first_children_content(self):
+        if self.first_children_start_line is None:
+            return None
+        return self._buffer.join(self.start_line, self.first_children_start_line).strip()
+
+    def __getitem__(self, key):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    # Only used while the index is being built
+    def __setitem__(self, key, value):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def to_dict(self):
+        node = {key: self[key] for key in self.KEYS}
+        node["children_index"] = list(self.children_index)
+        node["children"] = [child.to_dict() for child in self.children]
+        return node
+
+    def __repr__(self):
+        return f"SectionNode(level={self.level!r}, title={self.title!r}, lines {self.start_line}-{self.end_line})"
+
+
+def _new_node(level, title, start_line, buffer):
+    if buffer is not None:
+        return SectionNode(buffer, level, title, start_line)
+
+    return {
+        "level": level,
+        "title": title,
+        "start_line": start_line,
+        "end_line": None,
+        "children_index" : [],
+        "children": [],
+    }
+
+
+def _build_index(lines, with_context):
+    """
+    Single pass, stack based indexer shared by index_markdown_lines and
+    index_markdown_lines_without_context.
+
+    A heading is closed by the first later heading of the same or a higher level,
+    which is exactly the heading that pops it from the stack, so end_line, the
+    first children start line and the nesting all come out of one walk over the lines.
+    """
+    total_lines = len(lines)
+    buffer = _LineBuffer(lines) if with_context else None
+
+    root = _new_node(1, "Start of the page", 0, buffer)
+    stack = [root]
+    previous = root  # Last heading seen, its first_children_start_line is the next heading
+
+    def close(node, next_start):
+        # next_start is the start_line of the heading closing this node, None at the end of file
+        if not with_context:
+            node["end_line"] = (next_start - 1) if next_start else (total_lines - 1)
+            return
+
+        next_start = None if next_start is None else next_start - 1
+        node["end_line"] = next_start if next_start else (total_lines - 1)
+
+    for start_line, level, title in _iter_headings(lines):
+        if with_context:
+            previous["first_children_start_line"] = start_line if start_line else (total_lines - 1)
+
+        item = _new_node(level, title, start_line, buffer)
+
+        # While stack has items and top level >= current level, the current heading closes it
+        while stack and stack[-1]["level"] >= level:
+            close(stack.pop(), start_line)
 
         if stack:
             # Current item is child of stack top
-            stack[-1]["children_index"].append(item['start_line'])
+            stack[-1]["children_index"].append(start_line if with_context else start_line - 1)
             stack[-1]["children"].append(item)
-        else:
-            # This is a top-level item
-            root.append(item)
 
         # Push current item to stack
         stack.append(item)
+        previous = item
+
+    if with_context:
+        previous["first_children_start_line"] = total_lines - 1
+
+    while stack:
+        close(stack.pop(), None)
+
+    return root
+
+
+# file_path can also be the file's bytes or lines
+# Indexes are served from the shared index_cache, callers must not mutate them
+def index_markdown_lines(file_path):
+    return index_cache.get_or_build(
+        file_path, "with_context",
+        lambda source: _build_index(read_markdown_lines(source), with_context=True)
+    )
+
+
+class SectionIntervalIndex:
+    """
+    Flattened view of an index_markdown_lines tree, sorted by start_line, used to
+    resolve changed line ranges to the deepest section enclosing them with a bisect
+    instead of walking the tree for every range.
+    """
+
+    def __init__(self, index):
+        self.nodes = []
+        self.parents = []  # Position of the parent of each node in self.nodes, -1 for the root
+
+        stack = [(index, -1)]
+        while stack:
+            node, parent = stack.pop()
+            self.parents.append(parent)
+            self.nodes.append(node)
+            position = len(self.nodes) - 1
+            for child in reversed(node['children']):
+                stack.append((child, position))
+
+        self.starts = [node['start_line'] for node in self.nodes]
+
+    # Both start_index and end_index are included in the range
+    def find(self, start_index, end_index):
+        """
+        Returns (section, full_context_flag) for the deepest section containing the range,
+        full_context_flag is False when the range ends before the section's first child.
+        Returns None when the range is outside of the page.
+        """
+        # Pure deletions come as (start, start - 1) and belong to the section before start
+        position = bisect_right(self.starts, min(start_index, end_index)) - 1
+        if position < 0 and start_index >= self.starts[0]:
+            position = 0
+        deepest = True
+
+        while position >= 0:
+            node = self.nodes[position]
+            if node['end_line'] >= end_index:
+                # Context ending before the first_children_starts
+                if deepest and len(node['children']) and end_index < node['first_children_start_line']:
+                    return node, False
+                return node, True
+
+            position = self.parents[position]
+            deepest = False
+
+        return None
+
+
+def find_changed_sections(index, changed_lines):
+    """
+    Maps every (start_line, end_line) range to its section and merges the results, so a
+    section hit by several ranges, or already covered by a fully changed ancestor, is
+    returned once. Order follows the first range hitting each section.
+    """
+    intervals = SectionIntervalIndex(index)
+
+    found = {}
+    for start_index, end_index in changed_lines:
+        result = intervals.find(start_index, end_index)
+        if result is None:
+            continue
+        node, full_context_flag = result
+        key = node['start_line']
+        if key in found:
+            # A full hit on the section covers every partial one
+            found[key] = (node, found[key][1] or full_context_flag)
+        else:
+            found[key] = (node, full_context_flag)
+
+    full_ranges = [
+        (node['start_line'], node['end_line'])
+        for node, full_context_flag in found.values() if full_context_flag
+    ]
+
+    changed_sections = []
+    for node, full_context_flag in found.values():
+        covered = any(
+            start < node['start_line'] and node['end_line'] <= end
+            for start, end in full_ranges
+        )
+        if not covered:
+            changed_sections.append((node, full_context_flag))
 
-    return root[0]
+    return changed_sections
 
 
 def find_my_sections(index, level, full_context_flag):
@@ -120,17 +307,15 @@ def find_my_sections(index, level, full_context_flag):
     return final_answer
 
 
+# Returns a pruned copy, the index itself may be shared through the index cache
 def remove_children_if_not_there(index : Dict):
     if len(index['children']) == 0:
-        index.pop('children',None)
-        index.pop('children_index',None)
-        return index
-    
+        return {key: value for key, value in index.items() if key not in ('children', 'children_index')}
 
-    for child_index in range(len(index["children"])):
-        index["children"][child_index] = remove_children_if_not_there(index["children"][child_index])
+    pruned = dict(index)
+    pruned["children"] = [remove_children_if_not_there(child) for child in index["children"]]
 
-    return index
+    return pruned
 
 
 def render_tree(node, indent=0):
@@ -145,87 +330,53 @@ def render_tree(node, indent=0):
     return "\n".join(lines)
 
 
-# START_LINE AND END_LINE ARE INCLUDED, TO GET THE CONTENT DO END_LINE + 1
-def index_markdown_lines_without_context(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-
-    index = [{
-        "level": 1,
-        "title": "Start of the page",
-        "start_line": 0,
-        "end_line": None,
-        "children_index" : [],
-        "children" : []
-    }]
-
-    total_lines = len(lines)
-    in_code_block = False  # Track whether we’re inside a fenced code block
-
-    # Step 1: collect all headings with their start lines
-    for i, line in enumerate(lines, start=0):
-        stripped = line.strip()
-
-        # Detect code block start/end
-        if stripped.startswith("```"):
-            in_code_block = not in_code_block
-            continue  # Don’t treat the ``` line itself as a heading
-
-        # Skip headings inside code blocks
-        if in_code_block:
+def render_tree_window(index, positions):
+    """
+    Renders like render_tree, but only the headings at the given positions (document order, page
+    root excluded) and their parents. Every run of left out headings becomes a single line, so the
+    absolute line numbers of the rendered headings stay meaningful.
+    """
+    lines = [f"- {index['title']} (Level:{index['level']}, lines {index['start_line']}-{index['end_line']})"]
+
+    headings = []
+    stack = [(child, 1, ()) for child in reversed(index.get('children', []))]
+    while stack:
+        node, depth, parents = stack.pop()
+        headings.append((node, depth, parents))
+        stack.extend((child, depth + 1, parents + (len(headings) - 1,)) for child in reversed(node.get('children', [])))
+
+    kept = set()
+    for position in positions:
+        if 0 <= position < len(headings):
+            kept.add(position)
+            kept.update(headings[position][2])
+
+    omitted = []
+
+    def flush_omitted():
+        if omitted:
+            first, last = headings[omitted[0]], headings[omitted[-1]]
+            lines.append(
+                " " * (first[1] * 4)
+                + f"- ... {len(omitted)} sections left out (lines {first[0]['start_line']}-{last[0]['end_line']})"
+            )
+            omitted.clear()
+
+    for position, (node, depth, _) in enumerate(headings):
+        if position not in kept:
+            omitted.append(position)
             continue
+        flush_omitted()
+        lines.append(" " * (depth * 4) + f"- {node['title']} (Level:{node['level']}, lines {node['start_line']}-{node['end_line']})")
+    flush_omitted()
 
-        if stripped.startswith("#"):
-            # Count heading level (number of leading #)
-            level = stripped.count("#", 0, stripped.find(" ")) if " " in stripped else stripped.count("#")
-            title = stripped.strip("# ").strip()
-            index.append({
-                "level": level,
-                "title": title,
-                "start_line": i,
-                "end_line": None,
-                "children_index" : [],
-                "children": [],
-            })
-
-    # Step 2: determine end_line for each heading
-    for j in range(len(index)):
-        current_level = index[j]["level"]
-        current_start = index[j]["start_line"]
-
-        # Find the next heading with same or higher level
-        next_start = None
-
-        for k in range(j + 1, len(index)):
-            if index[k]["level"] <= current_level:
-                next_start = index[k]["start_line"]
-                break
-
-        # If found, end is just before next heading
-        end_line = (next_start - 1) if next_start else (total_lines - 1)
-
-        index[j]["end_line"] = end_line
-
-
-    # Step 3: Build hierarchy (nest children)
-    root = []
-    stack = []
-
-    for item in index:
-        # While stack has items and top level >= current level, pop it
-        while stack and stack[-1]["level"] >= item["level"]:
-            stack.pop()
-
-        if stack:
-            # Current item is child of stack top
-            stack[-1]["children_index"].append(item['start_line']-1)
-            stack[-1]["children"].append(item)
-            
-        else:
-            # This is a top-level item
-            root.append(item)
+    return "\n".join(lines)
 
-        # Push current item to stack
-        stack.append(item)
 
-    return root[0]
+# START_LINE AND END_LINE ARE INCLUDED, TO GET THE CONTENT DO END_LINE + 1
+# file_path can also be the file's bytes or lines
+def index_markdown_lines_without_context(file_path):
+    return index_cache.get_or_build(
+        file_path, "without_context",
+        lambda source: _build_index(read_markdown_lines(source), with_context=False)
+    )
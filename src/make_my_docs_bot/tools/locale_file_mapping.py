@@ -1,18 +1,14 @@
-from crewai.tools import BaseTool
+from make_my_docs_bot.tools.repository_tool import RepositoryTool
 from pydantic import BaseModel, Field
-from typing import Type, Dict, Any, List, Optional
-import requests
-import json
-import re
+from typing import Type, List
 import os
-from datetime import datetime
-import subprocess
-import re
+from make_my_docs_bot.locales import Locale
 from make_my_docs_bot.tools.index_markdown import index_markdown_lines as index_markdown_lines_global
 from make_my_docs_bot.tools.index_markdown import find_my_sections as find_my_sections_global
+from make_my_docs_bot.instrumentation import trace_tool_run
 
-class KoreanFileMappingToolInput(BaseModel):
-    """Input schema for Branch Change Analyzer Tool."""
+class LocaleFileMappingToolInput(BaseModel):
+    """Input schema for Locale File Mapping Tool."""
     list_of_files: List[str] = Field(
         ..., 
         description="Files which have been changed in the feature branch"
@@ -26,16 +22,22 @@ class KoreanFileMappingToolInput(BaseModel):
         description="Flag to know whether the entire object got changed, or partial"
     )
 
-class KoreanFileMappingTool(BaseTool):
-    """Tool for fetching comprehensive GitHub issue data using GitHub's REST API."""
+class LocaleFileMappingTool(RepositoryTool):
+    """Indexes the translations of changed English files in one locale, one instance per translator agent."""
 
-    name: str = "Korean File Reverse Mapping"
-    description: str = (
-        "Find the files in korean directory which are related to the file which are changed"
-        "Indexes the korean files and gives that back"
-        "Input: list_of_files Output: A structure formatted response of what files and indexing of those files"
-    )
-    args_schema: Type[BaseModel] = KoreanFileMappingToolInput
+    name: str = "Locale File Reverse Mapping"
+    description: str = ""
+    args_schema: Type[BaseModel] = LocaleFileMappingToolInput
+    locale: Locale
+
+    def __init__(self, locale: Locale, **kwargs):
+        kwargs.setdefault("name", f"{locale.language} File Reverse Mapping")
+        kwargs.setdefault("description", (
+            f"Find the files in {locale.language} directory which are related to the file which are changed"
+            f"Indexes the {locale.language} files and gives that back"
+            "Input: list_of_files Output: A structure formatted response of what files and indexing of those files"
+        ))
+        super().__init__(locale=locale, **kwargs)
 
 
     def render_tree(self, nodes):
@@ -60,17 +62,18 @@ class KoreanFileMappingTool(BaseTool):
         return self.render_tree(filtered_sections)
     
 
+    @trace_tool_run
     def _run(self, list_of_files: List[str], level: int, full_context_flag: bool) -> dict:
-        """Indentifies the korean files and returs the indexing of those files"""
+        """Indentifies the translated files of the locale and returs the indexing of those files"""
         # Main execution
         reverse_section_mapping = {}
         for file in list_of_files:
-            korean_file_path = file.replace("docs/en","docs/ko")
+            translated_file_path = self.locale.translated_path(file)
     
-            parent_dir = os.path.dirname(os.getcwd())
-            file_path = os.path.join(parent_dir, korean_file_path)
+            parent_dir = self.resolved_repo_root
+            file_path = os.path.join(parent_dir, translated_file_path)
 
             sections = self.index_markdown_lines(file_path, level, full_context_flag)
-            reverse_section_mapping[korean_file_path] = sections
+            reverse_section_mapping[translated_file_path] = sections
 
-        return reverse_section_mapping
\ No newline at end of file
+        return reverse_section_mapping
@@ -1,18 +1,22 @@
-from crewai.tools import BaseTool
+from make_my_docs_bot.tools.repository_tool import RepositoryTool
 from pydantic import BaseModel, Field
-from typing import Type
+from typing import Type, List
 import os
+from make_my_docs_bot.pydantic_models import FileContentUpdate
+from make_my_docs_bot.tools.edit_plan import EditPlan, EditPlanError, as_lines, write_lines_atomically
+from make_my_docs_bot.tools.index_markdown import read_markdown_lines
+from make_my_docs_bot.instrumentation import trace_tool_run
 
 
 class FileContentUpdaterToolInput(BaseModel):
     """Input schema for File Content Updater Tool."""
     file_path: str = Field(..., description="Path of the file to be modified")
-    content_to_be_deleted_start_line: int = Field(..., description="Start line number (1-based) from which data will be erased")
-    content_to_be_deleted_end_line: int = Field(..., description="End line number (1-based) till which data will be erased")
+    content_to_be_deleted_start_line: int = Field(..., description="Start line number (0-based, as the indexing tools give them) from which data will be erased")
+    content_to_be_deleted_end_line: int = Field(..., description="End line number (0-based, included) till which data will be erased")
     new_content: str = Field(..., description="New content that needs to be added in place of deleted lines")
 
 
-class FileContentUpdaterTool(BaseTool):
+class FileContentUpdaterTool(RepositoryTool):
     """Tool for replacing a specific line range in a file with new content."""
 
     name: str = "File Content Updater Tool"
@@ -22,6 +26,7 @@ class FileContentUpdaterTool(BaseTool):
     )
     args_schema: Type[BaseModel] = FileContentUpdaterToolInput
 
+    @trace_tool_run
     def _run(
         self,
         file_path: str,
@@ -31,34 +36,33 @@ class FileContentUpdaterTool(BaseTool):
     ) -> str:
         """Replace lines in a file between given start and end line numbers."""
         # Read file
-        parent_dir = os.path.dirname(os.getcwd())
+        parent_dir = self.resolved_repo_root
         file_path = os.path.join(parent_dir, file_path)
 
         if not os.path.exists(file_path):
             return {"error": f"File not found: {file_path}"}
         
-        with open(file_path, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        lines = read_markdown_lines(file_path)
 
         total_lines = len(lines)
         start = content_to_be_deleted_start_line
         end = content_to_be_deleted_end_line
 
-        # Validate line range
-        if start < 1 or end > total_lines or start > end:
+        # Validate line range, 0-based like the indexes the line numbers come from
+        if start < 0 or start > end:
             return {
                 "error": f"Invalid line range: file has {total_lines} lines, got start={start}, end={end}"
             }
 
-        # Prepare new content (ensure newline handling)
-        new_lines = [line + "\n" if not line.endswith("\n") else line for line in new_content.splitlines()]
-
-        # Replace the specified range
-        updated_lines = lines[: start] + ["\n"] + new_lines + ["\n"] + lines[end + 1:]
+        # The new content replaces the range, set apart by blank lines
+        plan = EditPlan(file_path).replace(start, end, ["\n", *as_lines(new_content), "\n"])
+        try:
+            updated_lines = plan.apply(lines)
+        except EditPlanError as e:
+            return {"error": str(e)}
 
         # Write updated file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.writelines(updated_lines)
+        write_lines_atomically(file_path, updated_lines)
 
         print(f"✅ Successfully updated file: {file_path}")
 
@@ -66,3 +70,57 @@ class FileContentUpdaterTool(BaseTool):
             "message": f"Lines {start}-{end} in '{file_path}' replaced successfully.",
             "new_content_preview": new_content[:300] + ("..." if len(new_content) > 300 else "")
         }
+
+
+class FileContentBatchUpdaterToolInput(BaseModel):
+    """Input schema for File Content Batch Updater Tool."""
+    updates: List[FileContentUpdate] = Field(
+        ...,
+        description="Every update to apply, with the line numbers of the files before any of the updates"
+    )
+
+
+class FileContentBatchUpdaterTool(RepositoryTool):
+    """Tool for applying every update of a translation at once, one write per file."""
+
+    name: str = "File Content Batch Updater Tool"
+    description: str = (
+        "Applies a whole list of updates (FILE_PATH, CONTENT_TO_BE_DELETED_START_LINE, CONTENT_TO_BE_DELETED_END_LINE, NEW_CONTENT) "
+        "in a single call. Line numbers are the ones of the files before any update, the tool takes care of the order. "
+        "Nothing is written when an update is invalid or two updates overlap."
+    )
+    args_schema: Type[BaseModel] = FileContentBatchUpdaterToolInput
+
+    @trace_tool_run
+    def _run(self, updates: List[FileContentUpdate]) -> dict:
+        """Replace the line ranges of every update, file by file."""
+        parent_dir = self.resolved_repo_root
+
+        plans = {}
+        for update in updates:
+            update = FileContentUpdate.model_validate(update)
+            file_path = os.path.join(parent_dir, update.FILE_PATH)
+            start = update.CONTENT_TO_BE_DELETED_START_LINE
+            end = update.CONTENT_TO_BE_DELETED_END_LINE
+            if start < 0 or start > end:
+                return {"error": f"Invalid line range for {update.FILE_PATH}: got start={start}, end={end}"}
+            plans.setdefault(file_path, EditPlan(file_path)).replace(start, end, ["\n", *as_lines(update.NEW_CONTENT), "\n"])
+
+        # Every file is checked before the first one is written
+        updated_files = {}
+        for file_path, plan in plans.items():
+            if not os.path.exists(file_path):
+                return {"error": f"File not found: {file_path}"}
+            try:
+                updated_files[file_path] = plan.apply(read_markdown_lines(file_path))
+            except EditPlanError as e:
+                return {"error": str(e)}
+
+        for file_path, updated_lines in updated_files.items():
+            write_lines_atomically(file_path, updated_lines)
+            print(f"✅ Successfully updated file: {file_path}")
+
+        return {
+            "message": f"{len(updates)} updates applied to {len(updated_files)} files.",
+            "updated_files": {file_path: len(plan.edits) for file_path, plan in plans.items()},
+        }
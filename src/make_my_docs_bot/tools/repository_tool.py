@@ -0,0 +1,15 @@
+from crewai.tools import BaseTool
+from typing import Optional
+from make_my_docs_bot.tools.git_diff import default_repo_root
+
+
+class RepositoryTool(BaseTool):
+    """Base of the tools working on the docs repository, e.g. a worktree of the branch being synced."""
+
+    repo_root: Optional[str] = None
+    # Branch the changes are compared against
+    base_branch: str = "main"
+
+    @property
+    def resolved_repo_root(self) -> str:
+        return self.repo_root or default_repo_root()
@@ -0,0 +1,38 @@
+import os
+
+from make_my_docs_bot.instrumentation import count
+from make_my_docs_bot.tools.change_significance import DEFAULT_RULES, significant_sections
+from make_my_docs_bot.tools.git_blob_reader import get_blob_reader
+from make_my_docs_bot.tools.git_diff import get_file_diff, get_merge_base
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines, find_changed_sections
+
+
+def read_english_file(repo_root, file_path, ref):
+    """The English file as it is on ref, the working tree copy when ref doesn't have it."""
+    content = get_blob_reader(repo_root).read(ref, file_path)
+    if content is None:
+        content = os.path.join(repo_root, file_path)
+    return content
+
+
+def find_branch_changes(repo_root, file_path, base_branch, compare_branch, rules=DEFAULT_RULES):
+    """
+    Index of the English file_path on compare_branch and its changed sections, as
+    (section, full_context_flag) pairs. Hunks are visited bottom-up, like the analyzer tool does.
+
+    Sections reading the same as on the merge base once normalized by rules, e.g. reflowed or
+    with a new link target, are left out, they don't need translating. rules=None keeps them.
+    """
+    changed_lines = get_file_diff(repo_root, file_path, base_branch, compare_branch)[::-1]
+    index = index_markdown_lines(read_english_file(repo_root, file_path, compare_branch))
+    changed_sections = find_changed_sections(index, changed_lines)
+
+    if rules is not None and changed_sections:
+        base_content = get_blob_reader(repo_root).read(get_merge_base(repo_root, base_branch, compare_branch), file_path)
+        # A new page is all significant
+        if base_content is not None:
+            significant = significant_sections(index_markdown_lines(base_content), index, changed_sections, rules)
+            count("insignificant_sections", len(changed_sections) - len(significant))
+            changed_sections = significant
+
+    return index, changed_sections
@@ -0,0 +1,241 @@
+import os
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+from make_my_docs_bot.locales import LOCALES, map_locales
+from make_my_docs_bot.pydantic_models import SectionChange, SectionChanges
+from make_my_docs_bot.tools.git_blob_reader import get_blob_reader
+from make_my_docs_bot.tools.git_diff import get_merge_base
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines_without_context
+from make_my_docs_bot.tools.section_changes import find_branch_changes
+
+
+def flatten_headings(index):
+    """Headings of an index_markdown_lines_without_context tree in document order, without the page root."""
+    headings = []
+    stack = list(reversed(index.get('children', [])))
+    while stack:
+        node = stack.pop()
+        headings.append(node)
+        stack.extend(reversed(node.get('children', [])))
+    return headings
+
+
+def _section_end(headings, position, total_end_line):
+    # Last line before the next heading, a new heading inserted after it lands right before that heading
+    if position + 1 < len(headings):
+        return headings[position + 1]['start_line'] - 1
+    return total_end_line
+
+
+def read_base_index(repo_root, file_path, base_branch, compare_branch):
+    """Heading tree of the English file_path on the merge base of the branches, None for a page new on compare_branch."""
+    content = get_blob_reader(repo_root).read(get_merge_base(repo_root, base_branch, compare_branch), file_path)
+    return None if content is None else index_markdown_lines_without_context(content)
+
+
+def _signatures(headings):
+    return [(heading['level'], heading['title']) for heading in headings]
+
+
+def _levels(headings):
+    return [heading['level'] for heading in headings]
+
+
+def find_heading_changes(base_index, english_index) -> List[Tuple[str, int, int, int, int]]:
+    """
+    SequenceMatcher opcodes, without the equal ones, turning the headings of the English file on
+    the merge base into the branch ones, compared by level and title. Every heading of a page new
+    on the branch is added.
+    """
+    base = _signatures(flatten_headings(base_index)) if base_index is not None else []
+    english = _signatures(flatten_headings(english_index))
+    matcher = SequenceMatcher(None, base, english, autojunk=False)
+    return [opcode for opcode in matcher.get_opcodes() if opcode[0] != "equal"]
+
+
+def align_headings(base_index, english_index, translated_index) -> Tuple[Optional[str], Dict[int, object]]:
+    """
+    Ties a translation to one version of the English file, the merge base when it has the same
+    heading levels ("base"), else the branch when the translation already has its headings, e.g.
+    inserted by an earlier run ("branch"). Titles can't be compared across languages, so a
+    translation matching neither is not tied (None).
+
+    Also returns English heading start_line -> translated heading, for the branch headings the
+    merge base has unchanged, by level and title. New and renamed headings have no counterpart.
+    """
+    english = flatten_headings(english_index)
+    translated = flatten_headings(translated_index)
+    base = flatten_headings(base_index) if base_index is not None else []
+
+    if base_index is not None and _levels(translated) == _levels(base):
+        tied_to = "base"
+    elif _levels(translated) == _levels(english):
+        tied_to = "branch"
+    else:
+        return None, {}
+
+    matcher = SequenceMatcher(None, _signatures(base), _signatures(english), autojunk=False)
+    aligned = {}
+    for tag, base_start, base_end, english_start, english_end in matcher.get_opcodes():
+        if tag != "equal":
+            continue
+        for offset in range(english_end - english_start):
+            translated_position = (base_start if tied_to == "base" else english_start) + offset
+            aligned[english[english_start + offset]['start_line']] = translated[translated_position]
+    return tied_to, aligned
+
+
+def find_missing_sections(base_index, english_index, translated_index, translated_file_path) -> Optional[SectionChanges]:
+    """
+    One SectionChange per heading added to the English file since the merge base, base_index, which
+    the translated file doesn't have yet. Headings renamed in place, same count and levels, keep
+    their translated counterpart. None when the translation matches neither the merge base nor
+    the branch, the structure can't be checked locally.
+
+    Titles can't be compared across languages, so NEW_HEADING_TRANSLATED holds the English
+    title and still needs translating before it is inserted.
+    """
+    tied_to, _ = align_headings(base_index, english_index, translated_index)
+    if tied_to != "base":
+        # Already has the headings of the branch, or can't be told apart
+        return None if tied_to is None else SectionChanges(changes=[])
+
+    english = flatten_headings(english_index)
+    # Tied to the merge base, the translated headings are at the positions of the English ones there
+    translated = flatten_headings(translated_index)
+
+    changes = []
+    for tag, base_start, base_end, english_start, english_end in find_heading_changes(base_index, english_index):
+        if tag == "delete":
+            continue
+        if tag == "replace" and _levels(translated[base_start:base_end]) == _levels(english[english_start:english_end]):
+            continue
+
+        # New headings go before the first merge base heading the branch doesn't keep, or the next kept one
+        previous_position = base_start - 1
+        if previous_position >= 0:
+            previous = translated[previous_position]
+            previous_title = previous['title']
+            previous_start = previous['start_line']
+            previous_end = _section_end(translated, previous_position, translated_index['end_line'])
+        else:
+            previous_title = translated_index['title']
+            previous_start = translated_index['start_line']
+            previous_end = (translated[0]['start_line'] - 1) if translated else translated_index['end_line']
+
+        following = translated[base_start] if base_start < len(translated) else None
+
+        for english_heading in english[english_start:english_end]:
+            changes.append(SectionChange(
+                FILE_PATH=translated_file_path,
+                PREVIOUS_SECTION=previous_title,
+                PREVIOUS_SECTION_START_LINE=previous_start,
+                PREVIOUS_SECTION_END_LINE=previous_end,
+                NEXT_SECTION=following['title'] if following else None,
+                NEXT_SECTION_START_LINE=following['start_line'] if following else None,
+                NEXT_SECTION_END_LINE=following['end_line'] if following else None,
+                NEW_HEADING_TRANSLATED=english_heading['title'],
+                LEVEL=min(max(english_heading['level'], 1), 4),
+                REASON=(
+                    f"English heading '{english_heading['title']}' (Level:{english_heading['level']}, "
+                    f"line {english_heading['start_line']}) is new on the branch and has no counterpart "
+                    f"in the translation, it belongs after '{previous_title}' which ends on line {previous_end}"
+                ),
+            ))
+
+    return SectionChanges(changes=changes)
+
+
+def find_structural_changes(repo_root, file_path, base_branch, compare_branch) -> Dict[str, Optional[SectionChanges]]:
+    """
+    Missing sections of every translation of the English file_path, keyed by translated path.
+    A translation which does not exist, or can't be tied to the English headings, maps to None,
+    the structure can't be checked locally.
+    """
+    # Indexed once, every locale is compared against the same trees
+    english_index = index_markdown_lines_without_context(os.path.join(repo_root, file_path))
+    base_index = read_base_index(repo_root, file_path, base_branch, compare_branch)
+
+    def compare(locale):
+        translated_file_path = locale.translated_path(file_path)
+        full_path = os.path.join(repo_root, translated_file_path)
+        if not os.path.exists(full_path):
+            return None
+        return find_missing_sections(base_index, english_index, index_markdown_lines_without_context(full_path), translated_file_path)
+
+    return {
+        locale.translated_path(file_path): changes
+        for locale, changes in map_locales(compare).items()
+    }
+
+
+def is_structure_consistent(structural_changes, heading_changes) -> bool:
+    """Nothing for the index mapping tasks to do: the English headings didn't change and no translation misses any."""
+    return not heading_changes and all(changes is not None and not changes.changes for changes in structural_changes.values())
+
+
+def _expand(ranges, margin, count):
+    """Widens (first, last) position ranges by margin on both sides, clipped to count, and merges them."""
+    expanded = []
+    for first, last in sorted(ranges):
+        first, last = max(first - margin, 0), min(last + margin, count - 1)
+        if expanded and first <= expanded[-1][1] + 1:
+            expanded[-1] = (expanded[-1][0], max(expanded[-1][1], last))
+        else:
+            expanded.append((first, last))
+    return [position for first, last in expanded for position in range(first, last + 1)]
+
+
+def find_heading_windows(repo_root, file_path, base_branch, compare_branch, anchors=2) -> Dict[str, Optional[List[int]]]:
+    """
+    Heading positions (document order, as in flatten_headings) around the sections of the English
+    file_path changed between the branches, for the English file and every translation, keyed by path.
+
+    The changed headings get `anchors` neighbours on each side. A translation's window is also widened
+    by the difference in heading count, since its missing headings shift every position after them.
+    None means the whole tree is needed, e.g. when the page itself is new or most of it changed.
+    """
+    whole_trees = dict.fromkeys([file_path, *(locale.translated_path(file_path) for locale in LOCALES)])
+
+    english = flatten_headings(index_markdown_lines_without_context(os.path.join(repo_root, file_path)))
+    positions = {heading['start_line']: position for position, heading in enumerate(english)}
+
+    branch_index, changed_sections = find_branch_changes(repo_root, file_path, base_branch, compare_branch)
+
+    changed_ranges = []
+    for section, full_context_flag in changed_sections:
+        if section is branch_index:
+            if full_context_flag:
+                return whole_trees
+            # Only the text before the first heading changed
+            changed_ranges.append((0, 0))
+            continue
+
+        if section['start_line'] not in positions:
+            # The checked out file isn't the branch's, positions can't be trusted
+            return whole_trees
+
+        first = positions[section['start_line']]
+        last = first
+        if full_context_flag:
+            while last + 1 < len(english) and english[last + 1]['start_line'] <= section['end_line']:
+                last += 1
+        changed_ranges.append((first, last))
+
+    if not changed_ranges:
+        return whole_trees
+
+    def heading_count(locale):
+        full_path = os.path.join(repo_root, locale.translated_path(file_path))
+        return len(flatten_headings(index_markdown_lines_without_context(full_path))) if os.path.exists(full_path) else 0
+
+    windows = {file_path: _expand(changed_ranges, anchors, len(english))}
+    for locale, translated_count in map_locales(heading_count).items():
+        margin = anchors + abs(len(english) - translated_count)
+        windows[locale.translated_path(file_path)] = _expand(changed_ranges, margin, translated_count)
+
+    # Rendering nearly everything anyway, the full tree reads better
+    if len(windows[file_path]) * 4 >= len(english) * 3:
+        return whole_trees
+    return windows
@@ -0,0 +1,226 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from make_my_docs_bot.instrumentation import count
+from make_my_docs_bot.locales import LOCALES
+from make_my_docs_bot.tools.change_significance import normalize_section
+from make_my_docs_bot.tools.edit_plan import EditPlan, EditPlanError, write_lines_atomically
+from make_my_docs_bot.tools.git_diff import get_state_directory
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines, read_markdown_lines
+from make_my_docs_bot.tools.structure_diff import align_headings
+
+
+def section_hash(content):
+    return hashlib.sha256(normalize_section(content).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    """
+    SQLite store of translated sections keyed by (locale, normalized English content hash, heading level).
+    Entries unused for max_age_days, and the least recently used ones beyond max_entries, are evicted.
+    """
+
+    def __init__(self, path, max_age_days=90, max_entries=20000):
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " locale TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL,"
+            " level INTEGER NOT NULL,"
+            " translation TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL,"
+            " PRIMARY KEY (locale, content_hash, level))"
+        )
+        self.prune()
+
+    def lookup(self, locale, content, level) -> Optional[str]:
+        key = (locale, section_hash(content), level)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT translation FROM translations WHERE locale = ? AND content_hash = ? AND level = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                count("translation_memory_misses")
+                return None
+
+            self.hits += 1
+            count("translation_memory_hits")
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE translations SET last_used_at = ? WHERE locale = ? AND content_hash = ? AND level = ?",
+                    (time.time(), *key)
+                )
+            return row[0]
+
+    def store(self, locale, content, level, translation):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                (locale, section_hash(content), level, translation, now, now)
+            )
+
+    def prune(self):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM translations WHERE last_used_at < ?",
+                (time.time() - self.max_age_days * 24 * 60 * 60,)
+            )
+            self._connection.execute(
+                "DELETE FROM translations WHERE rowid NOT IN ("
+                " SELECT rowid FROM translations ORDER BY last_used_at DESC LIMIT ?)",
+                (self.max_entries,)
+            )
+
+
+_memories = {}
+_memories_lock = threading.Lock()
+
+
+def get_translation_memory(repo_root) -> TranslationMemory:
+    with _memories_lock:
+        if repo_root not in _memories:
+            path = os.path.join(get_state_directory(repo_root), "translation_memory.sqlite3")
+            _memories[repo_root] = TranslationMemory(path)
+        return _memories[repo_root]
+
+
+def section_content(section, full_context_flag):
+    return section['content'] if full_context_flag else section['before_first_children_content']
+
+
+def section_span(section, full_context_flag):
+    # START_LINE AND END_LINE ARE INCLUDED
+    end_line = section['end_line'] if full_context_flag else section['first_children_start_line'] - 1
+    return section['start_line'], end_line
+
+
+def aligned_sections(base_index, english_index, translated_index):
+    """
+    English heading start_line -> translated heading, for the headings the English file on the merge
+    base, base_index, has unchanged. None when the translation has the headings of neither the merge
+    base nor the branch, see align_headings.
+    """
+    tied_to, aligned = align_headings(base_index, english_index, translated_index)
+    return None if tied_to is None else aligned
+
+
+def translated_counterparts(repo_root, file_path, base_index, english_index, sections):
+    """
+    locale -> {English start_line -> translated section or None} of the given English sections in
+    every existing translation of file_path. The page root is the translated page root, new and
+    renamed sections have no counterpart.
+    """
+    counterparts = {}
+    for locale in LOCALES:
+        translated_path = os.path.join(repo_root, locale.translated_path(file_path))
+        if not os.path.exists(translated_path):
+            continue
+        translated_index = index_markdown_lines(translated_path)
+        aligned = aligned_sections(base_index, english_index, translated_index) or {}
+        counterparts[locale] = {
+            section['start_line']: translated_index if section is english_index else aligned.get(section['start_line'])
+            for section in sections
+        }
+    return counterparts
+
+
+def collect_translated_sections(repo_root, file_path, base_index, english_index, changed_sections):
+    """
+    Current translated text of every changed English section, keyed by (locale, english start_line,
+    full_context_flag). Only sections with a counterpart through the merge base are included.
+    """
+    collected = {}
+    for locale in LOCALES:
+        translated_path = os.path.join(repo_root, locale.translated_path(file_path))
+        if not os.path.exists(translated_path):
+            continue
+
+        aligned = aligned_sections(base_index, english_index, index_markdown_lines(translated_path))
+        if aligned is None:
+            continue
+
+        lines = read_markdown_lines(translated_path)
+        for section, full_context_flag in changed_sections:
+            translated_section = aligned.get(section['start_line'])
+            if translated_section is None:
+                continue
+            start_line, end_line = section_span(translated_section, full_context_flag)
+            collected[(locale.code, section['start_line'], full_context_flag)] = "".join(lines[start_line:end_line + 1])
+
+    return collected
+
+
+def remember_translations(repo_root, changed_sections, before, after):
+    """Stores the translated sections which the crew changed, `before` and `after` come from collect_translated_sections."""
+    memory = get_translation_memory(repo_root)
+    sections = {(section['start_line'], full_context_flag): section for section, full_context_flag in changed_sections}
+
+    for key, translation in after.items():
+        # Sections which didn't line up before the run, or were left untouched, are not trusted as translations
+        if key not in before or before[key] == translation:
+            continue
+        locale, start_line, full_context_flag = key
+        section = sections[(start_line, full_context_flag)]
+        memory.store(locale, section_content(section, full_context_flag), section['level'], translation)
+
+
+def translate_from_memory(repo_root, file_path, base_index, english_index, changed_sections):
+    """
+    Applies remembered translations of every changed section to every translated file, without any LLM.
+    Only happens when all of them are remembered, returns the updated files, or None when nothing was applied.
+    """
+    if not changed_sections:
+        return None
+
+    memory = get_translation_memory(repo_root)
+    planned_edits = {}
+
+    for locale in LOCALES:
+        translated_file_path = locale.translated_path(file_path)
+        translated_path = os.path.join(repo_root, translated_file_path)
+        if not os.path.exists(translated_path):
+            return None
+
+        aligned = aligned_sections(base_index, english_index, index_markdown_lines(translated_path))
+        if aligned is None:
+            return None
+
+        edits = []
+        for section, full_context_flag in changed_sections:
+            translated_section = aligned.get(section['start_line'])
+            if translated_section is None:
+                return None
+            translation = memory.lookup(locale.code, section_content(section, full_context_flag), section['level'])
+            if translation is None:
+                return None
+            edits.append((*section_span(translated_section, full_context_flag), translation))
+
+        planned_edits[translated_file_path] = edits
+
+    updated_files = {}
+    for translated_file_path, edits in planned_edits.items():
+        translated_path = os.path.join(repo_root, translated_file_path)
+        plan = EditPlan(translated_path)
+        for start_line, end_line, translation in edits:
+            plan.replace(start_line, end_line, translation.splitlines(keepends=True))
+        try:
+            updated_files[translated_path] = plan.apply(read_markdown_lines(translated_path))
+        except EditPlanError:
+            return None
+
+    for translated_path, updated_lines in updated_files.items():
+        write_lines_atomically(translated_path, updated_lines)
+
+    return list(planned_edits)
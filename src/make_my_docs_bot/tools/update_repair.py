@@ -0,0 +1,136 @@
+import os
+from typing import List, Tuple
+
+from make_my_docs_bot.locales import LOCALES
+from make_my_docs_bot.pydantic_models import FileContentUpdate
+from make_my_docs_bot.tools.edit_plan import as_lines
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines, index_markdown_lines_without_context
+from make_my_docs_bot.tools.structure_diff import flatten_headings
+
+# How many lines a range may be away from a section before it isn't taken for that section, enough
+# for ranges counted from 1 or with the end line left out
+MAX_SNAP_DISTANCE = 2
+
+
+class UpdateRepairError(ValueError):
+    """Updates which can't be matched to a section of their file."""
+
+
+def _headings(text):
+    """(level, title) of every heading of text, as the index of a file would have them."""
+    return [(heading['level'], heading['title']) for heading in flatten_headings(index_markdown_lines_without_context(as_lines(text)))]
+
+
+def section_spans(index) -> List[Tuple[int, int, List]]:
+    """
+    (start_line, end_line, headings) of every section of an index_markdown_lines tree, both
+    with and without its children, the ranges a translator gets from the mapping tool.
+    """
+    spans = []
+    for section in [index, *flatten_headings(index)]:
+        headings = [(heading['level'], heading['title']) for heading in flatten_headings(section) if heading is not index]
+        if section is not index:
+            headings.insert(0, (section['level'], section['title']))
+        spans.append((section['start_line'], section['end_line'], headings))
+        if section['children']:
+            spans.append((section['start_line'], section['first_children_start_line'] - 1, headings[:0 if section is index else 1]))
+    return spans
+
+
+def _snap(update, index):
+    """The (start_line, end_line) of the file of index update is meant for, or None."""
+    start, end = update.CONTENT_TO_BE_DELETED_START_LINE, update.CONTENT_TO_BE_DELETED_END_LINE
+    headings = _headings(update.NEW_CONTENT)
+    levels = [level for level, _ in headings]
+    spans = section_spans(index)
+
+    # Sections with the headings of the new content, by level and count since the titles are
+    # translated, but the exact same headings win
+    matching = [span for span in spans if [level for level, _ in span[2]] == levels]
+    exact = [span for span in matching if span[2] == headings and headings]
+
+    if start >= 0 and end >= 0 and matching:
+        distance = lambda span: abs(span[0] - start) + abs(span[1] - end)
+        nearest = min(matching, key=lambda span: (distance(span), span not in exact))
+        if distance(nearest) <= MAX_SNAP_DISTANCE:
+            return nearest[0], nearest[1]
+
+    # Not a whole section, e.g. the paragraphs under a heading, which is fine as long as it has the
+    # headings of the new content and starts at a heading when the new content does
+    heading_lines = {heading['start_line']: heading['level'] for heading in flatten_headings(index)}
+    if 0 <= start <= end <= index['end_line']:
+        range_levels = [heading_lines[line] for line in range(start, end + 1) if line in heading_lines]
+        if range_levels == levels and (start in heading_lines) == bool(update.NEW_CONTENT.lstrip().startswith("#")):
+            return start, end
+
+    # No usable range, e.g. -1, but the new content starts with the headings of exactly one section
+    if len(exact) == 1:
+        return exact[0][0], exact[0][1]
+    return None
+
+
+def repair_content_updates(repo_root, updates) -> Tuple[List[FileContentUpdate], List[str]]:
+    """
+    Checks the FileContentUpdates of the translators against the heading index of their files and
+    repairs them: paths relative to repo_root, ranges snapped to the section they are meant for,
+    e.g. counted from 1 or ending a line early, and updates of the same section or of a section
+    inside another updated one dropped for the last or the outer one.
+
+    Returns the repaired updates, with the 0-based line numbers of index_markdown_lines, and a
+    note for every repair. Raises UpdateRepairError when an update can't be matched to a section.
+    """
+    translated_directories = [locale.directory.rstrip("/") + "/" for locale in LOCALES]
+    problems = []
+    notes = []
+    snapped = {}
+    for update in updates:
+        update = FileContentUpdate.model_validate(update)
+        file_path = update.FILE_PATH
+        if os.path.isabs(file_path):
+            file_path = os.path.relpath(file_path, repo_root)
+        file_path = os.path.normpath(file_path).replace(os.sep, "/")
+        if not any(file_path.startswith(directory) for directory in translated_directories):
+            problems.append(f"{update.FILE_PATH} is not a translated file")
+            continue
+        full_path = os.path.join(repo_root, file_path)
+        if not os.path.exists(full_path):
+            problems.append(f"File not found: {update.FILE_PATH}")
+            continue
+
+        span = _snap(update, index_markdown_lines(full_path))
+        if span is None:
+            problems.append(
+                f"No section of {file_path} matches lines {update.CONTENT_TO_BE_DELETED_START_LINE}-"
+                f"{update.CONTENT_TO_BE_DELETED_END_LINE}"
+            )
+            continue
+        if span != (update.CONTENT_TO_BE_DELETED_START_LINE, update.CONTENT_TO_BE_DELETED_END_LINE):
+            notes.append(
+                f"{file_path}: lines {update.CONTENT_TO_BE_DELETED_START_LINE}-{update.CONTENT_TO_BE_DELETED_END_LINE} "
+                f"snapped to the section at lines {span[0]}-{span[1]}"
+            )
+        # A later update of the same section replaces the earlier one
+        if (file_path, span) in snapped:
+            notes.append(f"{file_path}: lines {span[0]}-{span[1]} were updated twice, kept the last update")
+        snapped[(file_path, span)] = update.NEW_CONTENT
+
+    if problems:
+        raise UpdateRepairError("; ".join(problems))
+
+    repaired = []
+    for (file_path, (start, end)), new_content in snapped.items():
+        # Sections nest or are apart, an overlapping update is inside another one
+        outer = [
+            (other_start, other_end) for (other_path, (other_start, other_end)) in snapped
+            if other_path == file_path and (other_start, other_end) != (start, end) and other_start <= start and end <= other_end
+        ]
+        if outer:
+            notes.append(f"{file_path}: lines {start}-{end} are inside the update of lines {outer[0][0]}-{outer[0][1]}, dropped")
+            continue
+        repaired.append(FileContentUpdate(
+            FILE_PATH=file_path,
+            CONTENT_TO_BE_DELETED_START_LINE=start,
+            CONTENT_TO_BE_DELETED_END_LINE=end,
+            NEW_CONTENT=new_content,
+        ))
+    return repaired, notes
@@ -0,0 +1,112 @@
+import contextlib
+import fcntl
+import os
+import shutil
+import threading
+
+from make_my_docs_bot.tools.git_diff import get_state_directory, run_git
+
+
+class WorktreeError(Exception):
+    pass
+
+
+class WorktreePool:
+    """
+    Git worktrees of the repository under its git dir, one per branch being synced, so branches can
+    be processed in parallel without touching the developer's checkout.
+
+    Worktrees are checked out detached at the branch tip, the branch itself may stay checked out
+    elsewhere, commits go to the branch ref directly (see GitCommitEngine). A released worktree is
+    kept and recycled for the next branch, checking out another branch then only rewrites the files
+    which differ. Worktrees are locked with flock while in use, so several runs share the pool and a
+    crashed run never holds one.
+    """
+
+    def __init__(self, repo_root, max_idle=4):
+        self.repo_root = repo_root
+        self.max_idle = max_idle
+        self.directory = os.path.join(get_state_directory(repo_root), "worktrees")
+        os.makedirs(self.directory, exist_ok=True)
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _git(self, args, cwd=None):
+        result = run_git(args, cwd=cwd or self.repo_root)
+        if result.returncode != 0:
+            raise WorktreeError(f"git {' '.join(args[:2])} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    def _worktrees(self):
+        return sorted(
+            os.path.join(self.directory, name) for name in os.listdir(self.directory)
+            if os.path.isdir(os.path.join(self.directory, name))
+        )
+
+    def _try_lock(self, path):
+        lock_file = open(path + ".lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._locks[path] = lock_file
+        return True
+
+    def _unlock(self, path):
+        lock_file = self._locks.pop(path)
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        lock_file.close()
+
+    def acquire(self, branch) -> str:
+        """Root of a worktree with the tip of branch checked out and nothing else in it."""
+        with self._lock:
+            for path in self._worktrees():
+                if path in self._locks or not self._try_lock(path):
+                    continue
+                try:
+                    # Recycled, leftovers of the last branch are thrown away
+                    self._git(["checkout", "-q", "--force", "--detach", branch], cwd=path)
+                    self._git(["clean", "-q", "-f", "-d"], cwd=path)
+                except WorktreeError:
+                    # e.g. removed by hand, the pool starts it over
+                    self._unlock(path)
+                    self._remove(path)
+                    continue
+                return path
+
+            number = 0
+            while os.path.exists(os.path.join(self.directory, f"worktree-{number}")):
+                number += 1
+            path = os.path.join(self.directory, f"worktree-{number}")
+            self._try_lock(path)
+            try:
+                self._git(["worktree", "add", "-q", "--detach", path, branch])
+            except WorktreeError:
+                self._unlock(path)
+                raise
+            return path
+
+    def release(self, path):
+        """Returns the worktree to the pool, idle ones above max_idle are removed."""
+        with self._lock:
+            self._unlock(path)
+            idle = [worktree for worktree in self._worktrees() if worktree not in self._locks]
+            for worktree in idle[self.max_idle:]:
+                if self._try_lock(worktree):
+                    self._remove(worktree)
+                    self._unlock(worktree)
+
+    def _remove(self, path):
+        result = run_git(["worktree", "remove", "--force", path], cwd=self.repo_root)
+        if result.returncode != 0:
+            shutil.rmtree(path, ignore_errors=True)
+            run_git(["worktree", "prune"], cwd=self.repo_root)
+
+    @contextlib.contextmanager
+    def checkout(self, branch):
+        path = self.acquire(branch)
+        try:
+            yield path
+        finally:
+            self.release(path)
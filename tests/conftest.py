@@ -0,0 +1,42 @@
+import os
+import subprocess
+
+import pytest
+
+
+class DocsRepo:
+    """Throwaway docs repository, main holds the merge base the tests branch off from."""
+
+    def __init__(self, root):
+        self.root = str(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.git("init", "-q", "-b", "main")
+
+    def git(self, *args):
+        result = subprocess.run(["git", *args], cwd=self.root, capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+
+    def write(self, file_path, text):
+        full_path = os.path.join(self.root, file_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def read(self, file_path):
+        with open(os.path.join(self.root, file_path), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def commit(self, message="Update docs"):
+        self.git("add", "-A")
+        self.git("commit", "-q", "-m", message)
+        return self.git("rev-parse", "HEAD")
+
+
+@pytest.fixture
+def docs_repo(tmp_path, monkeypatch):
+    for variable in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(variable, "Docs Bot")
+    for variable in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(variable, "docs-bot@example.com")
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", os.devnull)
+    return DocsRepo(tmp_path / "docs-repo")
@@ -0,0 +1,204 @@
+import pytest
+
+from make_my_docs_bot.tools.block_changes import block_kind, find_block_changes, translate_block_change, translate_changed_blocks
+from make_my_docs_bot.tools.edit_plan import EditPlan, as_lines
+from make_my_docs_bot.tools.section_changes import find_branch_changes
+
+BASE = """## Usage
+
+Install the package first.
+
+- pip install it
+- or use uv
+
+| Option | Default |
+| ------ | ------- |
+| cache  | on      |
+
+Run the command when you are done."""
+
+START_LINE = 40
+
+
+def mark(text, marker="[ko]"):
+    """Stand-in translation keeping the kind of every block: a marker at the end of each non blank line."""
+    return "".join(line.rstrip("\n") + f" {marker}\n" if line.strip() else line for line in text.splitlines(keepends=True))
+
+
+class FakeTranslator:
+    def __init__(self, failing=False):
+        self.failing = failing
+        self.messages = []
+
+    def call(self, messages):
+        self.messages.append(messages)
+        if self.failing:
+            raise RuntimeError("rate limited")
+        return mark(messages[-1]["content"].split("\n\n", 1)[1])
+
+
+def translated_section(content):
+    # The translated span of a section ends with the blank line before the next heading
+    return as_lines(mark(content)) + ["\n"]
+
+
+def apply_changes(base, branch, llm=None):
+    """The translated section of base after translating the block changes turning base into branch."""
+    translated_lines = translated_section(base)
+    changes = find_block_changes(base, branch, translated_lines, START_LINE)
+    if changes is None:
+        return None, None
+
+    # Line numbers are the ones of the translated file, the section starts at START_LINE
+    lines = ["other line\n"] * START_LINE + translated_lines
+    plan = EditPlan("docs/ko/page.mdx")
+    for change in changes:
+        plan.replace(change.start_line, change.end_line, translate_block_change(llm or FakeTranslator(), "Korean", "Usage", change))
+    return changes, plan.apply(lines)[START_LINE:]
+
+
+@pytest.mark.parametrize("branch", [
+    # Replaced paragraph
+    BASE.replace("Install the package first.", "Install the package before anything else."),
+    # Inserted paragraph
+    BASE.replace("- or use uv\n", "- or use uv\n\nBoth work on every platform.\n"),
+    # Deleted paragraph
+    BASE.replace("Install the package first.\n\n", ""),
+    # Appended paragraph
+    BASE + "\n\nAsk for help in the forum.",
+    # Table and last paragraph replaced at once
+    BASE.replace("| cache  | on      |", "| cache  | off     |").replace("when you are done", "when ready"),
+])
+def test_translated_block_changes_give_the_translated_branch(branch):
+    changes, updated_lines = apply_changes(BASE, branch)
+
+    assert len(changes) >= 1
+    assert updated_lines == translated_section(branch)
+
+
+def test_block_changes_edit_only_the_changed_lines():
+    branch = BASE.replace("- or use uv", "- or use pipx")
+    changes, _ = apply_changes(BASE, branch)
+
+    [change] = changes
+    # The list is lines 4-5 of the section
+    assert (change.start_line, change.end_line) == (START_LINE + 4, START_LINE + 5)
+    assert change.english == "- pip install it\n- or use pipx"
+    assert change.before.startswith("Install the package first.\n\nInstall the package first. [ko]")
+    assert change.after.startswith("| Option | Default |")
+
+
+def test_insertion_and_deletion_ranges():
+    inserted, _ = apply_changes(BASE, BASE.replace("- or use uv\n", "- or use uv\n\nNew paragraph.\n"))
+    [change] = inserted
+    # Right after the list's text, the blank line after the list follows the inserted block
+    assert (change.start_line, change.end_line) == (START_LINE + 6, START_LINE + 5)
+    assert (change.prefix, change.suffix) == ("\n", "")
+
+    deleted, _ = apply_changes(BASE, BASE.replace("- pip install it\n- or use uv\n\n", ""))
+    [change] = deleted
+    assert (change.start_line, change.end_line) == (START_LINE + 3, START_LINE + 5)
+    assert change.english == ""
+
+
+def test_changes_at_the_start_of_a_section_without_heading():
+    base = BASE.split("\n\n", 1)[1]
+
+    changes, updated_lines = apply_changes(base, "Read this first.\n\n" + base)
+    assert [(change.start_line, change.end_line, change.suffix) for change in changes] == [(START_LINE, START_LINE - 1, "\n")]
+    assert updated_lines == translated_section("Read this first.\n\n" + base)
+
+    branch = base.split("\n\n", 1)[1]
+    changes, updated_lines = apply_changes(base, branch)
+    assert [(change.start_line, change.end_line) for change in changes] == [(START_LINE, START_LINE + 1)]
+    assert updated_lines == translated_section(branch)
+
+
+def test_added_heading_is_left_to_the_crew():
+    branch = BASE.replace("Run the command", "### Next steps\n\nRun the command")
+
+    assert find_block_changes(BASE, branch, translated_section(BASE), START_LINE) is None
+
+
+def test_translation_with_other_blocks_is_left_to_the_crew():
+    translated_lines = translated_section(BASE.replace("- pip install it\n- or use uv", "Install it with pip or uv."))
+
+    assert find_block_changes(BASE, BASE.replace("first", "at first"), translated_lines, START_LINE) is None
+
+
+def test_block_kinds():
+    assert [block_kind([line]) for line in ["### Title\n", "```python\n", "1. First\n", "* Item\n", "| a |\n", "<Note>\n", "Text\n"]] == [
+        "heading3", "code", "list", "list", "table", "component", "text"
+    ]
+
+
+def test_deletion_needs_no_translation():
+    llm = FakeTranslator(failing=True)
+    changes, updated_lines = apply_changes(BASE, BASE.replace("Install the package first.\n\n", ""), llm)
+
+    assert llm.messages == []
+    assert updated_lines == translated_section(BASE.replace("Install the package first.\n\n", ""))
+
+
+def test_failed_translation_raises():
+    with pytest.raises(RuntimeError):
+        apply_changes(BASE, BASE.replace("first", "at first"), FakeTranslator(failing=True))
+
+
+PAGE = """---
+title: Page
+---
+
+## Install
+
+Install the package first.
+
+Then configure it.
+
+## Deploy
+
+Build the image.
+
+Push it to the registry.
+"""
+
+
+class SelectiveTranslator(FakeTranslator):
+    """Fails on the changed parts of the section titled failing_title."""
+
+    def __init__(self, failing_title=None):
+        super().__init__()
+        self.failing_title = failing_title
+
+    def call(self, messages):
+        if self.failing_title and f"section '{self.failing_title}'" in messages[-1]["content"]:
+            raise RuntimeError("rate limited")
+        return super().call(messages)
+
+
+def test_sections_with_a_failed_change_are_left_to_the_crew(docs_repo):
+    docs_repo.write("docs/en/page.mdx", PAGE)
+    for locale in ("ko", "pt-BR"):
+        docs_repo.write(f"docs/{locale}/page.mdx", PAGE.replace("first.", "first. [old]").replace("registry.", "registry. [old]"))
+    docs_repo.commit("Add the page")
+    docs_repo.git("checkout", "-q", "-b", "feature")
+    docs_repo.write("docs/en/page.mdx", PAGE.replace("Then configure it.", "Then configure it well.").replace("Build the image.", "Build the container image."))
+    docs_repo.commit("Edit both sections")
+
+    english_index, changed_sections = find_branch_changes(docs_repo.root, "docs/en/page.mdx", "main", "feature")
+    assert [section['title'] for section, _ in changed_sections] == ["Deploy", "Install"]
+    translators = {"ko": SelectiveTranslator(), "pt-BR": SelectiveTranslator(failing_title="Deploy")}
+
+    handled, updated_files = translate_changed_blocks(
+        docs_repo.root, "docs/en/page.mdx", "main", "feature", english_index, changed_sections,
+        lambda locale: translators[locale.code]
+    )
+
+    assert [section['title'] for section, _ in handled] == ["Install"]
+    assert sorted(updated_files) == ["docs/ko/page.mdx", "docs/pt-BR/page.mdx"]
+    for locale in ("ko", "pt-BR"):
+        translated = docs_repo.read(f"docs/{locale}/page.mdx")
+        assert "Then configure it well. [ko]\n" in translated
+        # The failed section is untouched in every translation
+        assert "Build the image.\n\nPush it to the registry. [old]\n" in translated
+        assert translated.startswith("---\ntitle: Page\n---\n\n## Install\n\nInstall the package first. [old]\n\n")
@@ -0,0 +1,162 @@
+from make_my_docs_bot.tools.chunked_translation import (
+    chunk_lines,
+    clean_translation,
+    estimate_text_tokens,
+    split_blocks,
+    translate_oversized_sections,
+)
+from make_my_docs_bot.tools.edit_plan import as_lines
+from make_my_docs_bot.tools.section_changes import find_branch_changes
+from make_my_docs_bot.tools.structure_diff import read_base_index
+
+SECTION = [
+    "## Guide\n",
+    "\n",
+    "First paragraph of the guide,\n",
+    "spread over two lines.\n",
+    "\n",
+    "```python\n",
+    "# a comment, not a heading\n",
+    "\n",
+    "print('hello')\n",
+    "```\n",
+    "After the code.\n",
+    "\n",
+    "### Details\n",
+    "\n",
+    "Second paragraph with the details.\n",
+]
+
+
+def test_blocks_join_back_into_the_lines():
+    blocks = split_blocks(SECTION)
+
+    assert [line for block in blocks for line in block] == SECTION
+    assert blocks[0] == ["## Guide\n", "\n"]
+    assert blocks[1] == ["First paragraph of the guide,\n", "spread over two lines.\n", "\n"]
+    assert blocks[2] == ["```python\n", "# a comment, not a heading\n", "\n", "print('hello')\n", "```\n"]
+    assert blocks[3] == ["After the code.\n", "\n"]
+
+
+def test_chunks_stay_within_the_budget_and_keep_blocks_whole():
+    lines = [f"Paragraph {i} of a long section.\n" for i in range(40)]
+    lines = [line for paragraph in lines for line in (paragraph, "\n")]
+    chunks = chunk_lines(lines, 50)
+
+    assert len(chunks) > 1
+    assert [line for chunk in chunks for line in chunk] == lines
+    assert all(estimate_text_tokens("".join(chunk)) <= 50 for chunk in chunks)
+    assert all(chunk[-1] == "\n" for chunk in chunks)
+
+
+def test_larger_block_is_a_chunk_of_its_own():
+    code = ["```\n"] + [f"line {i}\n" for i in range(50)] + ["```\n"]
+    chunks = chunk_lines(["Intro.\n", "\n"] + code + ["Outro.\n"], 20)
+
+    assert chunks == [["Intro.\n", "\n"], code, ["Outro.\n"]]
+
+
+def test_chunk_past_half_its_budget_ends_before_a_heading():
+    chunks = chunk_lines(SECTION, 24)
+
+    assert [chunk[0] for chunk in chunks] == ["## Guide\n", "```python\n", "### Details\n"]
+
+
+def test_wrapping_code_block_is_removed_from_answers():
+    assert clean_translation("```markdown\n번역\n```", "Text") == "번역"
+    assert clean_translation("```python\nprint()\n```", "```python\nprint()\n```") == "```python\nprint()\n```"
+
+
+class FakeTranslator:
+    """Marks every non blank line of the chunk it is given, or fails when told to."""
+
+    def __init__(self, marker, failing=False):
+        self.marker = marker
+        self.failing = failing
+        self.calls = 0
+
+    def call(self, messages):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("rate limited")
+        chunk = messages[-1]["content"].split("\n\n", 1)[1]
+        return "".join(f"{self.marker} {line}" if line.strip() else line for line in chunk.splitlines(keepends=True))
+
+
+# The guide without its sub-heading, so the whole section is the changed one
+ENGLISH = "".join(
+    ["---\n", "title: Page\n", "---\n", "\n", "## Intro\n", "\n", "Short intro.\n", "\n"]
+    + SECTION[:12] + SECTION[14:]
+    + ["\n", "## Outro\n", "\n", "The end.\n"]
+)
+
+
+def translated(marker):
+    return "".join(f"{marker} {line}" if line.strip() and line[0].isalpha() else line for line in as_lines(ENGLISH))
+
+
+def branch_with_longer_guide(docs_repo):
+    docs_repo.write("docs/en/page.mdx", ENGLISH)
+    docs_repo.write("docs/ko/page.mdx", translated("[ko-old]"))
+    docs_repo.write("docs/pt-BR/page.mdx", translated("[pt-old]"))
+    docs_repo.commit("Add the page")
+    docs_repo.git("checkout", "-q", "-b", "feature")
+    docs_repo.write("docs/en/page.mdx", ENGLISH.replace("Second paragraph with the details.", "Second paragraph with many more details."))
+    docs_repo.commit("Extend the guide")
+
+    english_index, changed_sections = find_branch_changes(docs_repo.root, "docs/en/page.mdx", "main", "feature")
+    base_index = read_base_index(docs_repo.root, "docs/en/page.mdx", "main", "feature")
+    return base_index, english_index, changed_sections
+
+
+def test_oversized_section_is_replaced_by_its_translated_chunks(docs_repo):
+    base_index, english_index, changed_sections = branch_with_longer_guide(docs_repo)
+    [(section, full_context_flag)] = changed_sections
+    assert section['title'] == "Guide"
+    translators = {"ko": FakeTranslator("[ko]"), "pt-BR": FakeTranslator("[pt]")}
+
+    handled, updated_files = translate_oversized_sections(
+        docs_repo.root, "docs/en/page.mdx", base_index, english_index, changed_sections,
+        lambda locale: translators[locale.code], max_tokens=30
+    )
+
+    assert handled == changed_sections
+    assert sorted(updated_files) == ["docs/ko/page.mdx", "docs/pt-BR/page.mdx"]
+    assert translators["ko"].calls > 1
+
+    lines = as_lines(docs_repo.read("docs/ko/page.mdx"))
+    old_lines = as_lines(translated("[ko-old]"))
+    start_line, end_line = section['start_line'], section['end_line']
+    # Lines outside of the section are untouched, the blank line before the next heading is kept
+    assert lines[:start_line] == old_lines[:start_line]
+    assert lines[end_line:] == old_lines[end_line:]
+    assert lines[end_line - 1] == "[ko] Second paragraph with many more details.\n"
+    assert lines[start_line:end_line] == [
+        f"[ko] {line}" if line.strip() else line
+        for line in as_lines(docs_repo.read("docs/en/page.mdx"))[start_line:end_line]
+    ]
+
+
+def test_failed_chunk_leaves_the_section_to_the_crew(docs_repo):
+    base_index, english_index, changed_sections = branch_with_longer_guide(docs_repo)
+    translators = {"ko": FakeTranslator("[ko]"), "pt-BR": FakeTranslator("[pt]", failing=True)}
+
+    handled, updated_files = translate_oversized_sections(
+        docs_repo.root, "docs/en/page.mdx", base_index, english_index, changed_sections,
+        lambda locale: translators[locale.code], max_tokens=30
+    )
+
+    assert (handled, updated_files) == ([], [])
+    assert docs_repo.read("docs/ko/page.mdx") == translated("[ko-old]")
+    assert docs_repo.read("docs/pt-BR/page.mdx") == translated("[pt-old]")
+
+
+def test_sections_within_the_budget_are_left_alone(docs_repo):
+    base_index, english_index, changed_sections = branch_with_longer_guide(docs_repo)
+
+    handled, updated_files = translate_oversized_sections(
+        docs_repo.root, "docs/en/page.mdx", base_index, english_index, changed_sections,
+        lambda locale: FakeTranslator("[x]", failing=True), max_tokens=10000
+    )
+
+    assert (handled, updated_files) == ([], [])
@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from make_my_docs_bot.tools.edit_plan import EditPlan, EditPlanError, as_lines, write_lines_atomically
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines
+
+LINES = [f"line {i}\n" for i in range(6)]
+
+
+def test_edits_use_the_line_numbers_before_any_of_them():
+    plan = EditPlan("page.mdx")
+    plan.replace(4, 5, ["four and five\n"])
+    plan.replace(0, 0, ["zero\n", "zero again\n"])
+    plan.insert(2, ["before two\n"])
+
+    assert plan.apply(LINES) == [
+        "zero\n", "zero again\n", "line 1\n", "before two\n", "line 2\n", "line 3\n", "four and five\n"
+    ]
+    assert LINES == [f"line {i}\n" for i in range(6)]
+
+
+def test_insertion_goes_before_a_replacement_of_the_same_line():
+    plan = EditPlan("page.mdx").replace(1, 1, ["one\n"]).insert(1, ["new\n"])
+
+    assert plan.apply(LINES)[:4] == ["line 0\n", "new\n", "one\n", "line 2\n"]
+
+
+def test_insertion_at_the_end_appends():
+    assert EditPlan("page.mdx").insert(6, ["last\n"]).apply(LINES) == LINES + ["last\n"]
+
+
+def test_empty_replacement_deletes():
+    assert EditPlan("page.mdx").replace(1, 4, []).apply(LINES) == ["line 0\n", "line 5\n"]
+
+
+@pytest.mark.parametrize("edits", [
+    [(2, 3), (3, 4)],
+    [(0, 5), (2, 2)],
+    [(-1, 0)],
+    [(7, 7)],
+    [(3, 1)],
+])
+def test_invalid_edits_are_rejected(edits):
+    plan = EditPlan("page.mdx")
+    for start_line, end_line in edits:
+        plan.replace(start_line, end_line, ["x\n"])
+
+    with pytest.raises(EditPlanError, match="page.mdx"):
+        plan.apply(LINES)
+
+
+def test_insertions_between_replacements_do_not_overlap():
+    plan = EditPlan("page.mdx").replace(1, 2, ["a\n"]).insert(3, ["b\n"]).replace(3, 4, ["c\n"])
+
+    assert plan.apply(LINES) == ["line 0\n", "a\n", "b\n", "c\n", "line 5\n"]
+
+
+def test_invalid_plan_leaves_the_file_untouched(tmp_path):
+    page = tmp_path / "page.mdx"
+    page.write_text("".join(LINES), encoding="utf-8")
+
+    with pytest.raises(EditPlanError):
+        EditPlan(str(page)).replace(0, 2, ["x\n"]).replace(2, 3, ["y\n"]).commit()
+    assert page.read_text(encoding="utf-8") == "".join(LINES)
+
+
+def test_commit_rewrites_the_file_and_its_cached_index(tmp_path):
+    page = tmp_path / "page.mdx"
+    page.write_text("Intro\n## A\nText\n", encoding="utf-8")
+    assert [child['title'] for child in index_markdown_lines(str(page))['children']] == ["A"]
+
+    EditPlan(str(page)).insert(3, ["## B\n", "More\n"]).commit()
+
+    assert page.read_text(encoding="utf-8") == "Intro\n## A\nText\n## B\nMore\n"
+    assert [child['title'] for child in index_markdown_lines(str(page))['children']] == ["A", "B"]
+    assert os.listdir(tmp_path) == ["page.mdx"]
+
+
+def test_as_lines_ends_every_line():
+    assert as_lines("a\nb") == ["a\n", "b\n"]
+    assert as_lines("") == []
+
+
+def test_atomic_write_keeps_the_file_mode(tmp_path):
+    page = tmp_path / "page.mdx"
+    page.write_text("old\n", encoding="utf-8")
+    os.chmod(page, 0o640)
+
+    write_lines_atomically(str(page), ["new\n"])
+
+    assert page.read_text(encoding="utf-8") == "new\n"
+    assert os.stat(page).st_mode & 0o777 == 0o640
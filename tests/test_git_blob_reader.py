@@ -0,0 +1,35 @@
+import pytest
+
+from make_my_docs_bot.tools.git_blob_reader import GitBlobReader
+
+
+@pytest.fixture
+def reader(docs_repo):
+    docs_repo.write("docs/en/page.mdx", "## Install\n")
+    docs_repo.write("docs/en/new page.mdx", "## New\n")
+    docs_repo.commit("Add the pages")
+    reader = GitBlobReader(docs_repo.root)
+    yield reader
+    reader.close()
+
+
+def test_reads_files_at_a_revision(reader, docs_repo):
+    docs_repo.write("docs/en/page.mdx", "## Installation\n")
+    docs_repo.commit("Rename the heading")
+
+    assert reader.read("main", "docs/en/page.mdx") == b"## Installation\n"
+    assert reader.read("main~1", "docs/en/page.mdx") == b"## Install\n"
+
+
+def test_path_with_spaces(reader):
+    assert reader.read("main", "docs/en/new page.mdx") == b"## New\n"
+    assert reader.read("main", "docs/en/missing page.mdx") is None
+    # The reader is still in sync after the missing object
+    assert reader.read("main", "docs/en/page.mdx") == b"## Install\n"
+
+
+def test_missing_file_directory_and_ref(reader):
+    assert reader.read("main", "docs/en/missing.mdx") is None
+    assert reader.read("main", "docs/en") is None
+    assert reader.read("no-such-branch", "docs/en/page.mdx") is None
+    assert reader.read("main", "docs/en/page.mdx") == b"## Install\n"
@@ -0,0 +1,123 @@
+import os
+
+import pytest
+
+from make_my_docs_bot.tools.git_commit_engine import CommitBatch, GitCommitEngine, GitCommitError
+
+
+@pytest.fixture
+def repo(docs_repo):
+    docs_repo.write("docs/ko/page.mdx", "## 설치\n")
+    docs_repo.write("docs/pt-BR/page.mdx", "## Instalação\n")
+    docs_repo.commit("Add the translations")
+    docs_repo.git("branch", "feature")
+    return docs_repo
+
+
+def show(repo, revision, path):
+    return repo.git("show", f"{revision}:{path}") + "\n"
+
+
+def test_commits_to_a_branch_which_is_not_checked_out(repo):
+    repo.write("docs/ko/page.mdx", "## 설치하기\n")
+
+    commit = GitCommitEngine(repo.root).commit_files("feature", ["docs/ko/page.mdx"], "Translate the page")
+
+    assert repo.git("rev-parse", "feature") == commit
+    assert show(repo, "feature", "docs/ko/page.mdx") == "## 설치하기\n"
+    assert show(repo, "feature", "docs/pt-BR/page.mdx") == "## Instalação\n"
+    assert repo.git("log", "-1", "--format=%s", "feature") == "Translate the page"
+    # The checkout stays on main with its edit
+    assert repo.git("branch", "--show-current") == "main"
+    assert repo.git("rev-parse", "main") == repo.git("rev-parse", "feature~1")
+    assert repo.git("status", "--porcelain") == "M docs/ko/page.mdx"
+
+
+def test_commit_to_the_checked_out_branch_refreshes_its_index(repo):
+    repo.write("docs/ko/page.mdx", "## 설치하기\n")
+
+    commit = GitCommitEngine(repo.root).commit_files("main", ["docs/ko/page.mdx"], "Translate the page")
+
+    assert repo.git("rev-parse", "HEAD") == commit
+    assert repo.git("status", "--porcelain") == ""
+
+
+def test_worktree_of_the_branch_gets_the_committed_files(repo, tmp_path):
+    worktree = str(tmp_path / "feature-worktree")
+    repo.git("worktree", "add", "-q", worktree, "feature")
+    repo.write("docs/ko/page.mdx", "## 설치하기\n")
+
+    GitCommitEngine(repo.root).commit_files("feature", ["docs/ko/page.mdx"], "Translate the page")
+
+    with open(os.path.join(worktree, "docs/ko/page.mdx"), encoding="utf-8") as f:
+        assert f.read() == "## 설치하기\n"
+    assert repo.git("-C", worktree, "status", "--porcelain") == ""
+
+
+def test_unchanged_files_make_no_commit(repo):
+    head = repo.git("rev-parse", "feature")
+
+    assert GitCommitEngine(repo.root).commit_files("feature", ["docs/ko/page.mdx"], "Nothing") is None
+    assert repo.git("rev-parse", "feature") == head
+
+
+def test_missing_file_is_an_error(repo):
+    with pytest.raises(GitCommitError, match="File not found: docs/ko/missing.mdx"):
+        GitCommitEngine(repo.root).commit_files("feature", ["docs/ko/missing.mdx"], "Translate")
+
+
+def test_commit_losing_the_race_is_rebuilt_on_the_new_tip(repo, monkeypatch):
+    engine = GitCommitEngine(repo.root)
+    write_tree = engine._write_tree
+    other_engine = GitCommitEngine(repo.root)
+    concurrent = []
+
+    def write_tree_while_another_crew_commits(parent, blobs):
+        tree = write_tree(parent, blobs)
+        if not concurrent:
+            # Another crew moves the branch between reading its tip and updating it
+            other_blobs = other_engine.hash_files(["docs/pt-BR/page.mdx"])
+            concurrent.append(other_engine.commit_blobs("feature", other_blobs, "Concurrent translation"))
+        return tree
+
+    monkeypatch.setattr(engine, "_write_tree", write_tree_while_another_crew_commits)
+    repo.write("docs/pt-BR/page.mdx", "## Instalar\n")
+    repo.write("docs/ko/page.mdx", "## 설치하기\n")
+    ko_blobs = engine.hash_files(["docs/ko/page.mdx"])
+
+    commit = engine.commit_blobs("feature", ko_blobs, "Translate the page")
+
+    assert repo.git("rev-parse", f"{commit}~1") == concurrent[0]
+    assert show(repo, "feature", "docs/ko/page.mdx") == "## 설치하기\n"
+    assert show(repo, "feature", "docs/pt-BR/page.mdx") == "## Instalar\n"
+
+
+def test_batch_makes_one_commit_per_branch(repo):
+    batch = CommitBatch()
+    repo.write("docs/ko/page.mdx", "## 설치하기\n")
+    batch.add(repo.root, "feature", ["docs/ko/page.mdx"], "Translate the Korean page")
+    repo.write("docs/pt-BR/page.mdx", "## Instalar\n")
+    batch.add(repo.root, "feature", ["docs/pt-BR/page.mdx"], "Translate the Portuguese page")
+    # Added files are hashed right away, later edits are not committed
+    repo.write("docs/ko/page.mdx", "## 나중에\n")
+
+    assert batch.pending_files() == {"feature": ["docs/ko/page.mdx", "docs/pt-BR/page.mdx"]}
+    commits = batch.flush()
+
+    assert list(commits) == ["feature"]
+    assert repo.git("rev-parse", "feature~1") == repo.git("rev-parse", "main")
+    assert show(repo, "feature", "docs/ko/page.mdx") == "## 설치하기\n"
+    assert show(repo, "feature", "docs/pt-BR/page.mdx") == "## Instalar\n"
+    assert repo.git("log", "-1", "--format=%B", "feature").startswith("Update 2 translated files")
+    assert batch.pending_files() == {}
+    assert batch.flush() == {}
+
+
+def test_batch_flushes_only_the_given_branches(repo):
+    batch = CommitBatch()
+    repo.write("docs/ko/page.mdx", "## 설치하기\n")
+    batch.add(repo.root, "feature", ["docs/ko/page.mdx"], "Translate on feature")
+    batch.add(repo.root, "main", ["docs/ko/page.mdx"], "Translate on main")
+
+    assert list(batch.flush(branches=["main"])) == ["main"]
+    assert batch.pending_files() == {"feature": ["docs/ko/page.mdx"]}
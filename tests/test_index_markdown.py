@@ -0,0 +1,209 @@
+import random
+
+import pytest
+
+from make_my_docs_bot.tools.index_markdown import (
+    SectionIntervalIndex,
+    find_changed_sections,
+    index_markdown_lines,
+    index_markdown_lines_without_context,
+    read_markdown_lines,
+)
+
+
+# The multi pass indexer the single pass one replaced, kept as the reference for its output
+def _reference_headings(lines):
+    headings = []
+    in_code_block = False
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_code_block = not in_code_block
+            continue
+        if in_code_block:
+            continue
+        if stripped.startswith("#"):
+            level = stripped.count("#", 0, stripped.find(" ")) if " " in stripped else stripped.count("#")
+            headings.append((i, level, stripped.strip("# ").strip()))
+    return headings
+
+
+def _nest(index, children_index_offset):
+    root = []
+    stack = []
+    for item in index:
+        while stack and stack[-1]["level"] >= item["level"]:
+            stack.pop()
+        if stack:
+            stack[-1]["children_index"].append(item["start_line"] - children_index_offset)
+            stack[-1]["children"].append(item)
+        else:
+            root.append(item)
+        stack.append(item)
+    return root[0]
+
+
+def reference_index(lines):
+    total_lines = len(lines)
+    index = [{"level": 1, "title": "Start of the page", "start_line": 0}]
+    index += [{"level": level, "title": title, "start_line": i} for i, level, title in _reference_headings(lines)]
+
+    for j, item in enumerate(index):
+        first_children_start_line = None
+        next_start = None
+        for k in range(j + 1, len(index)):
+            if first_children_start_line is None:
+                first_children_start_line = index[k]["start_line"]
+            if index[k]["level"] <= item["level"]:
+                next_start = index[k]["start_line"] - 1
+                break
+        first_children_start_line = first_children_start_line if first_children_start_line else (total_lines - 1)
+        end_line = next_start if next_start else (total_lines - 1)
+
+        item["end_line"] = end_line
+        item["first_children_start_line"] = first_children_start_line
+        item["before_first_children_content"] = "".join(lines[item["start_line"]:first_children_start_line]).strip()
+        item["content"] = "".join(lines[item["start_line"]:end_line + 1]).strip()
+        item["children_index"] = []
+        item["children"] = []
+
+    return _nest(index, 0)
+
+
+def reference_index_without_context(lines):
+    total_lines = len(lines)
+    index = [{"level": 1, "title": "Start of the page", "start_line": 0}]
+    index += [{"level": level, "title": title, "start_line": i} for i, level, title in _reference_headings(lines)]
+
+    for j, item in enumerate(index):
+        next_start = None
+        for k in range(j + 1, len(index)):
+            if index[k]["level"] <= item["level"]:
+                next_start = index[k]["start_line"]
+                break
+        item["end_line"] = (next_start - 1) if next_start else (total_lines - 1)
+        item["children_index"] = []
+        item["children"] = []
+
+    return _nest(index, 1)
+
+
+def random_document(seed, size=60):
+    rng = random.Random(seed)
+    lines = []
+    while len(lines) < size:
+        kind = rng.random()
+        if kind < 0.25:
+            # Level 1 headings are rare in the docs but close the page root, keep a few of them
+            level = 1 if rng.random() < 0.05 else rng.randint(2, 4)
+            lines.append("#" * level + f" Heading {len(lines)}\n")
+        elif kind < 0.35:
+            lines.append("\n")
+        elif kind < 0.42:
+            lines.append("```python\n")
+            lines.append("# not a heading\n")
+            lines.append("```\n")
+        else:
+            lines.append(f"Text line {len(lines)}  \n")
+    if rng.random() < 0.5:
+        lines[-1] = lines[-1].rstrip("\n")
+    return lines
+
+
+DOCUMENTS = [random_document(seed) for seed in range(200)] + [
+    [],
+    ["# Only a title\n"],
+    ["Intro\n", "## Heading\n", "Text\n"],
+    ["---\n", "title: Page\n", "---\n", "## A\n", "### B\n", "## C\n"],
+]
+
+
+@pytest.mark.parametrize("lines", DOCUMENTS)
+def test_index_matches_reference(lines):
+    assert index_markdown_lines(lines).to_dict() == reference_index(lines)
+
+
+@pytest.mark.parametrize("lines", DOCUMENTS)
+def test_index_without_context_matches_reference(lines):
+    assert index_markdown_lines_without_context(lines) == reference_index_without_context(lines)
+
+
+def test_index_reads_paths_bytes_and_lines_alike(tmp_path):
+    lines = DOCUMENTS[0]
+    page = tmp_path / "page.mdx"
+    page.write_text("".join(lines), encoding="utf-8")
+
+    assert read_markdown_lines(str(page)) == lines
+    assert read_markdown_lines(page.read_bytes()) == lines
+    assert index_markdown_lines(str(page)).to_dict() == reference_index(lines)
+    assert index_markdown_lines(page.read_bytes()).to_dict() == reference_index(lines)
+
+
+def test_index_nodes_read_like_dicts():
+    lines = ["Intro\n", "## A\n", "Text of A\n", "### B\n", "Text of B\n"]
+    index = index_markdown_lines(lines)
+    section = index["children"][0]
+
+    reference = reference_index(lines)["children"][0]
+
+    assert {key: section[key] for key in section if key != "children"} == {key: value for key, value in reference.items() if key != "children"}
+    assert section["content"] == "## A\nText of A\n### B\nText of B"
+    assert section["before_first_children_content"] == "## A\nText of A"
+    with pytest.raises(KeyError):
+        section["missing"]
+
+
+# The tree walk SectionIntervalIndex replaced, both start_index and end_index are included
+def reference_find(node, start_index, end_index):
+    if not (start_index >= node["start_line"] and end_index <= node["end_line"]):
+        return None
+    if len(node["children"]) and end_index < node["first_children_start_line"]:
+        return node["start_line"], False
+    for child in node["children"]:
+        result = reference_find(child, start_index, end_index)
+        if result is not None:
+            return result
+    return node["start_line"], True
+
+
+# A heading on line 0 gives the page root a first_children_start_line of 0, which the tree walk
+# read as the end of the file, see test_interval_index_finds_a_heading_on_the_first_line
+@pytest.mark.parametrize("lines", [lines for lines in DOCUMENTS[:60] if lines and not lines[0].startswith("#")])
+def test_interval_index_matches_tree_walk(lines):
+    index = index_markdown_lines(lines)
+    intervals = SectionIntervalIndex(index)
+
+    for start_index in range(len(lines)):
+        for end_index in range(start_index, len(lines)):
+            result = intervals.find(start_index, end_index)
+            found = None if result is None else (result[0]["start_line"], result[1])
+            assert found == reference_find(index, start_index, end_index), (start_index, end_index)
+
+
+def test_interval_index_finds_a_heading_on_the_first_line():
+    lines = ["## A\n", "Text\n", "## B\n", "Text\n"]
+    intervals = SectionIntervalIndex(index_markdown_lines(lines))
+
+    section, full_context_flag = intervals.find(0, 1)
+    assert (section["title"], full_context_flag) == ("A", True)
+    section, full_context_flag = intervals.find(1, 2)
+    assert (section["title"], full_context_flag) == ("Start of the page", True)
+
+
+def test_interval_index_puts_deletions_in_the_section_before():
+    lines = ["Intro\n", "## A\n", "Text\n", "## B\n", "Text\n"]
+    intervals = SectionIntervalIndex(index_markdown_lines(lines))
+
+    section, full_context_flag = intervals.find(3, 2)
+    assert (section["title"], full_context_flag) == ("A", True)
+
+
+def test_changed_sections_are_merged():
+    lines = ["Intro\n", "## A\n", "Text\n", "### A.1\n", "Text\n", "## B\n", "Text\n", "More\n"]
+    index = index_markdown_lines(lines)
+
+    changed = find_changed_sections(index, [(2, 2), (4, 4), (1, 4), (6, 6), (7, 7)])
+    assert [(section["title"], full_context_flag) for section, full_context_flag in changed] == [("A", True), ("B", True)]
+
+    changed = find_changed_sections(index, [(2, 2), (6, 6)])
+    assert [(section["title"], full_context_flag) for section, full_context_flag in changed] == [("A", False), ("B", True)]
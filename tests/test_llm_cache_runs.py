@@ -0,0 +1,85 @@
+import sys
+
+import crewai.utilities.llm_utils
+import pytest
+from crewai.llms.base_llm import BaseLLM
+
+from make_my_docs_bot import benchmark, llm_cache, main
+from make_my_docs_bot.crew import MakeMyDocsBot
+from make_my_docs_bot.tools.git_diff import run_git
+
+
+class EvaluatorLLM(BaseLLM):
+    """Scores every task the same, the evaluator parses the answer without function calling."""
+
+    def __init__(self):
+        super().__init__(model="evaluator-stub")
+        # Shared with the copies the cache makes to add stop words
+        self.usage = {"calls": 0}
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None):
+        self.usage["calls"] += 1
+        return benchmark._final_answer('{"quality": 8.0}')
+
+
+class OfflineLLM(BaseLLM):
+    """Fails the replayed run if anything reaches a model."""
+
+    def __init__(self, model):
+        super().__init__(model=model)
+
+    def call(self, *args, **kwargs):
+        raise AssertionError(f"{self.model} was called while replaying")
+
+
+def run_test_command(monkeypatch, repo_root, changed_file, mode, crew_llm, evaluator_llm):
+    """`uv run test 1 evaluator-stub <changed_file> <branch>` with the LLM cache in mode."""
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setattr(MakeMyDocsBot, "llm", crew_llm)
+    monkeypatch.setattr(MakeMyDocsBot, "tracing", False)
+    monkeypatch.setattr(crewai.utilities.llm_utils, "create_llm", lambda model: evaluator_llm)
+    monkeypatch.setenv(llm_cache.LLM_CACHE_ENVIRONMENT_VARIABLE, mode)
+    monkeypatch.setattr(sys, "argv", ["test", "1", "evaluator-stub", changed_file, benchmark.FEATURE_BRANCH])
+    try:
+        with benchmark.bot_working_directory(repo_root):
+            main.test()
+    finally:
+        cache = llm_cache.get_llm_cache()
+        llm_cache.enable_llm_cache(None)
+    return cache.stats()
+
+
+def translated_tree(repo_root):
+    return run_git(["rev-parse", f"{benchmark.FEATURE_BRANCH}:docs"], cwd=repo_root).stdout.strip()
+
+
+def test_recorded_test_command_replays_offline(tmp_path, monkeypatch):
+    monkeypatch.setenv(llm_cache.LLM_CACHE_DIRECTORY_ENVIRONMENT_VARIABLE, str(tmp_path / "llm_cache"))
+
+    recorded_root = str(tmp_path / "recorded")
+    [changed_file] = benchmark.create_synthetic_repo(recorded_root, files=1, headings=4)
+    stub = benchmark.StubLLM(recorded_root, benchmark.FEATURE_BRANCH)
+    evaluator = EvaluatorLLM()
+    recorded = run_test_command(monkeypatch, recorded_root, changed_file, "record", stub, evaluator)
+
+    assert recorded["recorded"] == stub.usage["calls"] + evaluator.usage["calls"]
+    assert evaluator.usage["calls"] > 0
+
+    # The same repository elsewhere, the checkout paths in the prompts are normalized
+    replayed_root = str(tmp_path / "replayed")
+    benchmark.create_synthetic_repo(replayed_root, files=1, headings=4)
+    replayed = run_test_command(
+        monkeypatch, replayed_root, changed_file, "replay", OfflineLLM("benchmark-stub"), OfflineLLM("evaluator-stub")
+    )
+
+    assert replayed["hits"] == recorded["recorded"]
+    assert (replayed["misses"], replayed["recorded"]) == (0, 0)
+    assert translated_tree(replayed_root) == translated_tree(recorded_root)
+
+
+def test_test_command_needs_the_english_page(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["test", "1", "gpt-4o"])
+
+    with pytest.raises(Exception, match="Pass the English page the crew works on"):
+        main.test()
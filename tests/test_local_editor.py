@@ -0,0 +1,26 @@
+from crewai import Agent
+from crewai.tools import BaseTool
+
+from make_my_docs_bot.local_editor import LocalEditorAgent
+
+
+class NoopTool(BaseTool):
+    name: str = "Noop"
+    description: str = "Does nothing."
+
+    def _run(self) -> str:
+        return ""
+
+
+def test_copy_keeps_a_copy_of_the_fallback():
+    fallback = Agent(role="Editor", goal="Edit", backstory="An editor.", tools=[NoopTool()], llm="gpt-4o-mini")
+    editor = LocalEditorAgent(
+        role="Editor", goal="Edit", backstory="An editor.", tools=fallback.tools, branch_name="feature", fallback=fallback
+    )
+
+    copied = editor.copy()
+
+    assert (copied.branch_name, copied.fallback.role) == ("feature", "Editor")
+    assert copied.fallback is not fallback
+    assert [tool.name for tool in copied.fallback.tools] == ["Noop"]
+    assert editor.fallback is fallback
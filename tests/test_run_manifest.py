@@ -0,0 +1,73 @@
+import asyncio
+import json
+import sys
+
+import pytest
+
+from make_my_docs_bot import benchmark, main
+from make_my_docs_bot.crew import MakeMyDocsBot
+from make_my_docs_bot.run_manifest import RunManifest
+from make_my_docs_bot.tools.git_commit_engine import CommitBatch, GitCommitError
+from make_my_docs_bot.tools.git_diff import run_git
+
+
+@pytest.fixture
+def synthetic_repo(tmp_path, monkeypatch):
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    repo_root = str(tmp_path / "repo")
+    changed_files = benchmark.create_synthetic_repo(repo_root, files=1, headings=4, edit_pattern="add")
+    monkeypatch.setattr(MakeMyDocsBot, "llm", benchmark.StubLLM(repo_root, benchmark.FEATURE_BRANCH))
+    monkeypatch.setattr(MakeMyDocsBot, "tracing", False)
+    return repo_root, changed_files
+
+
+def run_crew(repo_root, monkeypatch, *options):
+    monkeypatch.setattr(sys, "argv", ["run_crew", "--branch_name", benchmark.FEATURE_BRANCH, *options])
+    with benchmark.bot_working_directory(repo_root):
+        asyncio.run(main.run())
+
+
+def translation_commits(repo_root):
+    return int(run_git(["rev-list", "--count", f"main..{benchmark.FEATURE_BRANCH}"], cwd=repo_root).stdout) - 1
+
+
+def manifest_entry(repo_root, file_path):
+    with open(RunManifest.load(repo_root, benchmark.FEATURE_BRANCH).path, encoding="utf-8") as f:
+        return json.load(f)["files"][file_path]
+
+
+CHECKOUT_TASKS = {"index_fixing_task", "file_content_editor_and_git_commiter_task"}
+
+
+def failing_flush(self, branches=None, repo_root=None):
+    raise GitCommitError("Could not update the branch")
+
+
+@pytest.mark.parametrize("options, kept_tasks", [
+    # The edits stay in the checkout, the rerun commits them
+    ([], CHECKOUT_TASKS),
+    # The worktree is reset, the rerun makes the edits again
+    (["--worktrees"], set()),
+])
+def test_rerun_after_a_failed_commit_commits_the_translations(synthetic_repo, monkeypatch, options, kept_tasks):
+    repo_root, [changed_file] = synthetic_repo
+
+    with monkeypatch.context() as failing:
+        failing.setattr(CommitBatch, "flush", failing_flush)
+        with pytest.raises(Exception):
+            run_crew(repo_root, monkeypatch, *options)
+
+    assert translation_commits(repo_root) == 0
+    entry = manifest_entry(repo_root, changed_file)
+    assert not entry["completed"]
+    assert "korean_documentation_translator_task" in entry["tasks"]
+    assert CHECKOUT_TASKS & set(entry["tasks"]) == kept_tasks
+
+    run_crew(repo_root, monkeypatch, *options)
+
+    assert translation_commits(repo_root) == 1
+    assert benchmark.check_translations(repo_root, [changed_file]) == []
+    entry = manifest_entry(repo_root, changed_file)
+    assert entry["completed"]
+    assert CHECKOUT_TASKS <= set(entry["tasks"])
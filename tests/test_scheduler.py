@@ -0,0 +1,124 @@
+import asyncio
+
+import pytest
+
+from make_my_docs_bot import scheduler
+from make_my_docs_bot.scheduler import CrewJob, CrewScheduler, TokenBucket
+
+
+class FakeClock:
+    """Stands in for time.monotonic and asyncio.sleep in the scheduler, sleeping only moves the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(scheduler.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_bucket_bursts_up_to_a_minute_of_units(clock):
+    bucket = TokenBucket(60)
+
+    asyncio.run(bucket.acquire(60))
+
+    assert clock.sleeps == []
+    assert bucket.available == 0
+
+
+def test_bucket_waits_for_the_missing_units(clock):
+    bucket = TokenBucket(60)
+
+    async def acquire_twice():
+        await bucket.acquire(50)
+        await bucket.acquire(20)
+
+    asyncio.run(acquire_twice())
+
+    # 10 units left, 10 more come in at one a second
+    assert clock.sleeps == [pytest.approx(10.0)]
+    assert bucket.available == pytest.approx(0.0)
+
+
+def test_bucket_refills_over_time_up_to_its_capacity(clock):
+    bucket = TokenBucket(120)
+    asyncio.run(bucket.acquire(120))
+
+    clock.now += 15
+    bucket._refill()
+    assert bucket.available == pytest.approx(30.0)
+
+    clock.now += 3600
+    bucket._refill()
+    assert bucket.available == pytest.approx(120.0)
+
+
+def test_amount_larger_than_the_bucket_waits_for_a_full_bucket(clock):
+    bucket = TokenBucket(60)
+
+    async def acquire():
+        await bucket.acquire(30)
+        await bucket.acquire(1000)
+
+    asyncio.run(acquire())
+
+    assert sum(clock.sleeps) == pytest.approx(30.0)
+
+
+def run_jobs(crew_scheduler, jobs):
+    async def collect():
+        return [event async for event in crew_scheduler.run(jobs)]
+    return asyncio.run(collect())
+
+
+def test_scheduler_bounds_the_crews_in_flight():
+    in_flight = []
+    peak = []
+
+    async def kickoff(inputs):
+        in_flight.append(inputs["file_path"])
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(inputs["file_path"])
+        return inputs["file_path"]
+
+    jobs = [CrewJob(f"docs/en/page-{i}.mdx", {"file_path": f"docs/en/page-{i}.mdx"}, estimated_tokens=i) for i in range(6)]
+    events = run_jobs(CrewScheduler(kickoff, max_in_flight=2), jobs)
+
+    assert max(peak) == 2
+    completed = [event for event in events if event.status == "completed"]
+    assert sorted(event.result for event in completed) == sorted(job.file_path for job in jobs)
+    # Larger files start first
+    assert [event.file_path for event in events if event.status == "started"][0] == "docs/en/page-5.mdx"
+
+
+def test_scheduler_retries_and_reports_failures():
+    attempts = {}
+
+    async def kickoff(inputs):
+        attempts[inputs["file_path"]] = attempts.get(inputs["file_path"], 0) + 1
+        if inputs["file_path"] == "broken.mdx" or attempts[inputs["file_path"]] == 1:
+            raise RuntimeError("rate limited")
+        return "ok"
+
+    jobs = [CrewJob(file_path, {"file_path": file_path}) for file_path in ("flaky.mdx", "broken.mdx")]
+    events = run_jobs(CrewScheduler(kickoff, max_retries=2, retry_backoff=0), jobs)
+
+    statuses = {}
+    for event in events:
+        statuses.setdefault(event.file_path, []).append(event.status)
+    assert statuses["flaky.mdx"] == ["started", "retrying", "started", "completed"]
+    assert statuses["broken.mdx"] == ["started", "retrying", "started", "retrying", "started", "failed"]
+    assert [event.error for event in events if event.status == "failed"] == ["RuntimeError: rate limited"]
@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Same as benchmark.CREW_ONLY_MODULES, the benchmark itself loads crewAI
+CREW_ONLY_MODULES = ["crewai", "pydantic"]
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+# Loaded on every push by the pre-push hook, before a run is known to need a crew
+@pytest.mark.parametrize("module", ["make_my_docs_bot.main", "make_my_docs_bot.client"])
+def test_entry_points_load_without_crew_only_modules(module):
+    script = f"import sys, {module}; print([name for name in {CREW_ONLY_MODULES!r} if name in sys.modules])"
+    env = {**os.environ, "PYTHONPATH": SOURCE_DIRECTORY}
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
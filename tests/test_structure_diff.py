@@ -0,0 +1,148 @@
+from make_my_docs_bot.pydantic_models import SectionChanges
+from make_my_docs_bot.tools.index_markdown import index_markdown_lines_without_context
+from make_my_docs_bot.tools.structure_diff import (
+    align_headings,
+    find_heading_changes,
+    find_missing_sections,
+    find_structural_changes,
+    is_structure_consistent,
+)
+
+BASE = """---
+title: Page
+---
+
+## Install
+
+Run the installer.
+
+## Configure
+
+Edit the config.
+
+### Options
+
+Every option.
+
+## Deploy
+
+Ship it.
+"""
+
+# The "page-1" case: a section inserted between two unchanged ones
+BRANCH_WITH_NEW_SECTION = BASE.replace("## Configure", "## Upgrade\n\nUpgrade first.\n\n## Configure")
+
+BRANCH_WITH_RENAMED_SECTION = BASE.replace("## Deploy", "## Release")
+
+TRANSLATED = """---
+title: 페이지
+---
+
+## 설치
+
+설치 프로그램을 실행합니다.
+
+## 구성
+
+설정을 편집합니다.
+
+### 옵션
+
+모든 옵션.
+
+## 배포
+
+배포합니다.
+"""
+
+
+def index(text):
+    return index_markdown_lines_without_context(text.encode("utf-8"))
+
+
+def test_inserted_section_is_missing_between_its_neighbours():
+    translated_index = index(TRANSLATED)
+    changes = find_missing_sections(index(BASE), index(BRANCH_WITH_NEW_SECTION), translated_index, "docs/ko/page.mdx")
+
+    assert len(changes.changes) == 1
+    change = changes.changes[0]
+    assert change.FILE_PATH == "docs/ko/page.mdx"
+    assert change.NEW_HEADING_TRANSLATED == "Upgrade"
+    assert change.LEVEL == 2
+    assert (change.PREVIOUS_SECTION, change.PREVIOUS_SECTION_START_LINE, change.PREVIOUS_SECTION_END_LINE) == ("설치", 4, 7)
+    assert (change.NEXT_SECTION, change.NEXT_SECTION_START_LINE) == ("구성", 8)
+
+
+def test_section_inserted_before_every_heading_follows_the_page_root():
+    branch = BASE.replace("## Install", "## Overview\n\nWhat it is.\n\n## Install")
+    changes = find_missing_sections(index(BASE), index(branch), index(TRANSLATED), "docs/ko/page.mdx")
+
+    [change] = changes.changes
+    assert (change.PREVIOUS_SECTION, change.PREVIOUS_SECTION_START_LINE, change.PREVIOUS_SECTION_END_LINE) == ("Start of the page", 0, 3)
+    assert change.NEXT_SECTION == "설치"
+
+
+def test_renamed_section_is_not_missing_but_changes_the_headings():
+    base_index, english_index = index(BASE), index(BRANCH_WITH_RENAMED_SECTION)
+
+    assert find_missing_sections(base_index, english_index, index(TRANSLATED), "docs/ko/page.mdx").changes == []
+    assert find_heading_changes(base_index, english_index) == [("replace", 3, 4, 3, 4)]
+
+
+def test_unchanged_headings_have_no_heading_changes():
+    assert find_heading_changes(index(BASE), index(BASE.replace("Ship it.", "Ship it today."))) == []
+
+
+def test_translation_with_the_branch_headings_misses_nothing():
+    translated = TRANSLATED.replace("## 구성", "## 업그레이드\n\n먼저 업그레이드합니다.\n\n## 구성")
+    base_index, english_index, translated_index = index(BASE), index(BRANCH_WITH_NEW_SECTION), index(translated)
+
+    assert align_headings(base_index, english_index, translated_index)[0] == "branch"
+    assert find_missing_sections(base_index, english_index, translated_index, "docs/ko/page.mdx").changes == []
+
+
+def test_translation_matching_neither_version_is_not_checked():
+    translated = TRANSLATED.replace("### 옵션", "## 옵션")
+    base_index, english_index, translated_index = index(BASE), index(BRANCH_WITH_NEW_SECTION), index(translated)
+
+    assert align_headings(base_index, english_index, translated_index) == (None, {})
+    assert find_missing_sections(base_index, english_index, translated_index, "docs/ko/page.mdx") is None
+
+
+def test_headings_align_through_the_merge_base():
+    english_index = index(BRANCH_WITH_NEW_SECTION)
+    tied_to, aligned = align_headings(index(BASE), english_index, index(TRANSLATED))
+
+    assert tied_to == "base"
+    titles = {english_start: translated['title'] for english_start, translated in aligned.items()}
+    english_starts = {heading['title']: heading['start_line'] for heading in english_index['children']}
+    assert titles == {
+        english_starts["Install"]: "설치",
+        english_starts["Configure"]: "구성",
+        english_starts["Configure"] + 4: "옵션",
+        english_starts["Deploy"]: "배포",
+    }
+
+
+def test_structure_consistency():
+    no_changes = SectionChanges(changes=[])
+    missing = find_missing_sections(index(BASE), index(BRANCH_WITH_NEW_SECTION), index(TRANSLATED), "docs/ko/page.mdx")
+
+    assert is_structure_consistent({"docs/ko/page.mdx": no_changes}, [])
+    assert not is_structure_consistent({"docs/ko/page.mdx": no_changes}, [("replace", 3, 4, 3, 4)])
+    assert not is_structure_consistent({"docs/ko/page.mdx": missing}, [])
+    assert not is_structure_consistent({"docs/ko/page.mdx": None}, [])
+
+
+def test_structural_changes_of_every_translation(docs_repo):
+    docs_repo.write("docs/en/page.mdx", BASE)
+    docs_repo.write("docs/ko/page.mdx", TRANSLATED)
+    docs_repo.commit("Add the page")
+    docs_repo.git("checkout", "-q", "-b", "feature")
+    docs_repo.write("docs/en/page.mdx", BRANCH_WITH_NEW_SECTION)
+    docs_repo.commit("Add an upgrade section")
+
+    structural_changes = find_structural_changes(docs_repo.root, "docs/en/page.mdx", "main", "feature")
+
+    assert structural_changes["docs/pt-BR/page.mdx"] is None
+    assert [change.NEW_HEADING_TRANSLATED for change in structural_changes["docs/ko/page.mdx"].changes] == ["Upgrade"]
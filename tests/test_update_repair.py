@@ -0,0 +1,110 @@
+import os
+
+import pytest
+
+from make_my_docs_bot.tools.update_repair import UpdateRepairError, repair_content_updates
+
+TRANSLATED = """---
+title: 페이지
+---
+
+## 설치
+
+설치 프로그램을 실행합니다.
+
+## 구성
+
+설정을 편집합니다.
+
+### 옵션
+
+모든 옵션.
+"""
+
+INSTALL = "## 설치\n\n먼저 설치 프로그램을 실행합니다.\n"
+CONFIGURE = "## 구성\n\n설정 파일을 편집합니다.\n\n### 옵션\n\n모든 옵션.\n"
+OPTIONS = "### 옵션\n\n모든 옵션과 기본값.\n"
+
+
+@pytest.fixture
+def repo_root(tmp_path):
+    os.makedirs(tmp_path / "docs" / "ko")
+    (tmp_path / "docs" / "ko" / "page.mdx").write_text(TRANSLATED, encoding="utf-8")
+    return str(tmp_path)
+
+
+def update(start_line, end_line, new_content, file_path="docs/ko/page.mdx"):
+    return {
+        "FILE_PATH": file_path,
+        "CONTENT_TO_BE_DELETED_START_LINE": start_line,
+        "CONTENT_TO_BE_DELETED_END_LINE": end_line,
+        "NEW_CONTENT": new_content,
+    }
+
+
+def spans(repaired):
+    return [(update.FILE_PATH, update.CONTENT_TO_BE_DELETED_START_LINE, update.CONTENT_TO_BE_DELETED_END_LINE) for update in repaired]
+
+
+def test_exact_ranges_are_kept(repo_root):
+    repaired, notes = repair_content_updates(repo_root, [update(4, 7, INSTALL), update(12, 14, OPTIONS)])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 4, 7), ("docs/ko/page.mdx", 12, 14)]
+    assert notes == []
+
+
+def test_ranges_counted_from_one_snap_to_their_section(repo_root):
+    repaired, notes = repair_content_updates(repo_root, [update(5, 8, INSTALL), update(9, 15, CONFIGURE)])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 4, 7), ("docs/ko/page.mdx", 8, 14)]
+    assert len(notes) == 2
+
+
+def test_range_without_its_children(repo_root):
+    repaired, _ = repair_content_updates(repo_root, [update(8, 11, "## 구성\n\n설정 파일을 편집합니다.\n")])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 8, 11)]
+
+
+def test_paragraph_under_a_heading_is_kept(repo_root):
+    repaired, notes = repair_content_updates(repo_root, [update(6, 6, "설치 프로그램을 두 번 실행합니다.\n")])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 6, 6)]
+    assert notes == []
+
+
+def test_missing_range_is_found_by_its_headings(repo_root):
+    repaired, _ = repair_content_updates(repo_root, [update(-1, -1, OPTIONS)])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 12, 14)]
+
+
+def test_absolute_paths_become_relative(repo_root):
+    repaired, _ = repair_content_updates(repo_root, [update(4, 7, INSTALL, os.path.join(repo_root, "docs/ko/page.mdx"))])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 4, 7)]
+
+
+def test_last_update_of_a_section_wins(repo_root):
+    repaired, notes = repair_content_updates(repo_root, [update(4, 7, INSTALL), update(5, 8, INSTALL.replace("먼저", "항상"))])
+
+    assert len(repaired) == 1
+    assert "항상" in repaired[0].NEW_CONTENT
+    assert any("updated twice" in note for note in notes)
+
+
+def test_update_inside_an_updated_section_is_dropped(repo_root):
+    repaired, notes = repair_content_updates(repo_root, [update(12, 14, OPTIONS), update(8, 14, CONFIGURE)])
+
+    assert spans(repaired) == [("docs/ko/page.mdx", 8, 14)]
+    assert any("dropped" in note for note in notes)
+
+
+@pytest.mark.parametrize("bad_update, problem", [
+    (update(4, 7, INSTALL, "docs/en/page.mdx"), "is not a translated file"),
+    (update(4, 7, INSTALL, "docs/ko/missing.mdx"), "File not found"),
+    (update(4, 7, "### 없음\n\n텍스트.\n"), "No section of docs/ko/page.mdx matches lines 4-7"),
+])
+def test_unmatched_updates_are_rejected(repo_root, bad_update, problem):
+    with pytest.raises(UpdateRepairError, match=problem):
+        repair_content_updates(repo_root, [update(12, 14, OPTIONS), bad_update])